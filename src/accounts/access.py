@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""What a user has access to.
+
+Many places need to know the user's categories (navigation menu, category
+views, api permissions…) or entities (contractor filtering). The access
+map holds all of it. It is built with two queries, cached, and resolved
+once per request (see `accounts.middleware.CategoryMiddleware`).
+
+Cache keys embed a global version number, which is bumped whenever
+category or entity members change, so stale maps are never read.
+
+"""
+import time
+
+from django.core.cache import cache
+
+
+ACCESS_VERSION_KEY = 'access_map_version'
+ACCESS_MAP_TIMEOUT = 60 * 60 * 24
+
+
+class AccessMap(object):
+    def __init__(self, categories, entity_ids):
+        self.categories = categories
+        self.category_ids = set(category.pk for category in categories)
+        self.entity_ids = entity_ids
+        self.categories_by_slug = dict(
+            ((category.organisation.slug, category.category_template.slug), category)
+            for category in categories)
+
+    def has_category(self, category):
+        """Does the user belong to the category (instance or id)?"""
+        category_id = getattr(category, 'pk', category)
+        return category_id in self.category_ids
+
+    def get_category(self, organisation_slug, category_slug):
+        """Return the user's category, or None."""
+        return self.categories_by_slug.get((organisation_slug, category_slug))
+
+    def get_categories_queryset(self):
+        from categories.models import Category
+        return Category.objects \
+            .filter(pk__in=self.category_ids) \
+            .select_related('category_template', 'organisation') \
+            .order_by('organisation__name', 'category_template__name')
+
+
+EMPTY_ACCESS = AccessMap([], [])
+
+
+def get_access_version():
+    version = cache.get(ACCESS_VERSION_KEY)
+    if version is None:
+        # If the version was evicted, don't start from a previous value
+        cache.add(ACCESS_VERSION_KEY, int(time.time()), None)
+        version = cache.get(ACCESS_VERSION_KEY)
+    return version
+
+
+def invalidate_access():
+    """Make every cached access map obsolete."""
+    try:
+        cache.incr(ACCESS_VERSION_KEY)
+    except ValueError:
+        cache.set(ACCESS_VERSION_KEY, int(time.time()), None)
+
+
+def build_access_map(user):
+    from accounts.models import Entity
+    from categories.models import Category
+
+    categories = Category.objects \
+        .filter(users=user) \
+        .select_related(
+            'organisation', 'category_template',
+            'category_template__metadata_model') \
+        .order_by('organisation__name', 'category_template__name')
+    entity_ids = Entity.objects \
+        .filter(users=user) \
+        .values_list('pk', flat=True)
+    return AccessMap(list(categories), list(entity_ids))
+
+
+def get_user_access(user):
+    """Return the user's access map, from cache if possible."""
+    if not user.is_authenticated():
+        return EMPTY_ACCESS
+
+    cache_key = 'access_map_{}_{}'.format(user.pk, get_access_version())
+    access = cache.get(cache_key)
+    if access is None:
+        access = build_access_map(user)
+        cache.set(cache_key, access, ACCESS_MAP_TIMEOUT)
+    return access
+
+
+def get_request_access(request):
+    """Return the access map of the request's user.
+
+    The map is resolved only once per request by the middleware. The
+    fallback is useful when the middleware did not run (e.g in tests).
+
+    """
+    access = getattr(request, 'access', None)
+    if access is None:
+        access = get_user_access(request.user)
+    return access
@@ -0,0 +1,8 @@
+from django.apps.config import AppConfig
+
+
+class AccountsConfig(AppConfig):
+    name = 'accounts'
+
+    def ready(self):
+        import accounts.signals  # noqa
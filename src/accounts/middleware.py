@@ -2,17 +2,22 @@
 
 
 from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject
 
-from categories.models import Category
+from accounts.access import get_user_access
 
 
 class CategoryMiddleware(object):
-    """Add category data to every request."""
+    """Add category data to every request.
+
+    The user access map is only resolved if some code needs it.
+
+    """
 
     def process_request(self, request):
+        request.access = SimpleLazyObject(lambda: get_user_access(request.user))
+
         user = getattr(request, 'user')
         if not isinstance(user, AnonymousUser):
-            request.user_categories = Category.objects \
-                .filter(users=user) \
-                .select_related('category_template', 'organisation') \
-                .order_by('organisation__name', 'category_template__name')
+            request.user_categories = SimpleLazyObject(
+                lambda: request.access.categories)
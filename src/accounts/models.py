@@ -3,7 +3,6 @@
 
 import logging
 
-from django.core.cache import cache
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser, PermissionsMixin, BaseUserManager
@@ -187,22 +186,17 @@ class Entity(models.Model):
              update_fields=None):
         super(Entity, self).save(force_insert, force_update, using,
                                  update_fields)
-        # Clear `entities_pk` cache
+        # Entities are part of the user access map
         clear_entities_cache()
 
 
 def get_entities(user):
-    """Put the entities list in cache if user belongs to one or several of
-    them (if he is a contractor)."""
-    cache_key_pk = 'entities_pk_%d' % user.id
-    entities_pk = cache.get(cache_key_pk)
-    if entities_pk is None:
-        entities = Entity.objects.filter(users=user)
-        entities_pk = entities.values_list('pk', flat=True)
-        cache.set(cache_key_pk, entities_pk, None)
-    return list(entities_pk)
+    """Return the ids of the entities the user belongs to (if he is a
+    contractor). See `accounts.access`."""
+    from accounts.access import get_user_access
+    return list(get_user_access(user).entity_ids)
 
 
 def clear_entities_cache():
-    users_pk = User.objects.values_list('pk', flat=True)
-    cache.delete_many(['entities_pk_%d' % pk for pk in users_pk])
+    from accounts.access import invalidate_access
+    invalidate_access()
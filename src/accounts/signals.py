@@ -0,0 +1,21 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete
+
+from accounts.access import invalidate_access
+from accounts.models import Entity
+from categories.models import Category, CategoryTemplate, Organisation
+
+
+def clear_access_cache(sender, **kwargs):
+    """Cached access maps must be rebuilt when memberships change."""
+    action = kwargs.get('action')
+    if action is None or action.startswith('post_'):
+        invalidate_access()
+
+
+m2m_changed.connect(clear_access_cache, sender=Category.users.through, dispatch_uid='access_category_users')
+m2m_changed.connect(clear_access_cache, sender=Entity.users.through, dispatch_uid='access_entity_users')
+
+# Categories are cached along with their organisation and template
+for model in (Category, CategoryTemplate, Organisation):
+    post_save.connect(clear_access_cache, sender=model, dispatch_uid='access_save_{}'.format(model.__name__))
+    post_delete.connect(clear_access_cache, sender=model, dispatch_uid='access_delete_{}'.format(model.__name__))
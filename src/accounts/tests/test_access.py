@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.access import get_user_access
+from accounts.factories import UserFactory, EntityFactory
+from categories.factories import CategoryFactory
+
+
+class AccessMapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = CategoryFactory()
+        self.other_category = CategoryFactory()
+        self.user = UserFactory(
+            name='User',
+            password='pass',
+            category=self.category)
+
+    def test_access_map(self):
+        access = get_user_access(self.user)
+        self.assertTrue(access.has_category(self.category))
+        self.assertTrue(access.has_category(self.category.pk))
+        self.assertFalse(access.has_category(self.other_category))
+        self.assertEqual(
+            access.get_category(
+                self.category.organisation.slug, self.category.slug),
+            self.category)
+        self.assertIsNone(access.get_category(
+            self.other_category.organisation.slug, self.other_category.slug))
+
+    def test_access_map_is_cached(self):
+        get_user_access(self.user)
+        with self.assertNumQueries(0):
+            access = get_user_access(self.user)
+            access.get_category(
+                self.category.organisation.slug,
+                self.category.slug).document_class()
+
+    def test_category_members_update(self):
+        self.assertFalse(get_user_access(self.user).has_category(self.other_category))
+        self.other_category.users.add(self.user)
+        self.assertTrue(get_user_access(self.user).has_category(self.other_category))
+
+        self.user.categories.remove(self.other_category)
+        self.assertFalse(get_user_access(self.user).has_category(self.other_category))
+
+    def test_entity_members_update(self):
+        self.assertEqual(get_user_access(self.user).entity_ids, [])
+        entity = EntityFactory()
+        entity.users.add(self.user)
+        self.assertEqual(get_user_access(self.user).entity_ids, [entity.pk])
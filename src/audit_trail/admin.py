@@ -13,19 +13,19 @@ class ActivityAdmin(NonEditableAdminMixin, admin.ModelAdmin):
         return False
 
     def get_actor(self, obj):
-        actor = obj.actor or obj.actor_object_str
+        actor = obj.actor_object_str or obj.actor
         return actor
 
     get_actor.short_description = 'Actor'
 
     def get_target(self, obj):
-        target = obj.target or obj.target_object_str
+        target = obj.target_object_str or obj.target
         return target
 
     get_target.short_description = 'Target'
 
     def get_action_object(self, obj):
-        action_object = obj.action_object or obj.action_object_str
+        action_object = obj.action_object_str or obj.action_object
         return action_object
 
     get_action_object.short_description = 'Action Object'
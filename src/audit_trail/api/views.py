@@ -1,32 +1,34 @@
 # -*- coding: utf-8 -*-
 
 
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
+from django.shortcuts import get_object_or_404
 from rest_framework import generics
 
 from documents.models import Document
+from restapi.pagination import CustomCursorPagination
 from restapi.views import CategoryAPIViewMixin
 from ..models import Activity
 from .serializers import ActivitySerializer
 
 
+class TimelinePagination(CustomCursorPagination):
+    ordering = '-created_on'
+
+
 class AuditTrailList(CategoryAPIViewMixin, generics.ListAPIView):
     model = Activity
     serializer_class = ActivitySerializer
+    pagination_class = TimelinePagination
 
     def get_queryset(self):
-        ct = ContentType.objects.get_for_model(Document)
         document_key = self.kwargs.get('document_key')
-        document = Document.objects.get(
-            category=self.get_category(), document_key=document_key)
-        revision_class = document.category.revision_class()
-        rev_ct = ContentType.objects.get_for_model(revision_class)
-        revisions_pk = document.get_all_revisions().values_list('pk', flat=True)
-
-        qs = Activity.objects.filter(
-            Q(action_object_content_type=ct, action_object_object_id=document.pk) |
-            Q(target_content_type=ct, target_object_id=document.pk) |
-            Q(action_object_content_type=rev_ct, action_object_object_id__in=revisions_pk) |
-            Q(target_content_type=rev_ct, target_object_id__in=revisions_pk))
+        document = get_object_or_404(
+            Document.objects.only('pk'),
+            category=self.get_category(),
+            document_key=document_key)
+
+        qs = Activity.objects \
+            .filter(document=document) \
+            .only('verb', 'actor_object_str', 'action_object_str',
+                  'target_object_str', 'created_on')
         return qs
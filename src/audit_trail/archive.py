@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Move old activities out of the database.
+
+The activity table grows with every user action. Activities older than the
+retention period are written to compressed json files (one activity per
+line) in `AUDIT_TRAIL_ARCHIVE_ROOT`, then deleted.
+
+"""
+import os
+import gzip
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from audit_trail.models import Activity
+
+
+logger = logging.getLogger(__name__)
+
+
+FIELDS = [field.attname for field in Activity._meta.concrete_fields]
+
+
+def get_archive_path(before):
+    filename = 'activities_{}_{}.jsonl.gz'.format(
+        before.strftime('%Y%m%d'),
+        timezone.now().strftime('%Y%m%d%H%M%S'))
+    return os.path.join(settings.AUDIT_TRAIL_ARCHIVE_ROOT, filename)
+
+
+def archive_activities(before, batch_size=None):
+    """Archive and delete activities created before the given date.
+
+    Returns the path of the archive and the number of archived activities.
+
+    """
+    batch_size = batch_size or settings.AUDIT_TRAIL_ARCHIVE_BATCH_SIZE
+    qs = Activity.objects \
+        .filter(created_on__lt=before) \
+        .order_by('pk') \
+        .values(*FIELDS)
+    if not qs.exists():
+        return None, 0
+
+    if not os.path.exists(settings.AUDIT_TRAIL_ARCHIVE_ROOT):
+        os.makedirs(settings.AUDIT_TRAIL_ARCHIVE_ROOT)
+
+    path = get_archive_path(before)
+    archived = 0
+    last_pk = 0
+    with gzip.open(path, 'wt') as archive:
+        while True:
+            activities = list(qs.filter(pk__gt=last_pk)[:batch_size])
+            if not activities:
+                break
+
+            for activity in activities:
+                archive.write(json.dumps(activity, cls=DjangoJSONEncoder))
+                archive.write('\n')
+            archive.flush()
+
+            # Only delete what was actually written
+            pks = [activity['id'] for activity in activities]
+            Activity.objects.filter(pk__in=pks).delete()
+
+            last_pk = pks[-1]
+            archived += len(pks)
+            logger.info('{} activities archived in {}'.format(archived, path))
+
+    return path, archived
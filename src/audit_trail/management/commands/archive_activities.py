@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from audit_trail.archive import archive_activities
+
+
+class Command(BaseCommand):
+    """Move old activities from the database to compressed archives."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.AUDIT_TRAIL_RETENTION_DAYS,
+            help='Archive activities older than this number of days')
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.AUDIT_TRAIL_ARCHIVE_BATCH_SIZE,
+            help='Number of activities deleted in a single query')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        path, archived = archive_activities(
+            before, batch_size=options['batch_size'])
+        if archived:
+            self.stdout.write('{} activities archived in {}'.format(
+                archived, path))
+        else:
+            self.stdout.write('No activity to archive')
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+
+from django.conf import settings
+
+from audit_trail.signals import start_batch, end_batch
+
+
+class ActivityBatchMiddleware(object):
+    """Save all the activities logged during a request at once.
+
+    With the `AUDIT_TRAIL_ASYNC` setting, activities are saved by a celery
+    worker instead.
+
+    """
+
+    def process_request(self, request):
+        start_batch(queue=settings.AUDIT_TRAIL_ASYNC)
+
+    def process_response(self, request, response):
+        end_batch()
+        return response
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_auto_20160607_1650'),
+        ('audit_trail', '0003_auto_20160628_1613'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='document',
+            field=models.ForeignKey(related_name='activities', on_delete=django.db.models.deletion.SET_NULL, blank=True, to='documents.Document', null=True),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='created_on',
+            field=models.DateTimeField(default=django.utils.timezone.now, db_index=True),
+        ),
+        migrations.AlterIndexTogether(
+            name='activity',
+            index_together=set([('document', 'created_on')]),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def get_revision_models(apps):
+    """Historical models of all revision classes.
+
+    Historical models don't inherit from `MetadataRevisionBase`, so we look
+    for the fields every revision class has.
+
+    """
+    for model in apps.get_models():
+        field_names = set(field.name for field in model._meta.fields)
+        if {'metadata', 'revision'} <= field_names:
+            yield model
+
+
+def fill_activity_documents(apps, schema_editor):
+    Activity = apps.get_model('audit_trail', 'Activity')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Document = apps.get_model('documents', 'Document')
+
+    if not Activity.objects.exists():
+        return
+
+    activities = Activity.objects.filter(document__isnull=True)
+    for field in ('target', 'action_object'):
+        content_type = '{}_content_type'.format(field)
+        object_id = '{}_object_id'.format(field)
+
+        document_ct = ContentType.objects \
+            .filter(app_label='documents', model='document') \
+            .first()
+        if document_ct:
+            activities \
+                .filter(**{content_type: document_ct}) \
+                .update(document_id=Subquery(
+                    Document.objects
+                    .filter(pk=OuterRef(object_id))
+                    .values('pk')[:1]))
+
+        for revision_class in get_revision_models(apps):
+            revision_ct = ContentType.objects \
+                .filter(app_label=revision_class._meta.app_label,
+                        model=revision_class._meta.model_name) \
+                .first()
+            if revision_ct is None:
+                continue
+
+            activities \
+                .filter(**{content_type: revision_ct}) \
+                .update(document_id=Subquery(
+                    revision_class.objects
+                    .filter(pk=OuterRef(object_id))
+                    .values('metadata__document_id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('audit_trail', '0004_activity_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_activity_documents, migrations.RunPython.noop)
+    ]
@@ -17,6 +17,17 @@ def get_repr(obj):
     return method()
 
 
+def get_document_id(obj):
+    """Return the pk of the document the object belongs to, if any."""
+    from documents.models import Document, MetadataRevisionBase
+
+    if isinstance(obj, Document):
+        return obj.pk
+    if isinstance(obj, MetadataRevisionBase):
+        return obj.metadata.document_id
+    return None
+
+
 class Activity(models.Model):
 
     VERB_CREATED = 'created'
@@ -82,20 +93,33 @@ class Activity(models.Model):
         'target_content_type', 'target_object_id')
     target_object_str = models.CharField(max_length=255, blank=True)
 
-    created_on = models.DateTimeField(default=timezone.now)
+    # The document the activity relates to, either directly or through one
+    # of its revisions. This is what the document timeline is built upon.
+    document = models.ForeignKey(
+        'documents.Document',
+        related_name='activities',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True)
+
+    created_on = models.DateTimeField(default=timezone.now, db_index=True)
 
     class Meta:
         app_label = 'audit_trail'
         verbose_name = _('Activity')
         verbose_name_plural = _('Activities')
         ordering = ['-created_on']
+        index_together = (('document', 'created_on'),)
 
     def __str__(self):
+        # Strings are rendered when the activity is logged, so displaying
+        # an activity does not require to fetch the related objects.
+        # Generic relations are only resolved for legacy activities.
         ctx = {
-            'actor': self.actor or self.actor_object_str,
+            'actor': self.actor_object_str or self.actor,
             'verb': self.get_verb_display(),
-            'action_object': get_repr(self.action_object) or self.action_object_str,
-            'target': get_repr(self.target) or self.target_object_str
+            'action_object': self.action_object_str or get_repr(self.action_object),
+            'target': self.target_object_str or get_repr(self.target)
         }
         if ctx['action_object'] and ctx['target']:
             return _('{actor} {verb} {action_object} on {target}').format(**ctx)
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 
 
+import threading
+from functools import partial
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
 from django.dispatch import Signal, receiver
 from accounts.models import User
 
@@ -14,11 +20,9 @@ activity_log = Signal(
 )
 
 
-@receiver(activity_log, dispatch_uid='activity_log_uid')
-def activity_handler(verb, action_object=None, target=None, **kwargs):
-    from .models import Activity, get_repr
-
-    kwargs.pop('signal', None)
+def build_activity(verb, action_object=None, target=None, **kwargs):
+    """Returns an unsaved `Activity` instance."""
+    from .models import Activity, get_repr, get_document_id
 
     if verb not in list(zip(*Activity.VERB_CHOICES))[0]:
         raise ValueError("Verb must belong to Activity verbs")
@@ -46,4 +50,131 @@ def activity_handler(verb, action_object=None, target=None, **kwargs):
 
     # activity.action_object_str = kwargs.get('action_object_str', None) or str(action_object)
     activity.action_object_str = kwargs.get('action_object_str', None) or get_repr(action_object)
-    activity.save()
+
+    activity.document_id = get_document_id(target) or \
+        get_document_id(action_object)
+    return activity
+
+
+_local = threading.local()
+
+
+class ActivityBatch(object):
+    """Activities waiting to be saved with a single query.
+
+    Activities are only saved once the current transaction is committed,
+    so nothing is logged for changes that were rolled back.
+
+    With `queue=True`, activities are sent to a celery worker instead of
+    being saved by the current process.
+
+    """
+    def __init__(self, queue=False):
+        self.queue = queue
+        self.activities = []
+        self.depth = 0
+
+    def add(self, activities):
+        self.activities += activities
+
+    def flush(self):
+        activities = self.activities
+        self.activities = []
+        if not activities:
+            return
+
+        save = queue_activities if self.queue else save_activities
+        callback = partial(save, activities)
+
+        if settings.AUDIT_TRAIL_FLUSH_ON_COMMIT:
+            transaction.on_commit(callback)
+        else:
+            callback()
+
+
+def start_batch(queue=False):
+    """Buffer all activities logged by the current thread.
+
+    Nested batches are merged with the outer one.
+
+    """
+    batch = getattr(_local, 'batch', None)
+    if batch is None:
+        batch = ActivityBatch(queue=queue)
+        _local.batch = batch
+    batch.depth += 1
+
+
+def end_batch():
+    """Save the buffered activities once the outer batch is over."""
+    batch = getattr(_local, 'batch', None)
+    if batch is None:
+        return
+
+    batch.depth -= 1
+    if batch.depth <= 0:
+        _local.batch = None
+        batch.flush()
+
+
+@contextmanager
+def batch_activities(queue=False):
+    """Save all the activities logged in the block with a single query."""
+    start_batch(queue=queue)
+    try:
+        yield _local.batch
+    finally:
+        end_batch()
+
+
+def save_activities(activities):
+    from .models import Activity
+    Activity.objects.bulk_create(activities)
+
+
+def serialize_activity(activity):
+    return dict(
+        (field.attname, getattr(activity, field.attname))
+        for field in activity._meta.concrete_fields
+        if not field.primary_key)
+
+
+def queue_activities(activities):
+    from .tasks import create_activities
+    create_activities.delay([serialize_activity(a) for a in activities])
+
+
+def log_activities(activities):
+    batch = getattr(_local, 'batch', None)
+    if batch is not None:
+        batch.add(activities)
+    else:
+        save_activities(activities)
+
+
+@receiver(activity_log, dispatch_uid='activity_log_uid')
+def activity_handler(verb, action_object=None, target=None, **kwargs):
+    kwargs.pop('signal', None)
+    activity = build_activity(
+        verb, action_object=action_object, target=target, **kwargs)
+    log_activities([activity])
+
+
+def bulk_activity_log(verb, actor, targets, **kwargs):
+    """Log the same activity on several targets with a single query."""
+    activities = [
+        build_activity(verb, target=target, actor=actor, **kwargs)
+        for target in targets]
+    log_activities(activities)
+
+
+def warm_up_content_types():
+    """Load all content types in memory.
+
+    Content types are cached by django once they are fetched, so logging
+    activities does not require to query them anymore.
+
+    """
+    from django.apps import apps
+    from django.contrib.contenttypes.models import ContentType
+    ContentType.objects.get_for_models(*apps.get_models())
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+
+
+from core.celery import app
+from audit_trail.models import Activity
+
+
+@app.task
+def create_activities(activities):
+    """Save activities logged by another process."""
+    Activity.objects.bulk_create(
+        [Activity(**activity) for activity in activities])
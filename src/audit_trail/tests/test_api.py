@@ -37,4 +37,57 @@ class ActivityApiTests(TestCase):
                   doc.document_key])
         res = self.apiclient.get(url)
         self.assertEqual(res.status_code, 200)
-        self.assertEqual(len(res.data), 2)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_revision_activities(self):
+        doc = DocumentFactory()
+        doc.category.users.add(self.user)
+        other_doc = DocumentFactory(category=doc.category)
+
+        activity_log.send(verb=Activity.VERB_STARTED_REVIEW,
+                          target=doc.latest_revision,
+                          sender=None,
+                          actor=self.user)
+        activity_log.send(verb=Activity.VERB_EDITED,
+                          target=other_doc,
+                          sender=None,
+                          actor=self.user)
+        url = reverse(
+            'document_audit_trail',
+            args=[doc.category.organisation.slug,
+                  doc.category.slug,
+                  doc.document_key])
+        res = self.apiclient.get(url)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIn(doc.document_key, res.data['results'][0]['text'])
+
+    def test_cursor_pagination(self):
+        doc = DocumentFactory()
+        doc.category.users.add(self.user)
+        for _ in range(5):
+            activity_log.send(verb=Activity.VERB_EDITED,
+                              target=doc,
+                              sender=None,
+                              actor=self.user)
+        url = reverse(
+            'document_audit_trail',
+            args=[doc.category.organisation.slug,
+                  doc.category.slug,
+                  doc.document_key])
+        res = self.apiclient.get(url, {'page_limit': 3})
+        self.assertEqual(len(res.data['results']), 3)
+
+        res = self.apiclient.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNone(res.data['next'])
+
+    def test_unknown_document(self):
+        doc = DocumentFactory()
+        doc.category.users.add(self.user)
+        url = reverse(
+            'document_audit_trail',
+            args=[doc.category.organisation.slug,
+                  doc.category.slug,
+                  'unknown-document'])
+        res = self.apiclient.get(url)
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,46 @@
+import gzip
+import json
+import shutil
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+
+from ..archive import archive_activities
+from ..factories import ActivityFactory
+from ..models import Activity
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.old = [
+            ActivityFactory(
+                verb=Activity.VERB_JOINED,
+                created_on=now - timedelta(days=400))
+            for _ in range(3)]
+        self.recent = ActivityFactory(
+            verb=Activity.VERB_JOINED,
+            created_on=now - timedelta(days=10))
+        self.before = now - timedelta(days=365)
+
+    def tearDown(self):
+        shutil.rmtree(settings.AUDIT_TRAIL_ARCHIVE_ROOT, ignore_errors=True)
+
+    def test_old_activities_are_archived(self):
+        path, archived = archive_activities(self.before, batch_size=2)
+        self.assertEqual(archived, 3)
+        self.assertEqual(list(Activity.objects.all()), [self.recent])
+
+        with gzip.open(path, 'rt') as archive:
+            lines = [json.loads(line) for line in archive]
+        self.assertEqual(
+            [line['id'] for line in lines],
+            [activity.pk for activity in self.old])
+        self.assertEqual(lines[0]['verb'], Activity.VERB_JOINED)
+
+    def test_nothing_to_archive(self):
+        path, archived = archive_activities(timezone.now() - timedelta(days=1000))
+        self.assertIsNone(path)
+        self.assertEqual(archived, 0)
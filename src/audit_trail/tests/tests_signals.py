@@ -4,7 +4,8 @@ from accounts.factories import UserFactory
 from documents.factories import DocumentFactory
 
 from ..models import Activity
-from ..signals import activity_log
+from ..signals import (
+    activity_log, batch_activities, bulk_activity_log, warm_up_content_types)
 
 
 class ActivitySignalTests(TestCase):
@@ -20,3 +21,60 @@ class ActivitySignalTests(TestCase):
         self.assertEqual(latest_activity.actor_object_str, str(user))
         self.assertEqual(latest_activity.target, doc)
         self.assertEqual(latest_activity.target_object_str, str(doc))
+
+    def test_document_is_stored(self):
+        doc = DocumentFactory()
+        user = UserFactory()
+        activity_log.send(verb=Activity.VERB_EDITED, target=doc.latest_revision,
+                          sender='self', actor=user)
+        activity_log.send(verb=Activity.VERB_CREATED, action_object=doc,
+                          sender='self', actor=user)
+        activity_log.send(verb=Activity.VERB_JOINED, sender='self', actor=user)
+
+        activities = Activity.objects.order_by('pk')
+        self.assertEqual(
+            [activity.document_id for activity in activities],
+            [doc.pk, doc.pk, None])
+
+
+class ActivityBatchTests(TestCase):
+    def setUp(self):
+        self.doc = DocumentFactory()
+        self.user = UserFactory()
+
+    def test_activities_are_saved_at_the_end_of_the_batch(self):
+        with batch_activities():
+            activity_log.send(verb=Activity.VERB_EDITED, target=self.doc,
+                              sender='self', actor=self.user)
+            bulk_activity_log(Activity.VERB_EDITED, self.user,
+                              [self.doc, self.doc])
+            self.assertEqual(Activity.objects.count(), 0)
+
+        self.assertEqual(Activity.objects.count(), 3)
+
+    def test_nested_batches(self):
+        with batch_activities():
+            with batch_activities():
+                activity_log.send(verb=Activity.VERB_EDITED, target=self.doc,
+                                  sender='self', actor=self.user)
+            self.assertEqual(Activity.objects.count(), 0)
+        self.assertEqual(Activity.objects.count(), 1)
+
+    def test_single_query(self):
+        warm_up_content_types()
+        with self.assertNumQueries(1):
+            with batch_activities():
+                for _ in range(5):
+                    activity_log.send(
+                        verb=Activity.VERB_EDITED, target=self.doc,
+                        sender='self', actor=self.user)
+
+    def test_queued_activities(self):
+        with batch_activities(queue=True):
+            activity_log.send(verb=Activity.VERB_EDITED, target=self.doc,
+                              sender='self', actor=self.user)
+
+        activity = Activity.objects.get()
+        self.assertEqual(activity.document_id, self.doc.pk)
+        self.assertEqual(activity.target, self.doc)
+        self.assertEqual(activity.actor, self.user)
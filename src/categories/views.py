@@ -5,9 +5,8 @@ from django.views.generic import ListView
 from django.http import Http404
 
 from braces.views import LoginRequiredMixin
-from annoying.functions import get_object_or_None
 
-from .models import Category
+from accounts.access import get_request_access
 
 
 class CategoryList(LoginRequiredMixin, ListView):
@@ -33,12 +32,8 @@ class CategoryMixin(object):
         organisation_slug = self.kwargs['organisation']
         category_slug = self.kwargs['category']
 
-        qs = Category.objects \
-            .select_related() \
-            .filter(users=self.request.user) \
-            .filter(organisation__slug=organisation_slug) \
-            .filter(category_template__slug=category_slug)
-        self.category = get_object_or_None(qs)
+        access = get_request_access(self.request)
+        self.category = access.get_category(organisation_slug, category_slug)
         if self.category is None:
             raise Http404('Category not found')
 
@@ -7,6 +7,7 @@ from decimal import Decimal
 
 from kombu.serialization import register
 from celery import Celery
+from celery.signals import worker_process_init, task_prerun, task_postrun
 
 from django.conf import settings
 
@@ -40,3 +41,32 @@ register(
 # pickle the object when using Windows.
 app.config_from_object('django.conf:settings')
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
+
+
+@worker_process_init.connect
+def warm_up(**kwargs):
+    """Generate form classes before the first task is received."""
+    from documents.forms.models import warm_up_forms
+    from audit_trail.signals import warm_up_content_types
+    warm_up_forms()
+    warm_up_content_types()
+
+
+@task_prerun.connect
+def start_activity_batch(**kwargs):
+    """Activities logged by a task are saved at once when it's over."""
+    from audit_trail.signals import start_batch
+    start_batch()
+
+
+@task_prerun.connect
+def expire_values_lists(**kwargs):
+    """Check local copies of values lists once per task."""
+    from metadata.cache import expire_local_version
+    expire_local_version()
+
+
+@task_postrun.connect
+def end_activity_batch(**kwargs):
+    from audit_trail.signals import end_batch
+    end_batch()
@@ -162,6 +162,7 @@ MIDDLEWARE_CLASSES = (
     'django.middleware.security.SecurityMiddleware',
 
     'accounts.middleware.CategoryMiddleware',
+    'audit_trail.middleware.ActivityBatchMiddleware',
 )
 # ######### END MIDDLEWARE CONFIGURATION
 
@@ -223,6 +224,7 @@ LOCAL_APPS = (
     'schedules',
     'audit_trail',
     'reporting',
+    'feeds',
 )
 
 # Load custom documents
@@ -472,6 +474,9 @@ PIPELINE = {
 DEFAULT_FROM_EMAIL = 'admin@phase.fr'
 SEND_EMAIL_REMINDERS = False
 SEND_NEW_ACCOUNTS_EMAILS = False
+EMAIL_BATCH_SIZE = 100  # Emails sent through the same smtp connection
+EMAIL_MAX_RETRIES = 5  # Failed batches are sent again later
+EMAIL_RETRY_DELAY = 60 * 5
 # ######### END EMAIL CONFIGURATION
 
 # ######### API CONFIGURATION
@@ -488,12 +493,26 @@ CELERY_ACCEPT_CONTENT = ['betterjson']
 CELERY_TASK_SERIALIZER = 'betterjson'
 CELERY_RESULT_SERIALIZER = 'betterjson'
 CELERY_RESULT_BACKEND = 'amqp'
+CELERYBEAT_SCHEDULE = {
+    'refresh-hot-dashboards': {
+        'task': 'dashboards.tasks.refresh_hot_dashboards',
+        'schedule': 300,  # Same as DASHBOARDS_CACHE_TTL
+    },
+}
 
 # ######### SEARCH CONFIG
 ELASTIC_HOSTS = [{'host': 'localhost', 'port': 9200}]
 ELASTIC_INDEX = 'documents'
 ELASTIC_BULK_SIZE = 150
 ELASTIC_AUTOINDEX = True
+ELASTIC_REINDEX_CHUNK_SIZE = 2000
+ELASTIC_REINDEX_THREADS = 4
+ELASTIC_REINDEX_CHECKPOINT = SITE_ROOT.child('reindex_checkpoint.json')
+# Must not exceed the `index.max_result_window` index setting
+ELASTIC_MAX_RESULT_WINDOW = 10000
+SEARCH_FACETS_SIZE = 100  # Max number of buckets per facet
+SEARCH_FACETS_MAX_SIZE = 1000  # When all buckets of a facet are requested
+SEARCH_FACETS_CACHE_TTL = 60 * 10
 
 # ######### CUSTOM CONFIGURATION
 PAGINATE_BY = 50  # Document list pagination
@@ -505,7 +524,10 @@ CRISPY_TEMPLATE_PACK = 'bootstrap3'
 CRISPY_FAIL_SILENTLY = False
 REVIEW_DURATION = 13
 DISPLAY_NOTIFICATION_COUNT = 5
+NOTIFICATIONS_CACHE_TIMEOUT = 60 * 60 * 24
+NOTIFICATIONS_POLL_INTERVAL = 60  # Seconds between two unread count checks
 ALERT_ELEMENTS = 10
+FEEDS_CACHE_TIMEOUT = 60 * 60 * 24  # Rendered feeds (see `feeds.cache`)
 
 # Files that only logged user can download
 PROTECTED_ROOT = SITE_ROOT.child('protected')
@@ -527,9 +549,57 @@ EXPORTS_CHUNK_SIZE = 150
 EXPORTS_VALIDITY_DURATION = 60
 EXPORTS_TO_KEEP = 20
 
+# Document downloads config
+# Archives larger than this (in bytes) are built in background, and kept
+# `DOWNLOADS_VALIDITY_DURATION` seconds
+DOWNLOADS_SUBDIR = 'downloads'
+DOWNLOADS_ASYNC_SIZE = 1024 * 1024 * 1024
+DOWNLOADS_VALIDITY_DURATION = 60 * 60 * 24
+DOWNLOADS_BUILD_LOCK_TIMEOUT = 60 * 60  # Max duration of an archive build
+
 # Where to look for files to import?
 IMPORT_ROOT = SITE_ROOT.child('import')
 
+# Number of imported lines saved in a single transaction
+IMPORTS_CHUNK_SIZE = 500
+
+# Number of transmittal lines processed in a single transaction
+TRS_PROCESSING_CHUNK_SIZE = 200
+
+# Delay (in seconds) before the reporting counters of a modified category
+# are recomputed
+REPORTING_UPDATE_DELAY = 60
+
+# Dashboard data is considered fresh for `DASHBOARDS_CACHE_TTL` seconds,
+# outdated data is served for up to `DASHBOARDS_CACHE_MAX_AGE` seconds while
+# it is refreshed in background. Dashboards viewed in the last
+# `DASHBOARDS_HOT_DURATION` seconds are periodically refreshed.
+DASHBOARDS_CACHE_TTL = 300
+DASHBOARDS_CACHE_MAX_AGE = 3600
+DASHBOARDS_HOT_DURATION = 3600
+
+# Number of categories processed in parallel by `behind_schedule_alerts`
+BEHIND_SCHEDULE_ALERTS_THREADS = 4
+
+# Max number of values lists kept in memory by each process
+# (see `metadata.cache`)
+VALUES_LIST_LOCAL_CACHE_SIZE = 100
+
+# Rendered read-only forms of old revisions (see `documents.panels`)
+REVISION_PANEL_CACHE_TTL = 60 * 60 * 24 * 7
+
+# Activities older than `AUDIT_TRAIL_RETENTION_DAYS` are moved from the db
+# to compressed files by the `archive_activities` command
+AUDIT_TRAIL_RETENTION_DAYS = 365 * 2
+AUDIT_TRAIL_ARCHIVE_ROOT = PRIVATE_ROOT.child('audit_trail')
+AUDIT_TRAIL_ARCHIVE_BATCH_SIZE = 1000
+
+# Activities logged during a request or a task are saved in a single query
+# once the transaction is committed. With `AUDIT_TRAIL_ASYNC`, activities
+# logged during a request are saved by a celery worker.
+AUDIT_TRAIL_FLUSH_ON_COMMIT = True
+AUDIT_TRAIL_ASYNC = False
+
 # ######### END CUSTOM CONFIGURATION
 
 ALLOWED_HOSTS = ['phase']
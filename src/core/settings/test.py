@@ -47,11 +47,13 @@ CACHES = {
 MEDIA_ROOT = '/tmp/phase_media/'
 PROTECTED_ROOT = '/tmp/phase_media/phase_test_protected/'
 PRIVATE_ROOT = '/tmp/phase_media/phase_test_private/'
+AUDIT_TRAIL_ARCHIVE_ROOT = '/tmp/phase_media/phase_test_audit_trail/'
 
 STATICFILES_STORAGE = 'pipeline.storage.NonPackagingPipelineStorage'
 
 ELASTIC_INDEX = 'test_documents'
 ELASTIC_AUTOINDEX = False
+ELASTIC_REINDEX_CHECKPOINT = '/tmp/phase_test_reindex_checkpoint.json'
 
 # Makes Celery working synchronously and in memory
 CELERY_ALWAYS_EAGER = True
@@ -59,6 +61,12 @@ BROKER_URL = "memory://"
 CELERY_CACHE_BACKEND = "memory"
 CELERY_RESULT_BACKEND = "cache"
 
+# Test cases run in a transaction that is never committed
+AUDIT_TRAIL_FLUSH_ON_COMMIT = False
+
+# Other threads would not see the test transaction data
+BEHIND_SCHEDULE_ALERTS_THREADS = 1
+
 LOGGING['loggers']['elasticsearch'] = {
     'handlers': ['console', 'syslog', 'mail_admins'],
     'level': 'ERROR',
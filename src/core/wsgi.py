@@ -32,6 +32,12 @@ os.environ["DJANGO_SETTINGS_MODULE"] = "core.settings.production"
 # setting points here.
 application = get_wsgi_application()
 
+# Generate form classes before the first request is received
+from documents.forms.models import warm_up_forms  # noqa
+from audit_trail.signals import warm_up_content_types  # noqa
+warm_up_forms()
+warm_up_content_types()
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)
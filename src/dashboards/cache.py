@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from search.utils import get_index_generation
+
+
+STATS = ('hits', 'stale', 'misses')
+
+
+def get_data_key(dashboard_id):
+    return 'dashboard_data_{}'.format(dashboard_id)
+
+
+def get_viewed_key(dashboard_id):
+    return 'dashboard_viewed_{}'.format(dashboard_id)
+
+
+def get_lock_key(dashboard_id):
+    return 'dashboard_refreshing_{}'.format(dashboard_id)
+
+
+def get_stat_key(stat):
+    return 'dashboard_cache_{}'.format(stat)
+
+
+def incr_stat(stat):
+    key = get_stat_key(stat)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_stats():
+    """Return the number of cache hits, stale hits and misses."""
+    keys = [get_stat_key(stat) for stat in STATS]
+    values = cache.get_many(keys)
+    return dict((stat, values.get(key, 0)) for stat, key in zip(STATS, keys))
+
+
+def reset_stats():
+    cache.delete_many([get_stat_key(stat) for stat in STATS])
+
+
+def refresh_dashboard_data(dashboard):
+    """Query Elasticsearch and store the dashboard data in cache."""
+    # The generation is read before the query, so documents indexed in the
+    # meantime make the data outdated
+    generation = get_index_generation(dashboard.category_id)
+    dashboard.fetch_data()
+    data = {
+        'generation': generation,
+        'expires': time.time() + settings.DASHBOARDS_CACHE_TTL,
+        'headers': dashboard.get_headers(),
+        'buckets': dashboard.get_buckets(),
+    }
+    cache.set(
+        get_data_key(dashboard.pk), data, settings.DASHBOARDS_CACHE_MAX_AGE)
+    return data
+
+
+def schedule_refresh(dashboard_id):
+    """Refresh the dashboard data in background, unless it's in progress."""
+    from dashboards.tasks import refresh_dashboard
+
+    lock_key = get_lock_key(dashboard_id)
+    if cache.add(lock_key, True, settings.DASHBOARDS_CACHE_TTL):
+        refresh_dashboard.delay(dashboard_id)
+
+
+def get_dashboard_data(dashboard):
+    """Return the dashboard headers and buckets.
+
+    Data is cached for `DASHBOARDS_CACHE_TTL` seconds, and as long as
+    no document of the category is indexed. Outdated data is still served
+    for up to `DASHBOARDS_CACHE_MAX_AGE` seconds while a fresh version is
+    computed in background.
+
+    """
+    cache.set(get_viewed_key(dashboard.pk), time.time(),
+              settings.DASHBOARDS_HOT_DURATION)
+
+    data = cache.get(get_data_key(dashboard.pk))
+    if data is None:
+        incr_stat('misses')
+        data = refresh_dashboard_data(dashboard)
+    elif data['expires'] < time.time() or \
+            data['generation'] != get_index_generation(dashboard.category_id):
+        incr_stat('stale')
+        schedule_refresh(dashboard.pk)
+    else:
+        incr_stat('hits')
+
+    return data['headers'], data['buckets']
+
+
+def get_hot_dashboard_ids(dashboard_ids):
+    """Return ids of dashboards that were recently viewed."""
+    keys = dict((get_viewed_key(dashboard_id), dashboard_id)
+                for dashboard_id in dashboard_ids)
+    viewed = cache.get_many(list(keys.keys()))
+    return [keys[key] for key in viewed.keys()]
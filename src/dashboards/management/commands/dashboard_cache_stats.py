@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+
+from django.core.management.base import BaseCommand
+
+from dashboards.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    """Display the dashboard cache hit / miss counters."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', default=False,
+            help='Reset the counters after display')
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = sum(stats.values())
+        self.stdout.write(
+            'hits: {hits}, stale hits: {stale}, misses: {misses}'.format(**stats))
+        if total:
+            self.stdout.write('hit ratio: {:.1f}%'.format(
+                (stats['hits'] + stats['stale']) * 100.0 / total))
+
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+
+import logging
+
+from django.core.cache import cache
+
+from core.celery import app
+from dashboards.cache import (
+    get_hot_dashboard_ids, get_lock_key, refresh_dashboard_data)
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_dashboards():
+    from dashboards.models import Dashboard
+    return Dashboard.objects \
+        .select_related(
+            'category', 'category__category_template',
+            'category__organisation')
+
+
+@app.task
+def refresh_dashboard(dashboard_id):
+    """Refresh the cached data of a single dashboard."""
+    try:
+        dashboard = get_dashboards().get(pk=dashboard_id)
+        refresh_dashboard_data(dashboard)
+    finally:
+        cache.delete(get_lock_key(dashboard_id))
+
+
+@app.task
+def refresh_hot_dashboards():
+    """Refresh the cached data of recently viewed dashboards.
+
+    This task is meant to be run periodically by celery beat, every
+    `DASHBOARDS_CACHE_TTL` seconds, so users viewing those dashboards
+    always get data from cache.
+
+    """
+    dashboard_ids = get_dashboards().values_list('pk', flat=True)
+    hot_ids = get_hot_dashboard_ids(dashboard_ids)
+    for dashboard in get_dashboards().filter(pk__in=hot_ids):
+        logger.info('Refreshing dashboard {}'.format(dashboard.pk))
+        refresh_dashboard_data(dashboard)
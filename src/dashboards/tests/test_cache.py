@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+
+from django.test import TestCase
+from django.core.cache import cache
+
+from categories.factories import CategoryFactory
+from dashboards.models import Dashboard
+from dashboards.dashboards import DashboardProvider
+from dashboards.cache import get_dashboard_data, get_stats
+from search.utils import bump_index_generation
+
+
+class CountingDashboard(DashboardProvider):
+    """Count requests instead of querying Elasticsearch."""
+    queries = 0
+
+    def fetch_data(self):
+        CountingDashboard.queries += 1
+        self.value = CountingDashboard.queries
+
+    def get_headers(self):
+        return ['header']
+
+    def get_buckets(self):
+        return {'row': [self.value]}
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        CountingDashboard.queries = 0
+        self.category = CategoryFactory()
+        self.dashboard = Dashboard.objects.create(
+            title='Dashboard',
+            slug='dashboard',
+            category=self.category,
+            data_provider=CountingDashboard)
+
+    def test_data_is_cached(self):
+        headers, buckets = get_dashboard_data(self.dashboard)
+        self.assertEqual(headers, ['header'])
+        self.assertEqual(buckets, {'row': [1]})
+
+        headers, buckets = get_dashboard_data(self.dashboard)
+        self.assertEqual(buckets, {'row': [1]})
+        self.assertEqual(CountingDashboard.queries, 1)
+        self.assertEqual(get_stats(), {'hits': 1, 'stale': 0, 'misses': 1})
+
+    def test_outdated_data_is_served_and_refreshed(self):
+        get_dashboard_data(self.dashboard)
+        bump_index_generation([self.category.pk])
+
+        # Stale data is returned, the refresh task runs eagerly in tests
+        headers, buckets = get_dashboard_data(self.dashboard)
+        self.assertEqual(buckets, {'row': [1]})
+        self.assertEqual(CountingDashboard.queries, 2)
+
+        headers, buckets = get_dashboard_data(self.dashboard)
+        self.assertEqual(buckets, {'row': [2]})
+        self.assertEqual(get_stats(), {'hits': 1, 'stale': 1, 'misses': 1})
+
+    def test_other_categories_do_not_invalidate_data(self):
+        get_dashboard_data(self.dashboard)
+        bump_index_generation([self.category.pk + 1])
+        get_dashboard_data(self.dashboard)
+        self.assertEqual(CountingDashboard.queries, 1)
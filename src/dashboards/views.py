@@ -6,6 +6,7 @@ from django.views.generic import DetailView
 from braces.views import LoginRequiredMixin
 
 from dashboards.models import Dashboard
+from dashboards.cache import get_dashboard_data
 
 
 class DashboardView(LoginRequiredMixin, DetailView):
@@ -35,9 +36,7 @@ class DashboardView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super(DashboardView, self).get_context_data(**kwargs)
-        self.object.fetch_data()
-        headers = self.object.get_headers()
-        buckets = self.object.get_buckets()
+        headers, buckets = get_dashboard_data(self.object)
 
         context.update({
             'dashboard_active': True,
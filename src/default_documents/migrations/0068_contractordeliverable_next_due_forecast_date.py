@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+
+from datetime import datetime
+
+from django.db import migrations, models
+
+
+def get_next_due_forecast_date(document, statuses):
+    """Same as `ScheduleMixin.get_next_due_forecast_date`."""
+    revision = document.latest_revision
+    status = ((revision.status if revision else None) or '').lower()
+    if status in statuses:
+        statuses = statuses[statuses.index(status) + 1:]
+
+    dates = []
+    for status in statuses:
+        forecast_date = getattr(
+            document, 'status_{}_forecast_date'.format(status), None)
+        actual_date = getattr(
+            document, 'status_{}_actual_date'.format(status), None)
+        if forecast_date is not None and actual_date is None:
+            if isinstance(forecast_date, datetime):
+                forecast_date = forecast_date.date()
+            dates.append(forecast_date)
+
+    return min(dates) if dates else None
+
+
+def fill_next_due_forecast_dates(apps, schema_editor):
+    ContractorDeliverable = apps.get_model(
+        'default_documents', 'ContractorDeliverable')
+    ContractorDeliverableRevision = apps.get_model(
+        'default_documents', 'ContractorDeliverableRevision')
+    ListEntry = apps.get_model('metadata', 'ListEntry')
+
+    if not ContractorDeliverable.objects.exists():
+        return
+
+    list_index = ContractorDeliverableRevision._meta \
+        .get_field('status').list_index
+    statuses = ListEntry.objects \
+        .filter(values_list__index=list_index) \
+        .order_by('order', 'index') \
+        .values_list('index', flat=True)
+    statuses = [status.lower() for status in statuses]
+
+    field_names = set(
+        field.name for field in ContractorDeliverable._meta.fields)
+    fields = ['latest_revision', 'latest_revision__status']
+    for status in statuses:
+        fields += [
+            field for field in (
+                'status_{}_forecast_date'.format(status),
+                'status_{}_actual_date'.format(status))
+            if field in field_names]
+
+    documents = ContractorDeliverable.objects \
+        .select_related('latest_revision') \
+        .only(*fields)
+    for document in documents.iterator():
+        due_date = get_next_due_forecast_date(document, statuses)
+        if due_date is not None:
+            ContractorDeliverable.objects \
+                .filter(pk=document.pk) \
+                .update(next_due_forecast_date=due_date)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('default_documents', '0067_auto_20181213_1529'),
+        ('metadata', '0002_return_code_values'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractordeliverable',
+            name='next_due_forecast_date',
+            field=models.DateField(null=True, verbose_name='Next due forecast date', db_index=True, blank=True, editable=False),
+        ),
+        migrations.RunPython(
+            fill_next_due_forecast_dates, migrations.RunPython.noop),
+    ]
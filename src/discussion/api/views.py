@@ -2,6 +2,7 @@ from rest_framework import viewsets
 from rest_framework import permissions
 from rest_framework.response import Response
 
+from accounts.access import get_request_access
 from documents.models import Document
 from reviews.models import Review
 from discussion.models import Note
@@ -22,7 +23,8 @@ class DiscussionPermission(permissions.BasePermission):
 
         # Read only method, allow all category members
         if request.method in permissions.SAFE_METHODS:
-            authorized = request.user in view.document.category.users.all()
+            access = get_request_access(request)
+            authorized = access.has_category(view.document.category_id)
 
         # Write methods, only distribution list members
         else:
@@ -7,7 +7,7 @@ from django.conf import settings
 
 from accounts.models import User
 from documents.models import Document
-from notifications.models import notify
+from notifications.models import mass_notify
 
 
 mentions_re = re.compile(r'@([\w\-_]+)', re.IGNORECASE)
@@ -66,8 +66,7 @@ class Note(models.Model):
             'revision': int(self.revision)
         }
         users = self.parse_mentions()
-        for user in users:
-            notify(user, message)
+        mass_notify(users, message)
 
     def parse_mentions(self):
         """Get the list of all users mentionned in the message."""
@@ -7,6 +7,8 @@ from django.utils.translation import ugettext_lazy as _
 from django.http import HttpResponse
 from braces.views import LoginRequiredMixin
 
+from accounts.access import get_request_access
+
 from distriblists.forms import (
     DistributionListImportForm, DistributionListExportForm)
 from distriblists.utils import (import_lists, export_lists,
@@ -22,7 +24,7 @@ class BaseListExport(LoginRequiredMixin, FormView):
         kwargs = super(BaseListExport, self).get_form_kwargs()
         kwargs.update({
             'user': self.request.user,
-            'categories': self.request.user_categories
+            'categories': get_request_access(self.request).get_categories_queryset()
         })
         return kwargs
 
@@ -46,7 +48,7 @@ class BaseListImport(LoginRequiredMixin, FormView):
         kwargs = super(BaseListImport, self).get_form_kwargs()
         kwargs.update({
             'user': self.request.user,
-            'categories': self.request.user_categories
+            'categories': get_request_access(self.request).get_categories_queryset()
         })
         return kwargs
 
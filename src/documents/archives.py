@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Zip archives of documents files, built in background.
+
+Archives are stored in the private media directory, and identified by a
+hash of the archived files (and their last modification date), so
+downloading the same selection twice does not build the archive again.
+
+A lock is taken in cache while an archive is being built, so the same
+archive is never built twice at the same time.
+
+"""
+import os
+import time
+import hashlib
+import logging
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+
+from documents.zipstream import ZipStream
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_files_signature(files):
+    """Return the total size and a hash of the given (path, arcname) list."""
+    total_size = 0
+    signature = hashlib.sha1()
+    for path, arcname in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        total_size += stat.st_size
+        signature.update('{}:{}:{}:{}\n'.format(
+            path, arcname, stat.st_size, stat.st_mtime).encode('utf-8'))
+    return total_size, signature.hexdigest()
+
+
+def get_archives_dir(user_id):
+    return os.path.join(
+        settings.PRIVATE_ROOT, settings.DOWNLOADS_SUBDIR, '{}'.format(user_id))
+
+
+def get_archive_path(user_id, archive_id):
+    return os.path.join(get_archives_dir(user_id), '{}.zip'.format(archive_id))
+
+
+def get_archive_url(user_id, archive_id):
+    """Url relative to the private media root."""
+    return '{}/{}/{}.zip'.format(settings.DOWNLOADS_SUBDIR, user_id, archive_id)
+
+
+def get_build_lock_key(user_id, archive_id):
+    return 'archive_build_{}_{}'.format(user_id, archive_id)
+
+
+def lock_archive_build(user_id, archive_id):
+    """Return False if the archive is already being built."""
+    return cache.add(
+        get_build_lock_key(user_id, archive_id), True,
+        settings.DOWNLOADS_BUILD_LOCK_TIMEOUT)
+
+
+def release_archive_build(user_id, archive_id):
+    cache.delete(get_build_lock_key(user_id, archive_id))
+
+
+def clean_archives(user_id):
+    """Delete the user's archives that are too old."""
+    archives_dir = get_archives_dir(user_id)
+    if not os.path.isdir(archives_dir):
+        return
+
+    clean_before = time.time() - settings.DOWNLOADS_VALIDITY_DURATION
+    for filename in os.listdir(archives_dir):
+        filepath = os.path.join(archives_dir, filename)
+        if os.path.getmtime(filepath) < clean_before:
+            logger.info('Removing archive {}'.format(filepath))
+            os.remove(filepath)
+
+
+def build_archive(user_id, archive_id, files):
+    """Write the zip archive to the private media directory."""
+    filepath = get_archive_path(user_id, archive_id)
+    if os.path.exists(filepath):
+        return filepath
+
+    clean_archives(user_id)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+    # Write to a unique temporary file, so a partial archive is never
+    # served, and concurrent builds don't write to the same file
+    fd, tmp_path = tempfile.mkstemp(
+        suffix='.part', dir=os.path.dirname(filepath))
+    try:
+        with os.fdopen(fd, 'wb') as archive:
+            for chunk in ZipStream(files):
+                archive.write(chunk)
+        os.chmod(tmp_path, settings.FILE_UPLOAD_PERMISSIONS)
+        os.rename(tmp_path, filepath)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return filepath
@@ -1,9 +1,14 @@
 from collections import OrderedDict
+from functools import lru_cache
 
 from django import forms
 from django.conf import settings
+from django.core.cache import cache
+from django.forms.models import apply_limit_choices_to_to_formfield
 from django.utils.translation import ugettext_lazy as _
 
+from metadata.handlers import VALUES_LIST_VERSION_KEY
+
 
 class BaseDocumentFilterForm(forms.Form):
     """Base form for filtering documents of any type."""
@@ -63,7 +68,15 @@ def filterform_factory(model):
     Filter fields can be either located in the Metadata class, or in the
     corresponding Revision class.
 
+    Generated classes are cached until values lists (used as choices) are
+    modified.
+
     """
+    return build_filterform(model, cache.get(VALUES_LIST_VERSION_KEY))
+
+
+@lru_cache(maxsize=64)
+def build_filterform(model, values_list_version):
     revision_model = model.latest_revision.get_queryset().model
     all_fields = dict((field.name, field) for field in (
         model._meta.concrete_fields + revision_model._meta.concrete_fields))
@@ -88,7 +101,12 @@ def filterform_factory(model):
             field.required = False
             field.empty_value = None
             field.initial = ''
-            field.choices = f.get_choices(include_blank=True)
+            # Foreign keys choices are fetched from the queryset each time
+            # the form is displayed, so they are never outdated
+            if isinstance(field, forms.ModelChoiceField):
+                apply_limit_choices_to_to_formfield(field)
+            else:
+                field.choices = f.get_choices(include_blank=True)
             field_list.append((f.name, field))
         else:
             field = additional_filter_fields[field_name]
@@ -128,3 +146,7 @@ def filterform_factory(model):
         form.base_fields = OrderedDict(
             (k, form.base_fields[k]) for k in fields_order)
     return form
+
+
+def clear_filterforms_cache():
+    build_filterform.cache_clear()
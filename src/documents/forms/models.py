@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
 
+import logging
+
 from django import forms
+from django.db import DatabaseError
 from django.core.urlresolvers import reverse
 from django.utils.translation import ugettext_lazy as _
 from django.core.exceptions import ImproperlyConfigured
@@ -15,12 +18,15 @@ from metadata.fields import ConfigurableChoiceField
 from django.conf import settings
 
 
-def documentform_factory(model):
-    """Gets the given model edition form.
+logger = logging.getLogger(__name__)
 
-    We are looking for the form class in all installed apps.
 
-    """
+# Document form classes, indexed by model
+_form_classes = {}
+
+
+def find_form_class(model):
+    """Look for the given model edition form in all installed apps."""
     form_class_name = '%sForm' % model.__name__
     apps = settings.INSTALLED_APPS
     DocumentForm = None
@@ -40,6 +46,52 @@ def documentform_factory(model):
     return DocumentForm
 
 
+def documentform_factory(model):
+    """Gets the given model edition form.
+
+    The form class is only looked up once per model.
+
+    """
+    try:
+        return _form_classes[model]
+    except KeyError:
+        DocumentForm = find_form_class(model)
+        _form_classes[model] = DocumentForm
+        return DocumentForm
+
+
+def clear_form_classes_cache():
+    _form_classes.clear()
+
+
+def warm_up_forms():
+    """Generate the edition and filter forms of all document models.
+
+    This is meant to be called when a worker process starts, so the first
+    requests don't have to pay the cost.
+
+    """
+    from django.apps import apps
+    from documents.models import Metadata, MetadataRevisionBase
+    from documents.forms.filters import filterform_factory
+
+    for model in apps.get_models():
+        if not issubclass(model, (Metadata, MetadataRevisionBase)):
+            continue
+
+        try:
+            documentform_factory(model)
+        except ImproperlyConfigured:
+            logger.warning('No form class found for {}'.format(model.__name__))
+
+        if issubclass(model, Metadata):
+            try:
+                filterform_factory(model)
+            except DatabaseError:
+                logger.exception('Cannot generate the filter form of {}'.format(
+                    model.__name__))
+
+
 class SameCategoryRelatedDocument(object):
     """Form mixin used to limit related documents choices to those belonging to
      the same category."""
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Trigram indexes for substring searches on document keys and titles.
+
+`icontains` lookups are translated into `UPPER(field) LIKE UPPER('%term%')`
+queries, so indexes are built on the same expressions.
+
+Creating the `pg_trgm` extension requires extra privileges (see the
+deployment docs).
+
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations, transaction, DatabaseError
+
+
+INDEXES = (
+    ('documents_document_key_trgm', 'document_key'),
+    ('documents_document_title_trgm', 'title'),
+)
+
+
+def create_extension(schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            return
+
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute('CREATE EXTENSION pg_trgm')
+    except DatabaseError as e:
+        raise ImproperlyConfigured(
+            'The pg_trgm extension could not be created ({}). Ask a '
+            'database superuser to run `CREATE EXTENSION pg_trgm;` on the '
+            '"{}" database, then run the migrations again.'.format(
+                str(e).strip(), connection.settings_dict['NAME']))
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    create_extension(schema_editor)
+    for name, column in INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX {} ON documents_document '
+            'USING gin (UPPER({}) gin_trgm_ops)'.format(name, column))
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _ in INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS {}'.format(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_auto_20160607_1650'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,7 +1,5 @@
 # -*- coding: utf-8 -*-
 import logging
-import os
-import zipfile
 import tempfile
 from collections import OrderedDict
 
@@ -18,7 +16,7 @@ from accounts.models import User
 from documents.fields import RevisionFileField
 from categories.models import Category
 from documents.templatetags.documents import MenuItem, DividerMenuItem
-import collections
+from documents.zipstream import ZipStream
 
 logger = logging.getLogger(__name__)
 
@@ -346,43 +344,59 @@ class Metadata(six.with_metaclass(MetadataBase, models.Model)):
         return DocumentDownloadForm(data, queryset=queryset)
 
     @classmethod
-    def compress_documents(cls, documents, **kwargs):
-        """Compress the given files' documents (or queryset) in a zip file.
+    def get_download_revisions(cls, documents, revisions='latest'):
+        """Return the (document, revision) pairs of the given documents.
+
+        All revisions are fetched in a single query. Documents without any
+        revision are skipped.
+
+        """
+        if revisions == 'all':
+            qs = cls.get_revision_class().objects \
+                .filter(metadata__document__in=documents) \
+                .select_related('metadata__document') \
+                .order_by('metadata__document_id', '-id')
+            return [(rev.metadata.document, rev) for rev in qs]
+
+        qs = cls.objects \
+            .filter(document__in=documents) \
+            .filter(latest_revision__isnull=False) \
+            .select_related('document', 'latest_revision')
+        return [(meta.document, meta.latest_revision) for meta in qs]
+
+    @classmethod
+    def get_download_files(cls, documents, **kwargs):
+        """List the files to download for the given documents.
 
         * format can be either 'both', 'native' or 'pdf'
         * revisions can be either 'latest' or 'all'
 
-        Returns the name of the ziped file.
+        Returns a list of (path, name in archive) tuples.
         """
         format = kwargs.pop('format', 'both')
         revisions = kwargs.pop('revisions', 'latest')
-        temp_file = tempfile.TemporaryFile()
 
-        with zipfile.ZipFile(temp_file, mode='w') as zip_file:
-            files = []
-            for document in documents:
-                if revisions == 'latest':
-                    revs = [document.latest_revision]
-                elif revisions == 'all':
-                    revs = document.get_all_revisions()
-
-                for rev in revs:
-                    if rev is not None:
-                        if format in ('native', 'both'):
-                            files.append(rev.native_file)
-                        if format in ('pdf', 'both'):
-                            files.append(rev.pdf_file)
-
-            for file_ in files:
-                if file_.name:
-                    if os.path.isfile(file_.path):
-                        zip_file.write(
-                            file_.path,
-                            file_.name,
-                            compress_type=zipfile.ZIP_DEFLATED)
-                    else:
-                        msg = "Can't serve %s, the file is missing"
-                        logger.error(msg % file_.name)
+        files = []
+        for document, rev in cls.get_download_revisions(documents, revisions):
+            if format in ('native', 'both'):
+                files.append(rev.native_file)
+            if format in ('pdf', 'both'):
+                files.append(rev.pdf_file)
+
+        return [(file_.path, file_.name) for file_ in files if file_.name]
+
+    @classmethod
+    def compress_documents(cls, documents, **kwargs):
+        """Compress the given files' documents (or queryset) in a zip file.
+
+        See `get_download_files` for the available options.
+
+        Returns the ziped file.
+        """
+        temp_file = tempfile.TemporaryFile()
+        files = cls.get_download_files(documents, **kwargs)
+        for chunk in ZipStream(files):
+            temp_file.write(chunk)
         return temp_file
 
 
@@ -491,67 +505,12 @@ class MetadataRevisionBase(models.Model):
 
         Suitable for indexing in ES, for example.
 
-        The first element of the list is the linkified document number.
-
-        If a value is a Model instance (e.g a foreign key), we return both it's
-        unicode and id values.
+        See `documents.serialization.RevisionSerializer`. When serializing
+        many revisions, use the serializer directly.
         """
-        fields = tuple()
-        metadata = self.metadata
-        document = metadata.document
-
-        def add_to_fields(key):
-            # Search the value of `key` in the revision, metadata and document,
-            # in that order. If not found, raise an exception.
-            # Note that the value can be "None" so careful with have to
-            # explicitely catch the AttributeError exception
-            try:
-                value = getattr(self, key)
-            except AttributeError:
-                try:
-                    value = getattr(metadata, key)
-                except AttributeError:
-                    try:
-                        value = getattr(document, key)
-                    except AttributeError:
-                        error = 'Cannot find field {} in doc {} ({})'.format(
-                            key, document.document_key, document.document_type())
-                        raise RuntimeError(error)
-
-            if isinstance(value, collections.Callable):
-                value = value()
-
-            if isinstance(value, models.Model):
-                field = (
-                    (str(key), value.__str__()),
-                    ('%s_id' % key, value.pk)
-                )
-            else:
-                field = ((str(key), value),)
-
-            return field
-
-        config = document.category.document_class().PhaseConfig
-        filter_fields = list(config.filter_fields)
-        column_fields = list(dict(config.column_fields).values())
-        indexable_fields = getattr(config, 'indexable_fields', [])
-        fields_to_index = set(filter_fields + column_fields + indexable_fields)
-
-        for field in fields_to_index:
-            fields += add_to_fields(field)
-
-        fields_infos = dict(fields)
-        fields_infos.update({
-            'url': document.get_absolute_url(),
-            'document_key': document.document_key,
-            'document_number': document.document_number,
-            'document_pk': document.pk,
-            'metadata_pk': metadata.pk,
-            'pk': self.pk,
-            'revision': self.revision,
-            'is_latest_revision': document.current_revision == self.revision,
-        })
-        return fields_infos
+        from documents.serialization import get_revision_serializer
+        serializer = get_revision_serializer(self.document.category)
+        return serializer.to_json(self)
 
     def get_initial_ignored_fields(self):
         """New revision initial data that must stay default."""
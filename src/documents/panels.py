@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Rendered revision panels of the document detail page.
+
+Building and rendering a read-only revision form is expensive, and old
+revisions are almost never modified, so rendered panels are cached.
+
+The cache key changes whenever the revision is saved, a values list is
+modified, or a remark is posted. The panel also depends on the user
+(e.g discussion buttons), so panels are cached per user.
+
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+
+from discussion.utils import get_discussion_length
+from metadata.handlers import VALUES_LIST_VERSION_KEY
+
+
+def get_revision_panel_key(revision, user):
+    parts = (
+        revision._meta.label_lower,
+        revision.pk,
+        revision.updated_on.isoformat(),
+        cache.get(VALUES_LIST_VERSION_KEY),
+        get_discussion_length(revision),
+        get_language(),
+        user.pk,
+    )
+    signature = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return 'revision_panel_{}'.format(signature)
+
+
+def render_revision_panel(revision, form_class, category, request):
+    """Return the html of the revision read-only form."""
+    key = get_revision_panel_key(revision, request.user)
+    html = cache.get(key)
+    if html is None:
+        form = form_class(
+            instance=revision,
+            request=request,
+            category=category,
+            read_only=True)
+        html = render_to_string(
+            'documents/revision_panel.html', {'form': form}, request=request)
+        cache.set(key, html, settings.REVISION_PANEL_CACHE_TTL)
+    return html
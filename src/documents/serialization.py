@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+import types
+import inspect
+from functools import lru_cache
+
+from django.db import models
+from django.core.exceptions import FieldDoesNotExist
+from django.core.urlresolvers import reverse
+
+
+# Placeholder used to reverse the document url once per category
+URL_KEY_PLACEHOLDER = '__document_key__'
+
+# Relations that are always needed to serialize a revision
+BASE_SELECT_RELATED = (
+    'metadata__document__category__organisation',
+    'metadata__document__category__category_template',
+    'metadata__latest_revision',
+)
+
+# Where field values are looked for, in that order
+OWNERS = ('revision', 'metadata', 'document')
+OWNER_PATHS = {
+    'revision': '',
+    'metadata': 'metadata__',
+    'document': 'metadata__document__',
+}
+
+# Field kinds
+VALUE, RELATION, METHOD, UNKNOWN = 'value', 'relation', 'method', 'unknown'
+METHOD_TYPES = (types.FunctionType, staticmethod, classmethod)
+
+_missing = object()
+
+
+class FieldPlan(object):
+    """Precomputed resolution of fields scattered across a revision.
+
+    A field value can be located in the revision, the metadata or the
+    document, in that order. Instead of walking those three objects with
+    `getattr` for every single field of every single revision, we find out
+    once per revision class which model owns each field, and if it's a
+    foreign key or a method.
+
+    `select_related` lists the relations that must be fetched so a
+    revision can be serialized without additional queries.
+
+    If a `default` value is given, it is used for fields that cannot be
+    found. Otherwise, a `RuntimeError` is raised.
+
+    """
+    def __init__(self, revision_class, fields, default=_missing):
+        from documents.models import Document
+        self.revision_class = revision_class
+        self.default = default
+        self.metadata_class = revision_class._meta.get_field('metadata').rel.to
+        self.classes = dict(zip(OWNERS, (
+            revision_class, self.metadata_class, Document)))
+
+        self.fields = list(fields)
+        self.steps = [self.compile_field(name) for name in self.fields]
+
+        select_related = list(BASE_SELECT_RELATED)
+        for name, owner, kind in self.steps:
+            if kind == RELATION:
+                select_related.append('{}{}'.format(OWNER_PATHS[owner], name))
+        self.select_related = select_related
+
+    def compile_field(self, name):
+        """Returns a (name, owner, kind) tuple."""
+        for owner in OWNERS:
+            model_class = self.classes[owner]
+            try:
+                field = model_class._meta.get_field(name)
+                if field.is_relation and field.concrete and \
+                        (field.many_to_one or field.one_to_one):
+                    return (name, owner, RELATION)
+                elif field.concrete:
+                    return (name, owner, VALUE)
+            except FieldDoesNotExist:
+                pass
+
+            attr = inspect.getattr_static(model_class, name, _missing)
+            if attr is not _missing:
+                kind = METHOD if isinstance(attr, METHOD_TYPES) else VALUE
+                return (name, owner, kind)
+
+        # The attribute is not defined on the classes (e.g set on instances)
+        # so we will have to walk the objects at runtime
+        return (name, None, UNKNOWN)
+
+    def select_related_from(self, prefix):
+        """Select related paths relative to a model pointing to the revision.
+
+        e.g `select_related_from('latest_revision')` for a metadata queryset.
+
+        """
+        return ['{}__{}'.format(prefix, path) for path in self.select_related]
+
+    def get_owners(self, revision):
+        metadata = revision.metadata
+        return {
+            'revision': revision,
+            'metadata': metadata,
+            'document': metadata.document,
+        }
+
+    def get_values(self, revision):
+        """Yields (field_name, kind, value) for every field in the plan."""
+        owners = self.get_owners(revision)
+        for name, owner, kind in self.steps:
+            if kind == UNKNOWN:
+                value = self.walk(owners, name)
+            else:
+                value = getattr(owners[owner], name)
+
+            # Attributes and methods can be configured
+            if callable(value):
+                value = value()
+            yield name, kind, value
+
+    def walk(self, owners, name):
+        """Slow path, look for the attribute in every object."""
+        for owner in OWNERS:
+            try:
+                return getattr(owners[owner], name)
+            except AttributeError:
+                continue
+
+        if self.default is not _missing:
+            return self.default
+
+        document = owners['document']
+        error = 'Cannot find field {} in doc {} ({})'.format(
+            name, document.document_key, document.document_type())
+        raise RuntimeError(error)
+
+
+def get_index_fields(document_class):
+    """List fields that must be indexed for the given document class."""
+    config = document_class.PhaseConfig
+    filter_fields = list(config.filter_fields)
+    column_fields = list(dict(config.column_fields).values())
+    indexable_fields = getattr(config, 'indexable_fields', [])
+    return set(filter_fields + column_fields + indexable_fields)
+
+
+@lru_cache()
+def get_index_field_plan(revision_class):
+    """Return the (cached) plan of indexed fields for a revision class."""
+    metadata_class = revision_class._meta.get_field('metadata').rel.to
+    return FieldPlan(revision_class, get_index_fields(metadata_class))
+
+
+def prepare_queryset(qs):
+    """Fetch all relations required to serialize the revisions."""
+    plan = get_index_field_plan(qs.model)
+    return qs.select_related(*plan.select_related)
+
+
+class RevisionSerializer(object):
+    """Converts revisions of a single category to json.
+
+    Everything that does not depend on the revision itself (field plan,
+    document url pattern, document type) is computed once.
+
+    """
+    def __init__(self, category):
+        self.category = category
+        self.plan = get_index_field_plan(category.revision_class())
+        self.document_type = category.document_type()
+        self.url_template = reverse('document_detail', args=[
+            category.organisation.slug,
+            category.slug,
+            URL_KEY_PLACEHOLDER])
+
+    def to_json(self, revision):
+        """Converts the revision to a json representation.
+
+        If a value is a Model instance (e.g a foreign key), we return both it's
+        unicode and id values.
+
+        """
+        metadata = revision.metadata
+        document = metadata.document
+
+        fields_infos = {}
+        for name, kind, value in self.plan.get_values(revision):
+            if isinstance(value, models.Model):
+                fields_infos[name] = value.__str__()
+                fields_infos['%s_id' % name] = value.pk
+            else:
+                fields_infos[name] = value
+
+        fields_infos.update({
+            'url': self.url_template.replace(
+                URL_KEY_PLACEHOLDER, document.document_key),
+            'document_key': document.document_key,
+            'document_number': document.document_number,
+            'document_pk': document.pk,
+            'metadata_pk': metadata.pk,
+            'pk': revision.pk,
+            'revision': revision.revision,
+            'is_latest_revision': document.current_revision == revision.revision,
+        })
+        return fields_infos
+
+    def serialize(self, revisions):
+        return [self.to_json(revision) for revision in revisions]
+
+
+_serializers = {}
+
+
+def get_revision_serializer(category):
+    """Return the cached serializer for the given category.
+
+    Document urls depend on the organisation and category slugs, so they
+    are part of the key. Serializers are also dropped when a category is
+    saved (see `search.signals`).
+
+    """
+    key = (category.pk, category.organisation.slug, category.slug)
+    if key not in _serializers:
+        _serializers[key] = RevisionSerializer(category)
+    return _serializers[key]
+
+
+def clear_revision_serializers():
+    _serializers.clear()
+
+
+def clear_serializers_cache():
+    clear_revision_serializers()
+    get_index_field_plan.cache_clear()
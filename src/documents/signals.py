@@ -9,3 +9,6 @@ document_form_saved = Signal(
 document_created = Signal(providing_args=['document', 'metadata', 'revision'])
 document_revised = Signal(providing_args=['document', 'metadata', 'revision'])
 revision_edited = Signal(providing_args=['document', 'metadata', 'revision'])
+
+# Sent when documents are updated in bulk, without calling `Document.save`
+documents_updated = Signal(providing_args=['document_ids'])
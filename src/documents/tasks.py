@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+
+from django.core.urlresolvers import reverse
+from django.utils.translation import ugettext as _
+
+from core.celery import app
+from documents.archives import build_archive, release_archive_build
+from notifications.models import notify
+
+
+@app.task
+def build_download_archive(user_id, archive_id, files):
+    """Build a large download archive and notify the user once it's done."""
+    try:
+        build_archive(user_id, archive_id, files)
+    finally:
+        release_archive_build(user_id, archive_id)
+    url = reverse('archive_download', args=[archive_id])
+    message = _('The archive you requested is ready. '
+                '<a href="{}">Download it</a>').format(url)
+    notify(user_id, message)
@@ -16,7 +16,9 @@ from default_documents.models import DemoMetadataRevision, \
 from documents.factories import DocumentFactory
 from documents.models import Document
 
-from ..forms.filters import filterform_factory
+from metadata.handlers import populate_values_list_cache
+from ..forms.filters import filterform_factory, clear_filterforms_cache
+from ..forms.models import documentform_factory
 
 
 class DocumentCreateTest(TestCase):
@@ -552,6 +554,8 @@ class FilterFormTest(TestCase):
         # Adding this attribute to the model because we do not have any model
         # using this option at the moment
         doc.PhaseConfig.filter_fields_order = fields_order
+        clear_filterforms_cache()
+        self.addCleanup(clear_filterforms_cache)
         form = filterform_factory(doc)()
 
         # We make alist from field ordered dict keys and get rid of the first
@@ -561,3 +565,19 @@ class FilterFormTest(TestCase):
 
         # Checking fields are in the right order
         self.assertEqual(form_fields, fields_order)
+
+    def test_filterform_is_cached(self):
+        FilterForm = filterform_factory(ContractorDeliverable)
+        self.assertIs(filterform_factory(ContractorDeliverable), FilterForm)
+
+    def test_filterform_is_rebuilt_when_values_lists_change(self):
+        FilterForm = filterform_factory(ContractorDeliverable)
+        populate_values_list_cache()
+        self.assertIsNot(filterform_factory(ContractorDeliverable), FilterForm)
+
+
+class DocumentFormFactoryTest(TestCase):
+    def test_form_class_is_cached(self):
+        FormClass = documentform_factory(ContractorDeliverable)
+        self.assertEqual(FormClass.__name__, 'ContractorDeliverableForm')
+        self.assertIs(documentform_factory(ContractorDeliverable), FormClass)
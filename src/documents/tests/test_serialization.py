@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+
+from django.test import TestCase
+from django.contrib.contenttypes.models import ContentType
+
+from accounts.factories import UserFactory
+from categories.factories import CategoryFactory
+from documents.factories import DocumentFactory
+from documents.serialization import (
+    FieldPlan, get_revision_serializer, prepare_queryset, RELATION, METHOD,
+    VALUE)
+from default_documents.factories import (
+    ContractorDeliverableFactory, ContractorDeliverableRevisionFactory)
+from default_documents.models import (
+    ContractorDeliverable, ContractorDeliverableRevision)
+
+
+class FieldPlanTests(TestCase):
+    def test_field_owners(self):
+        plan = FieldPlan(ContractorDeliverableRevision, [
+            'status', 'title', 'document_number', 'leader', 'is_existing',
+            'current_revision', 'get_first_revision_number'])
+        steps = dict((name, (owner, kind)) for name, owner, kind in plan.steps)
+        self.assertEqual(steps['status'], ('revision', VALUE))
+        self.assertEqual(steps['title'], ('metadata', VALUE))
+        self.assertEqual(steps['document_number'], ('metadata', VALUE))
+        self.assertEqual(steps['leader'], ('revision', RELATION))
+        self.assertEqual(steps['is_existing'], ('metadata', VALUE))
+        self.assertEqual(steps['get_first_revision_number'], ('revision', METHOD))
+        self.assertEqual(steps['current_revision'], ('metadata', VALUE))
+        self.assertIn('leader', plan.select_related)
+
+
+class RevisionSerializerTests(TestCase):
+    def setUp(self):
+        Model = ContentType.objects.get_for_model(ContractorDeliverable)
+        self.category = CategoryFactory(category_template__metadata_model=Model)
+        leader = UserFactory(name='Grand Schtroumpf', category=self.category)
+        self.docs = [
+            DocumentFactory(
+                metadata_factory_class=ContractorDeliverableFactory,
+                revision_factory_class=ContractorDeliverableRevisionFactory,
+                revision={'leader': leader},
+                category=self.category)
+            for i in range(0, 5)]
+
+    def test_same_result_as_revision_to_json(self):
+        serializer = get_revision_serializer(self.category)
+        revision = self.docs[0].get_latest_revision()
+        json = serializer.to_json(revision)
+        self.assertEqual(json['leader'], 'Grand Schtroumpf')
+        self.assertEqual(json['url'], self.docs[0].get_absolute_url())
+        self.assertEqual(json['document_key'], self.docs[0].document_key)
+        self.assertTrue(json['is_latest_revision'])
+
+    def test_serialize_chunk_without_n_plus_one(self):
+        serializer = get_revision_serializer(self.category)
+        qs = ContractorDeliverableRevision.objects \
+            .filter(metadata__document__category=self.category)
+        qs = prepare_queryset(qs)
+
+        # One query to fetch the revisions, the rest is method calls
+        # which may not depend on the number of revisions
+        with self.assertNumQueries(1):
+            data = serializer.serialize(qs)
+        self.assertEqual(len(data), 5)
+
+    def test_serializers_are_dropped_when_slugs_change(self):
+        serializer = get_revision_serializer(self.category)
+
+        template = self.category.category_template
+        template.slug = 'renamed-category'
+        template.save()
+
+        new_serializer = get_revision_serializer(self.category)
+        self.assertIsNot(new_serializer, serializer)
+        self.assertIn('renamed-category', new_serializer.url_template)
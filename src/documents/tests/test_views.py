@@ -7,11 +7,14 @@ from zipfile import ZipFile
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse
 from django.test import TestCase, override_settings
 from django.test.client import Client
 
+from mock import patch
+
 from accounts.factories import UserFactory
 from audit_trail.models import Activity
 from categories.factories import CategoryFactory
@@ -19,6 +22,7 @@ from default_documents.factories import MetadataRevisionFactory
 from default_documents.models import DemoMetadata, DemoMetadataRevision
 from documents.factories import DocumentFactory
 from documents.models import Document
+from documents.panels import get_revision_panel_key
 
 
 class GenericViewTest(TestCase):
@@ -116,6 +120,56 @@ class DocumentDetailTest(TestCase):
         self.assertContains(res, 'HAZOP-related-2')
 
 
+class RevisionPanelTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = CategoryFactory()
+        self.user = UserFactory(
+            name='User',
+            password='pass',
+            is_superuser=True,
+            category=self.category)
+        self.client.login(username=self.user.email, password='pass')
+        self.doc = DocumentFactory(category=self.category)
+        self.old_revision = MetadataRevisionFactory(
+            metadata=self.doc.get_metadata(),
+            revision=2)
+        MetadataRevisionFactory(
+            metadata=self.doc.get_metadata(),
+            revision=3)
+
+    def get_panel_url(self, revision):
+        return reverse('document_revision_panel', args=[
+            self.category.organisation.slug,
+            self.category.slug,
+            self.doc.document_key,
+            revision])
+
+    def test_only_latest_revision_is_rendered(self):
+        url = reverse('document_detail', args=[
+            self.category.organisation.slug,
+            self.category.slug,
+            self.doc.document_key])
+        res = self.client.get(url)
+        self.assertContains(res, 'data-url="{}"'.format(self.get_panel_url(2)))
+        self.assertNotContains(res, 'data-url="{}"'.format(self.get_panel_url(3)))
+
+    def test_panel_is_cached(self):
+        res = self.client.get(self.get_panel_url(2))
+        self.assertEqual(res.status_code, 200)
+
+        key = get_revision_panel_key(self.old_revision, self.user)
+        self.assertEqual(cache.get(key), res.content.decode())
+
+        self.old_revision.save()
+        new_key = get_revision_panel_key(self.old_revision, self.user)
+        self.assertNotEqual(key, new_key)
+
+    def test_unknown_revision(self):
+        res = self.client.get(self.get_panel_url(42))
+        self.assertEqual(res.status_code, 404)
+
+
 class DocumentDownloadTest(TestCase):
     def setUp(self):
         # Login as admin so we won't be bothered by missing permissions
@@ -164,6 +218,28 @@ class DocumentDownloadTest(TestCase):
             'Content-Disposition',
             'attachment; filename=download.zip'))
 
+    def test_download_document_without_revision(self):
+        document = DocumentFactory(
+            category=self.category,
+            revision={
+                'native_file': SimpleUploadedFile('native.docx', b'content'),
+                'pdf_file': SimpleUploadedFile('file.pdf', b'content'),
+            }
+        )
+        no_revision = DocumentFactory(category=self.category)
+        DemoMetadata.objects \
+            .filter(document=no_revision) \
+            .update(latest_revision=None)
+
+        r = self.client.post(self.download_url, {
+            'document_ids': [document.id, no_revision.id],
+            'revisions': 'latest',
+            'format': 'both',
+        })
+        self.assertEqual(r.status_code, 200)
+        zipfile = BytesIO(b''.join(r.streaming_content))
+        self.assertEqual(len(ZipFile(zipfile).namelist()), 2)
+
     def test_empty_document_download(self):
         """
         Tests that a document download returns an empty zip file.
@@ -178,8 +254,8 @@ class DocumentDownloadTest(TestCase):
             'format': 'both',
         })
         self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(b''.join(r.streaming_content)), 22)
         self.assertDictEqual(r._headers, {
-            'content-length': ('Content-Length', '22'),
             'content-type': ('Content-Type', 'application/zip'),
             'vary': ('Vary', 'Cookie'),
             'x-frame-options': ('X-Frame-Options', 'SAMEORIGIN'),
@@ -219,10 +295,54 @@ class DocumentDownloadTest(TestCase):
         })
         self.assertEqual(r.status_code, 200)
 
-        zipfile = BytesIO(r.content)
+        zipfile = BytesIO(b''.join(r.streaming_content))
         filelist = ZipFile(zipfile).namelist()
         self.assertEqual(len(filelist), 4)
 
+    @override_settings(DOWNLOADS_ASYNC_SIZE=0)
+    def test_large_download_is_built_in_background(self):
+        document = DocumentFactory(
+            category=self.category,
+            revision={
+                'native_file': SimpleUploadedFile('native.docx', b'content'),
+                'pdf_file': SimpleUploadedFile('file.pdf', b'content'),
+            }
+        )
+        data = {
+            'document_ids': document.id,
+            'revisions': 'latest',
+            'format': 'both',
+        }
+        r = self.client.post(self.download_url, data)
+        self.assertRedirects(r, self.category.get_absolute_url())
+
+        # The archive was built by the (eager) task, it's served right away
+        r = self.client.post(self.download_url, data)
+        self.assertEqual(r.status_code, 302)
+        r = self.client.get(r.url)
+        self.assertEqual(r.status_code, 200)
+        zipfile = BytesIO(b''.join(r.streaming_content))
+        self.assertEqual(len(ZipFile(zipfile).namelist()), 2)
+
+    @override_settings(DOWNLOADS_ASYNC_SIZE=0)
+    def test_archive_is_not_built_twice(self):
+        document = DocumentFactory(
+            category=self.category,
+            revision={
+                'native_file': SimpleUploadedFile('native.docx', b'content'),
+                'pdf_file': SimpleUploadedFile('file.pdf', b'content'),
+            }
+        )
+        data = {
+            'document_ids': document.id,
+            'revisions': 'latest',
+            'format': 'both',
+        }
+        with patch('documents.views.build_download_archive.delay') as build_mock:
+            self.client.post(self.download_url, data)
+            self.client.post(self.download_url, data)
+        self.assertEqual(build_mock.call_count, 1)
+
 
 class DocumentReviseTests(TestCase):
     def setUp(self):
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from zipfile import ZipFile, ZIP_STORED, ZIP_DEFLATED
+
+from django.test import SimpleTestCase
+
+from documents.zipstream import ZipStream
+
+
+class ZipStreamTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def create_file(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def build_zip(self, files):
+        return ZipFile(BytesIO(b''.join(ZipStream(files, chunk_size=16))))
+
+    def test_empty_archive(self):
+        archive = self.build_zip([])
+        self.assertEqual(archive.namelist(), [])
+
+    def test_archive_content(self):
+        content = b'Schtroumpf ' * 1000
+        native = self.create_file('native.txt', content)
+        pdf = self.create_file('file.pdf', content)
+        archive = self.build_zip([
+            (native, 'native.txt'),
+            (pdf, 'subdir/file.pdf'),
+            ('/does/not/exist.pdf', 'missing.pdf'),
+        ])
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), ['native.txt', 'subdir/file.pdf'])
+        self.assertEqual(archive.read('native.txt'), content)
+        self.assertEqual(archive.read('subdir/file.pdf'), content)
+
+        # Already compressed formats are stored as is
+        self.assertEqual(archive.getinfo('native.txt').compress_type, ZIP_DEFLATED)
+        self.assertEqual(archive.getinfo('subdir/file.pdf').compress_type, ZIP_STORED)
@@ -3,7 +3,8 @@ from django.conf.urls import url
 from documents.views import (
     DocumentList, DocumentCreate, DocumentDetail, DocumentEdit,
     DocumentDownload, DocumentRedirect, DocumentRevise, DocumentDelete,
-    DocumentRevisionDelete, RevisionFileDownload, DocumentFileDownload
+    DocumentRevisionDelete, RevisionFileDownload, DocumentFileDownload,
+    ArchiveDownload, RevisionPanel
 )
 
 urlpatterns = [
@@ -14,6 +15,9 @@ urlpatterns = [
         name='document_short_url'),
 
     # Downloads
+    url(r'^downloads/(?P<archive_id>[0-9a-f]{40})/$',
+        ArchiveDownload.as_view(),
+        name='archive_download'),
     url(r'^(?P<organisation>[\w-]+)/(?P<category>[\w-]+)/download/$',
         DocumentDownload.as_view(),
         name="document_download"),
@@ -43,6 +47,9 @@ urlpatterns = [
     url(r'^(?P<organisation>[\w-]+)/(?P<category>[\w-]+)/(?P<document_key>[\w-]+)/revision_delete/$',
         DocumentRevisionDelete.as_view(),
         name="document_revision_delete"),
+    url(r'^(?P<organisation>[\w-]+)/(?P<category>[\w-]+)/(?P<document_key>[\w-]+)/panels/(?P<revision>\d+)/$',
+        RevisionPanel.as_view(),
+        name="document_revision_panel"),
     url(r'^(?P<organisation>[\w-]+)/(?P<category>[\w-]+)/(?P<document_key>[\w-]+)/(?P<revision>\d+)/(?P<field_name>\w+)/$',
         RevisionFileDownload.as_view(),
         name="revision_file_download"),
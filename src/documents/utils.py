@@ -7,6 +7,7 @@ from django.utils import timezone
 from django.db import transaction
 
 from documents import signals
+from search.queue import coalesce_indexing
 
 
 def save_document_forms(metadata_form, revision_form, category, rewrite_schedule=True, **doc_kwargs):
@@ -29,27 +30,29 @@ def save_document_forms(metadata_form, revision_form, category, rewrite_schedule
         raise RuntimeError('Revision form MUST be valid. \
                            ({})'.format(revision_form.errors))
 
-    revision = revision_form.save(commit=False)
-    metadata = metadata_form.save(commit=False)
-
-    # Those three functions could be regrouped, but they form
-    # an if / else russian mountain
-    if metadata.pk is None:
-        doc, meta, rev = create_document_from_forms(
-            metadata_form, revision_form, category, **doc_kwargs)
-    elif revision.pk is None:
-        doc, meta, rev = create_revision_from_forms(
-            metadata_form, revision_form, category)
-    else:
-        doc, meta, rev = update_revision_from_forms(
-            metadata_form, revision_form, category)
+    # The document can be saved several times, we want to index it once
+    with coalesce_indexing():
+        revision = revision_form.save(commit=False)
+        metadata = metadata_form.save(commit=False)
 
-    signals.document_form_saved.send(
-        document=doc,
-        metadata=meta,
-        revision=rev,
-        rewrite_schedule=rewrite_schedule,
-        sender=doc.__class__)
+        # Those three functions could be regrouped, but they form
+        # an if / else russian mountain
+        if metadata.pk is None:
+            doc, meta, rev = create_document_from_forms(
+                metadata_form, revision_form, category, **doc_kwargs)
+        elif revision.pk is None:
+            doc, meta, rev = create_revision_from_forms(
+                metadata_form, revision_form, category)
+        else:
+            doc, meta, rev = update_revision_from_forms(
+                metadata_form, revision_form, category)
+
+        signals.document_form_saved.send(
+            document=doc,
+            metadata=meta,
+            revision=rev,
+            rewrite_schedule=rewrite_schedule,
+            sender=doc.__class__)
 
     return doc, meta, rev
 
@@ -158,6 +161,78 @@ def update_revision_from_forms(metadata_form, revision_form, category):
     return document, metadata, revision
 
 
+def to_revision_number(value):
+    """Converts an imported revision number, or return None if invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class DocumentCache(object):
+    """Existing documents and revisions of a single type, by document key.
+
+    Bulk import tools use this cache to fetch all the documents they will
+    update in two queries, instead of a few queries per imported line.
+
+    Saved objects must be registered with `add`, so a single import can
+    create a document and then add new revisions to it.
+
+    """
+    def __init__(self, metadata_class, keys=None):
+        self.metadata_class = metadata_class
+        self.revision_class = metadata_class.get_revision_class()
+        self.metadata = {}
+        self.revisions = {}
+        if keys:
+            self.prefetch(keys)
+
+    def prefetch(self, keys):
+        """Fetch existing documents and revisions in two queries."""
+        metadatas = self.metadata_class.objects \
+            .select_related('document', 'latest_revision') \
+            .filter(document_key__in=keys)
+        metadatas = list(metadatas)
+        for metadata in metadatas:
+            self.metadata[metadata.document_key] = metadata
+
+        revisions = self.revision_class.objects \
+            .filter(metadata__in=metadatas)
+        for revision in revisions:
+            self.revisions[(revision.metadata_id, revision.revision)] = revision
+
+    def get_metadata(self, document_key):
+        return self.metadata.get(document_key, None)
+
+    def get_revision(self, metadata, revision_num):
+        if metadata is None:
+            return None
+        revision_num = to_revision_number(revision_num)
+        return self.revisions.get((metadata.pk, revision_num), None)
+
+    def add(self, metadata, revision):
+        """Register objects that were just saved."""
+        self.metadata[metadata.document_key] = metadata
+        self.revisions[(metadata.pk, revision.revision)] = revision
+
+    def reload(self, document_key):
+        """Refresh the cached objects of a single document.
+
+        Model forms update their instance during validation, even when the
+        data is invalid, and objects may be out of sync with the db after a
+        rollback.
+
+        """
+        metadata = self.metadata.pop(document_key, None)
+        if metadata is None:
+            return
+
+        self.revisions = dict(
+            (key, revision) for key, revision in self.revisions.items()
+            if key[0] != metadata.pk)
+        self.prefetch([document_key])
+
+
 def stringify_value(val, none_val='NC'):
     """Returns a value suitable for display in a document list.
 
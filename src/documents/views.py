@@ -1,17 +1,19 @@
 # -*- coding: utf-8 -*-
 
 
+import os
 import json
 
 from django.utils import timezone
 from django.conf import settings
 from django.http import (
-    HttpResponse, Http404, HttpResponseForbidden, HttpResponseRedirect
+    HttpResponse, Http404, HttpResponseForbidden, HttpResponseRedirect,
+    StreamingHttpResponse
 )
-from wsgiref.util import FileWrapper
 from django.core.exceptions import PermissionDenied
 from django.views.generic import (
-    ListView, DetailView, RedirectView, DeleteView)
+    ListView, DetailView, RedirectView, DeleteView, View)
+from django.views.static import serve
 from django.views.generic.edit import (
     ModelFormMixin, ProcessFormView, SingleObjectTemplateResponseMixin)
 from django.core.urlresolvers import reverse
@@ -22,7 +24,7 @@ from django.contrib.contenttypes.models import ContentType
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin
 from rest_framework.renderers import JSONRenderer
 
-from accounts.models import get_entities
+from accounts.access import get_request_access
 from audit_trail.models import Activity
 from audit_trail.signals import activity_log
 from favorites.models import Favorite
@@ -30,12 +32,19 @@ from favorites.api.serializers import FavoriteSerializer
 from bookmarks.models import get_user_bookmarks
 from bookmarks.api.serializers import BookmarkSerializer
 from categories.views import CategoryMixin
+from documents.archives import (
+    get_archive_path, get_archive_url, get_files_signature,
+    lock_archive_build)
 from documents.models import Document
+from documents.panels import render_revision_panel
+from documents.tasks import build_download_archive
 from documents.utils import save_document_forms
+from documents.zipstream import ZipStream
 from documents.forms.models import documentform_factory
 from documents.forms.filters import filterform_factory
 from notifications.models import notify
 from privatemedia.views import serve_model_file_field
+from search.queue import coalesce_indexing, WAIT_FOR
 
 
 class DocumentListMixin(CategoryMixin):
@@ -57,7 +66,7 @@ class DocumentListMixin(CategoryMixin):
     def get_external_filtering(self):
         """This is used to filter Outgoing transmittals for
         third party users"""
-        return get_entities(self.request.user)
+        return get_request_access(self.request).entity_ids
 
     def get_context_data(self, **kwargs):
         self.get_external_filtering()
@@ -244,7 +253,9 @@ class BaseDocumentFormView(LoginRequiredMixin,
     def post(self, request, *args, **kwargs):
         document_form, revision_form = self.get_forms()
         if document_form.is_valid() and revision_form.is_valid():
-            return self.form_valid(document_form, revision_form)
+            # The user expects to see the changes in the list right away
+            with coalesce_indexing(refresh=WAIT_FOR):
+                return self.form_valid(document_form, revision_form)
         else:
             return self.form_invalid(document_form, revision_form)
 
@@ -305,18 +316,21 @@ class DocumentDetail(LoginRequiredMixin,
             read_only=True)
 
         revisions = document.get_all_revisions()
-        RevisionForm = self.get_revisionform_class()
         latest_revision = None
         for revision in revisions:
-            revision.form = RevisionForm(
-                instance=revision,
-                request=self.request,
-                category=self.category,
-                read_only=True)
             # Get latest revision without additional query
             if latest_revision is None or latest_revision.revision < revision.revision:
                 latest_revision = revision
 
+        # Only the latest revision form is rendered, older revisions
+        # are loaded on demand (see `RevisionPanel`)
+        RevisionForm = self.get_revisionform_class()
+        latest_revision.form = RevisionForm(
+            instance=latest_revision,
+            request=self.request,
+            category=self.category,
+            read_only=True)
+
         context.update({
             'is_detail': True,
             'form': form,
@@ -327,6 +341,24 @@ class DocumentDetail(LoginRequiredMixin,
         return context
 
 
+class RevisionPanel(LoginRequiredMixin,
+                    DocumentListMixin,
+                    DocumentFormMixin,
+                    DetailView):
+    """Render the read-only form of a single revision."""
+    context_object_name = 'document'
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        revision = self.get_revision()
+        html = render_revision_panel(
+            revision,
+            self.get_revisionform_class(),
+            self.category,
+            request)
+        return HttpResponse(html)
+
+
 class DocumentCreate(BaseDocumentFormView):
     permission_required = 'documents.add_document'
     context_object_name = 'document'
@@ -596,19 +628,53 @@ class DocumentDownload(BaseDocumentList):
         else:
             raise Http404('Invalid parameters to download files.')
 
-        # Generates the temporary zip file
-        zip_filename = _class.compress_documents(data['document_ids'], **data)
-        file_size = zip_filename.tell()
-        zip_filename.seek(0)
-        wrapper = FileWrapper(zip_filename)
-
-        # Returns the zip file for download
-        response = HttpResponse(wrapper, content_type='application/zip')
+        files = _class.get_download_files(data['document_ids'], **data)
+
+        # Very large archives are built in background
+        total_size, archive_id = get_files_signature(files)
+        if total_size > settings.DOWNLOADS_ASYNC_SIZE:
+            user_id = self.request.user.id
+            if os.path.exists(get_archive_path(user_id, archive_id)):
+                url = reverse('archive_download', args=[archive_id])
+                return HttpResponseRedirect(url)
+
+            # Don't build the same archive twice (e.g on double click)
+            if lock_archive_build(user_id, archive_id):
+                build_download_archive.delay(user_id, archive_id, files)
+            notify(self.request.user, _(
+                'Your archive is being prepared. You will be notified '
+                'when it is ready to download.'))
+            return HttpResponseRedirect(self.category.get_absolute_url())
+
+        # The zip file is streamed while it is built
+        response = StreamingHttpResponse(
+            ZipStream(files), content_type='application/zip')
         response['Content-Disposition'] = 'attachment; filename=download.zip'
-        response['Content-Length'] = file_size
         return response
 
 
+class ArchiveDownload(LoginRequiredMixin, View):
+    """Download an archive built by `DocumentDownload` in background."""
+
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        user_id = self.request.user.id
+        archive_id = kwargs.get('archive_id')
+        if not os.path.exists(get_archive_path(user_id, archive_id)):
+            raise Http404('This archive does not exist anymore.')
+
+        url = get_archive_url(user_id, archive_id)
+        if settings.USE_X_SENDFILE:
+            url = '{}{}'.format(settings.PRIVATE_X_ACCEL_PREFIX, url)
+            response = HttpResponse(content_type='application/force-download')
+            response['Content-Disposition'] = 'attachment; filename=download.zip'
+            response['X-Accel-Redirect'] = url
+            return response
+        else:
+            return serve(request, url, settings.PRIVATE_ROOT)
+
+
 class BaseFileDownload(LoginRequiredMixin, CategoryMixin, DetailView):
     """Base class to download files from a Metadata or
     MetadataRevision FileField."""
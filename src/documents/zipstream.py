@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Generate zip archives on the fly.
+
+The `zipfile` module must seek back into the archive after each entry to
+write its size and checksum. Here, each entry is followed by a "data
+descriptor" holding those values, so the archive can be sent to the client
+while it is being built, without any temporary file.
+
+See https://pkware.cachefly.net/webdocs/casestudies/APPNOTE.TXT
+
+"""
+import os
+import time
+import zlib
+import struct
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Those formats are already compressed, deflating them is a waste of cpu
+STORED_EXTENSIONS = (
+    '.pdf', '.zip', '.7z', '.gz', '.rar',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp',
+    '.jpg', '.jpeg', '.png', '.gif',
+)
+
+STORED = 0
+DEFLATED = 8
+
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+
+# Values above those limits require zip64 extensions
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_FILECOUNT_LIMIT = 0xFFFF
+
+# Placeholders for values stored in zip64 records
+MAX_32 = 0xFFFFFFFF
+MAX_16 = 0xFFFF
+
+LOCAL_HEADER_SIGNATURE = 0x04034b50
+DATA_DESCRIPTOR_SIGNATURE = 0x08074b50
+CENTRAL_HEADER_SIGNATURE = 0x02014b50
+END_SIGNATURE = 0x06054b50
+ZIP64_END_SIGNATURE = 0x06064b50
+ZIP64_LOCATOR_SIGNATURE = 0x07064b50
+ZIP64_EXTRA_ID = 0x0001
+
+
+def dos_datetime(timestamp):
+    """Convert a timestamp into the (time, date) format used in zip files."""
+    t = time.localtime(timestamp)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1
+    dostime = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dosdate = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dostime, dosdate
+
+
+def get_compress_type(arcname):
+    extension = os.path.splitext(arcname)[1].lower()
+    return STORED if extension in STORED_EXTENSIONS else DEFLATED
+
+
+class ZipEntry(object):
+    def __init__(self, arcname, compress_type, timestamp, offset, zip64):
+        self.name = arcname.encode('utf-8')
+        self.compress_type = compress_type
+        self.dostime, self.dosdate = dos_datetime(timestamp)
+        self.offset = offset
+        self.zip64 = zip64
+        self.crc = 0
+        self.compress_size = 0
+        self.file_size = 0
+
+    @property
+    def version(self):
+        return 45 if self.zip64 else 20
+
+    def local_header(self):
+        """Sizes and checksum are unknown yet, see `data_descriptor`."""
+        if self.zip64:
+            extra = struct.pack('<HHQQ', ZIP64_EXTRA_ID, 16, 0, 0)
+            size = MAX_32
+        else:
+            extra = b''
+            size = 0
+
+        header = struct.pack(
+            '<LHHHHHLLLHH',
+            LOCAL_HEADER_SIGNATURE, self.version,
+            FLAG_DATA_DESCRIPTOR | FLAG_UTF8, self.compress_type,
+            self.dostime, self.dosdate, 0, size, size,
+            len(self.name), len(extra))
+        return header + self.name + extra
+
+    def data_descriptor(self):
+        fmt = '<LLQQ' if self.zip64 else '<LLLL'
+        return struct.pack(
+            fmt, DATA_DESCRIPTOR_SIGNATURE, self.crc, self.compress_size,
+            self.file_size)
+
+    def central_header(self):
+        extra_values = []
+        file_size = self.file_size
+        compress_size = self.compress_size
+        offset = self.offset
+        if self.zip64 or file_size >= ZIP64_LIMIT or compress_size >= ZIP64_LIMIT:
+            extra_values += [file_size, compress_size]
+            file_size = compress_size = MAX_32
+        if offset >= ZIP64_LIMIT:
+            extra_values.append(offset)
+            offset = MAX_32
+
+        if extra_values:
+            extra = struct.pack(
+                '<HH{}Q'.format(len(extra_values)),
+                ZIP64_EXTRA_ID, 8 * len(extra_values), *extra_values)
+            version = 45
+        else:
+            extra = b''
+            version = self.version
+
+        header = struct.pack(
+            '<LHHHHHHLLLHHHHHLL',
+            CENTRAL_HEADER_SIGNATURE, (3 << 8) | version, version,
+            FLAG_DATA_DESCRIPTOR | FLAG_UTF8, self.compress_type,
+            self.dostime, self.dosdate, self.crc, compress_size, file_size,
+            len(self.name), len(extra), 0, 0, 0, 0o100644 << 16, offset)
+        return header + self.name + extra
+
+
+class ZipStream(object):
+    """Iterate over the bytes of a zip archive.
+
+    `files` is an iterable of (path, arcname) tuples. Missing files are
+    skipped.
+
+    """
+    def __init__(self, files, chunk_size=CHUNK_SIZE):
+        self.files = files
+        self.chunk_size = chunk_size
+        self.entries = []
+        self.offset = 0
+
+    def __iter__(self):
+        for path, arcname in self.files:
+            try:
+                fd = open(path, 'rb')
+            except (IOError, OSError):
+                logger.error("Can't serve {}, the file is missing".format(arcname))
+                continue
+
+            with fd:
+                for chunk in self.write_entry(fd, arcname):
+                    yield chunk
+
+        yield self.write_end()
+
+    def emit(self, data):
+        self.offset += len(data)
+        return data
+
+    def write_entry(self, fd, arcname):
+        stat = os.fstat(fd.fileno())
+        compress_type = get_compress_type(arcname)
+        entry = ZipEntry(
+            arcname, compress_type, stat.st_mtime, self.offset,
+            zip64=stat.st_size >= ZIP64_LIMIT)
+        yield self.emit(entry.local_header())
+
+        if compress_type == DEFLATED:
+            compressor = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        else:
+            compressor = None
+
+        while True:
+            data = fd.read(self.chunk_size)
+            if not data:
+                break
+            entry.file_size += len(data)
+            entry.crc = zlib.crc32(data, entry.crc)
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                entry.compress_size += len(data)
+                yield self.emit(data)
+
+        if compressor:
+            data = compressor.flush()
+            entry.compress_size += len(data)
+            yield self.emit(data)
+
+        yield self.emit(entry.data_descriptor())
+        self.entries.append(entry)
+
+    def write_end(self):
+        """Return the central directory and the end records."""
+        cd_offset = self.offset
+        central_directory = b''.join(
+            entry.central_header() for entry in self.entries)
+        cd_size = len(central_directory)
+        count = len(self.entries)
+
+        end = b''
+        if count >= ZIP_FILECOUNT_LIMIT or cd_offset >= ZIP64_LIMIT or \
+                cd_size >= ZIP64_LIMIT:
+            end += struct.pack(
+                '<LQHHLLQQQQ',
+                ZIP64_END_SIGNATURE, 44, 45, 45, 0, 0, count, count,
+                cd_size, cd_offset)
+            end += struct.pack(
+                '<LLQL',
+                ZIP64_LOCATOR_SIGNATURE, 0, cd_offset + cd_size, 1)
+
+            count = MAX_16
+            cd_size = cd_offset = MAX_32
+
+        end += struct.pack(
+            '<LHHHHLLH',
+            END_SIGNATURE, 0, 0, count, count, cd_size, cd_offset, 0)
+        return self.emit(central_directory + end)
@@ -1,17 +1,27 @@
 # -*- coding: utf-8 -*-
 
 import datetime as dt
+from functools import lru_cache
 
 from documents.models import MetadataRevisionBase
-from transmittals.utils import FieldWrapper
+from documents.serialization import FieldPlan
 from documents.utils import stringify_value as stringify
-import collections
 
 # Only used in this module, it makes no sense to put it elsewhere for now
 FR_DATE_FORMAT = '%d-%m-%Y'
 FR_DATETIME_FORMAT = '%d-%m-%Y %H:%M'
 
 
+@lru_cache()
+def get_export_field_plan(revision_class, fields):
+    """Return the (cached) plan to extract exported fields from revisions.
+
+    Fields that cannot be found are exported as empty values.
+
+    """
+    return FieldPlan(revision_class, fields, default='')
+
+
 class BaseFormatter(object):
     """Base class for all formatters.
 
@@ -50,14 +60,13 @@ class CSVFormatter(BaseFormatter):
         if isinstance(doc, list):
             data = doc
         elif isinstance(doc, MetadataRevisionBase):
-            doc = FieldWrapper((
-                doc,
-                doc.metadata,
-                doc.metadata.document))
-            fields = list(self.fields.values())
-            data = [self.get_field(doc, field) for field in fields]
+            plan = self.get_field_plan(type(doc))
+            data = [self.format_value(value) for _, _, value in plan.get_values(doc)]
         return data
 
+    def get_field_plan(self, revision_class):
+        return get_export_field_plan(revision_class, tuple(self.fields.values()))
+
     def format_doc(self, doc):
         data = self.prepare_data(doc)
 
@@ -67,12 +76,7 @@ class CSVFormatter(BaseFormatter):
         csv_data = '{}\n'.format(csv_data)
         return csv_data.encode('utf-8')
 
-    def get_field(self, doc, field):
-        data = getattr(doc, field, '')
-        # Attributes and method can be passed
-        if isinstance(data, collections.Callable):
-            data = data()
-
+    def format_value(self, data):
         # We want dd-mm-yyy format for exports whereas
         if type(data) == dt.date:
             data = data.strftime(FR_DATE_FORMAT)
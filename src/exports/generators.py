@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 
 
+from itertools import islice
+
 from django.conf import settings
 
 from accounts.models import Entity
 from search.builder import SearchBuilder
+from exports.formatters import get_export_field_plan
 
 
 class ExportGenerator(object):
@@ -15,22 +18,28 @@ class ExportGenerator(object):
 
     Yields data in chunks.
 
+    Document ids are streamed from an Elasticsearch scroll and fetched from
+    the db chunk by chunk, so the memory usage does not depend on the number
+    of exported documents.
+
     """
     def __init__(self, category, filters, fields, owner=None, export_all_revisions=False):
         self.category = category
         self.fields = fields
         self.export_all_revisions = export_all_revisions
+        self.chunk_size = settings.EXPORTS_CHUNK_SIZE
         self.filters = filters
+
+        # With a scroll, `size` is the number of hits per shard and per batch
         self.filters.update({
             'start': 0,
-            'size': 60000})
+            'size': self.chunk_size})
 
         self.owner = owner
 
     def __iter__(self):
-        self.pks, self.total = self.get_es_results()
-        self.start = -1
-        self.chunk_size = settings.EXPORTS_CHUNK_SIZE
+        self.pks = iter(self.get_es_results())
+        self.header_sent = False
         return self
 
     def get_entities(self):
@@ -45,7 +54,7 @@ class ExportGenerator(object):
     def get_es_results(self):
         """Perform initial doc search using elasticsearch.
 
-        Only return document ids, since the actual data export will use db.
+        Only yield document ids, since the actual data export will use db.
 
         """
 
@@ -59,9 +68,7 @@ class ExportGenerator(object):
         result = builder.scan_results(
             ['pk'],
             only_latest_revisions=not self.export_all_revisions)
-        pks = [doc['pk'][0] for doc in result]
-        total = len(pks)
-        return pks, total
+        return (doc['pk'][0] for doc in result)
 
     def __next__(self):
         return self.next_data_chunk()
@@ -73,28 +80,33 @@ class ExportGenerator(object):
         dumped in the file.
 
         """
-        if self.start == -1:
-            self.start = 0
+        if not self.header_sent:
+            self.header_sent = True
             return self.data_header()
 
-        if self.start >= self.total:
+        pks = list(islice(self.pks, self.chunk_size))
+        if not pks:
             raise StopIteration()
 
-        chunk = self.get_chunk()
-        self.start += self.chunk_size
-        return chunk
+        return self.get_chunk(pks)
 
     def data_header(self):
         return
 
-    def get_chunk(self):
-        """Get a single piece of data."""
+    def get_chunk(self, pks):
+        """Get a single piece of data.
+
+        All relations needed to export the fields are fetched in the same
+        query, and revisions are returned in the search results order.
+
+        """
         Model = self.category.revision_class()
-        pks = self.pks[self.start:self.start + self.chunk_size]
+        plan = get_export_field_plan(Model, tuple(self.fields.values()))
         qs = Model.objects \
             .filter(pk__in=pks) \
-            .select_related()
-        return qs
+            .select_related(*plan.select_related)
+        revisions = dict((revision.pk, revision) for revision in qs)
+        return [revisions[pk] for pk in pks if pk in revisions]
 
 
 class CSVGenerator(ExportGenerator):
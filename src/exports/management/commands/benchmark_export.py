@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+
+import os
+import time
+import resource
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from categories.models import Category
+from exports.models import Export
+
+
+class Command(BaseCommand):
+    """Measure the export throughput (rows/sec) of a category.
+
+    Revision ids are read from the db instead of Elasticsearch, so only the
+    fetching / formatting / writing pipeline is measured.
+
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('organisation', type=str)
+        parser.add_argument('category', type=str)
+        parser.add_argument(
+            '--rows', type=int, default=None,
+            help='Maximum number of exported rows')
+        parser.add_argument(
+            '--format', dest='formats', action='append',
+            choices=('csv', 'xlsx'),
+            help='Format to benchmark (can be repeated)')
+
+    def handle(self, *args, **options):
+        try:
+            category = Category.objects \
+                .select_related('organisation', 'category_template') \
+                .get(organisation__slug=options['organisation'],
+                     category_template__slug=options['category'])
+        except Category.DoesNotExist:
+            raise CommandError('This category does not exist.')
+
+        formats = options['formats'] or ['csv', 'xlsx']
+        for fmt in formats:
+            self.benchmark(category, fmt, options['rows'])
+
+    def get_pks(self, category, rows):
+        pks = category.revision_class().objects \
+            .filter(metadata__document__category=category) \
+            .order_by('pk') \
+            .values_list('pk', flat=True)
+        if rows:
+            pks = pks[:rows]
+        return pks.iterator()
+
+    def benchmark(self, category, fmt, rows):
+        export = Export(category=category, format=fmt)
+        fields = export.get_fields()
+
+        Generator = import_string('exports.generators.{}Generator'.format(fmt.upper()))
+        generator = Generator(category, {}, fields)
+        generator.get_es_results = lambda: self.get_pks(category, rows)
+
+        Formatter = import_string('exports.formatters.{}Formatter'.format(fmt.upper()))
+        formatter = Formatter(fields)
+
+        # Count rows while they are written
+        counter = {'rows': 0}
+
+        def counting(chunks):
+            for chunk in chunks:
+                if chunk:
+                    counter['rows'] += len(chunk)
+                yield chunk
+
+        fd, filepath = tempfile.mkstemp(suffix='.{}'.format(fmt))
+        os.close(fd)
+        try:
+            start = time.time()
+            file_writer = getattr(export, '{}_file_writer'.format(fmt))
+            file_writer(counting(generator), formatter, filepath=filepath)
+            duration = time.time() - start
+            size = os.path.getsize(filepath)
+        finally:
+            os.remove(filepath)
+
+        # The first chunk is the header
+        nb_rows = max(counter['rows'] - 1, 0)
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(
+            '{}: {} rows in {:.2f}s ({:.1f} rows/sec), {} bytes, '
+            'max rss {} kB'.format(
+                fmt, nb_rows, duration,
+                nb_rows / duration if duration else 0,
+                size, max_rss))
@@ -121,22 +121,28 @@ class Export(models.Model):
         logger.info('Starting export {}'.format(self.id))
         process_export.delay(str(self.pk), user_pk=user_pk)
 
-    def csv_file_writer(self, data_generator, formatter):
-        with self.open_file() as the_file:
+    def csv_file_writer(self, data_generator, formatter, filepath=None):
+        with self.open_file(filepath) as the_file:
             for data_chunk in data_generator:
                 the_file.write(formatter.format(data_chunk))
 
-    def xlsx_file_writer(self, data_generator, formatter):
-        wb = Workbook()
-        ws = wb.active
+    def xlsx_file_writer(self, data_generator, formatter, filepath=None):
+        # In write-only mode, rows are flushed to disk as they are appended
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
         for data_chunk in data_generator:
             formatted = formatter.format(data_chunk)
             for el in formatted:
                 ws.append(el)
-        wb.save(self.get_filepath())
+        wb.save(filepath or self.get_filepath())
 
     def write_file(self):
-        """Generates and write the file."""
+        """Generates and write the file.
+
+        Data is fetched, formatted and written chunk by chunk, so the memory
+        usage stays flat whatever the export size.
+
+        """
         data_generator = self.get_data_generator()
         formatter = self.get_data_formatter()
 
@@ -145,8 +151,10 @@ class Export(models.Model):
         file_writer(data_generator, formatter)
         logger.info('Import {} done'.format(self.id))
 
-    def open_file(self):
+    def open_file(self, filepath=None):
         """Opens the file in which data should be dumped."""
+        if filepath is not None:
+            return open(filepath, 'wb')
 
         # Create the export dir if it does not exist
         export_dir = self.get_filedir()
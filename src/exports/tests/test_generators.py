@@ -20,17 +20,16 @@ class ExportGeneratorTests(TestCase):
     def setUp(self):
         Model = ContentType.objects.get_for_model(ContractorDeliverable)
         self.category = CategoryFactory(category_template__metadata_model=Model)
-        self.docs = (
+        self.docs = [
             DocumentFactory(
                 metadata_factory_class=ContractorDeliverableFactory,
                 revision_factory_class=ContractorDeliverableRevisionFactory,
                 category=self.category)
-            for i in range(1, 20))
+            for i in range(1, 20)]
 
-        self.es_mock = MagicMock(return_value=(
-            [doc.latest_revision.pk for doc in self.docs],
-            20
-        ))
+        self.es_mock = MagicMock(return_value=[
+            doc.latest_revision.pk for doc in self.docs
+        ])
 
     @override_settings(EXPORTS_CHUNK_SIZE=5)
     def test_generator_iterator(self):
@@ -40,16 +39,16 @@ class ExportGeneratorTests(TestCase):
         chunk = next(iterator)  # header
 
         chunk = next(iterator)
-        self.assertEqual(chunk.count(), 5)
+        self.assertEqual(len(chunk), 5)
 
         chunk = next(iterator)
-        self.assertEqual(chunk.count(), 5)
+        self.assertEqual(len(chunk), 5)
 
         chunk = next(iterator)
-        self.assertEqual(chunk.count(), 5)
+        self.assertEqual(len(chunk), 5)
 
         chunk = next(iterator)
-        self.assertEqual(chunk.count(), 4)
+        self.assertEqual(len(chunk), 4)
 
         with self.assertRaises(StopIteration):
             chunk = next(iterator)
@@ -63,3 +62,15 @@ class ExportGeneratorTests(TestCase):
         iterator = iter(generator)
         chunk = next(iterator)
         self.assertEqual(chunk, [['Title', 'Document number']])
+
+    @override_settings(EXPORTS_CHUNK_SIZE=5)
+    def test_chunks_keep_search_order(self):
+        pks = [doc.latest_revision.pk for doc in self.docs]
+        pks.reverse()
+        generator = ExportGenerator(self.category, {}, {})
+        generator.get_es_results = MagicMock(return_value=pks)
+        iterator = iter(generator)
+        next(iterator)  # header
+
+        chunk = next(iterator)
+        self.assertEqual([rev.pk for rev in chunk], pks[0:5])
@@ -39,6 +39,7 @@ class ExportCreate(LoginRequiredMixin, DocumentListMixin, UpdateView):
         qd = self.request.POST.copy()
         qd.pop('csrfmiddlewaretoken', None)
         qd.pop('start', None)
+        qd.pop('after', None)
         qd.pop('size', None)
         qd.pop('sort_by', None)
         qd.pop('format', None)
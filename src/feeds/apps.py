@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+
+from django.apps import AppConfig
+
+
+class FeedsConfig(AppConfig):
+    name = 'feeds'
+    verbose_name = 'Feeds'
+
+    def ready(self):
+        from django.apps import apps
+        from django.db.models.signals import post_save, post_delete
+        from documents.models import Document, MetadataRevisionBase
+        from documents.signals import documents_updated
+        from reviews.models import Review
+        from feeds import signals
+
+        post_save.connect(
+            signals.document_saved, sender=Document,
+            dispatch_uid='feeds_document_saved')
+        post_delete.connect(
+            signals.document_saved, sender=Document,
+            dispatch_uid='feeds_document_deleted')
+        post_save.connect(
+            signals.review_saved, sender=Review,
+            dispatch_uid='feeds_review_saved')
+        documents_updated.connect(
+            signals.documents_updated,
+            dispatch_uid='feeds_documents_updated')
+
+        for model in apps.get_models():
+            if issubclass(model, MetadataRevisionBase):
+                post_save.connect(
+                    signals.revision_saved,
+                    sender=model,
+                    dispatch_uid='feeds_revision_saved_{}'.format(
+                        model._meta.label_lower))
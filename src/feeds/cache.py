@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Rendered feeds, kept in cache.
+
+Every category has a "last modified" timestamp, updated by signal handlers
+whenever a document, a revision or a review of the category is saved (see
+`feeds.signals`). It is used to answer conditional requests, and is part of
+the rendered feed cache keys, so outdated feeds are never served.
+
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_modified_key(category_id):
+    return 'feeds_modified_{}'.format(category_id)
+
+
+def get_body_key(etag):
+    return 'feeds_body_{}'.format(etag)
+
+
+def get_last_modified(category_id, default):
+    """Return the timestamp of the last change in the category.
+
+    `default` is a callable, used to compute the timestamp when it is not in
+    cache.
+
+    """
+    key = get_modified_key(category_id)
+    timestamp = cache.get(key)
+    if timestamp is None:
+        timestamp = default()
+        # Don't overwrite a timestamp set in the meantime
+        cache.add(key, timestamp, None)
+        timestamp = cache.get(key, timestamp)
+    return timestamp
+
+
+def touch_categories(category_ids):
+    """Mark the feeds of the given categories as modified."""
+    now = time.time()
+    cache.set_many(
+        dict((get_modified_key(category_id), now)
+             for category_id in set(category_ids)),
+        None)
+
+
+def get_feed_body(etag):
+    """Return the cached `(content_type, content)` tuple, or None."""
+    return cache.get(get_body_key(etag))
+
+
+def set_feed_body(etag, content_type, content):
+    cache.set(
+        get_body_key(etag), (content_type, content),
+        settings.FEEDS_CACHE_TIMEOUT)
@@ -2,21 +2,28 @@
 
 
 import base64
+import hashlib
+from calendar import timegm
 from datetime import datetime, time
 
 from django.contrib.syndication.views import Feed
 from django.views.generic import View
-from django.utils.translation import ugettext_lazy as _
+from django.utils.translation import ugettext_lazy as _, get_language
 from django.core.urlresolvers import reverse
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth import authenticate, login
+from django.db.models import Max
 from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.template.loader import render_to_string
 from django.conf import settings
 
 from documents.models import Document
 from categories.views import CategoryMixin
+from feeds import cache as feed_cache
+from feeds.tokens import get_token_user
 
 
 class HttpResponseUnauthorized(HttpResponse):
@@ -37,7 +44,17 @@ class AlertMixin(object):
     that the request is secure (e.g uses ssl) before asking for non-encrypted
     login + password.
 
+    Readers can also send the user's feed token in the querystring (see
+    `feeds.tokens`), which is much cheaper to check than a password, and
+    does not open a session.
+
     """
+    def authenticate_token(self, request):
+        user = get_token_user(request.GET['token'])
+        if user is None:
+            raise PermissionDenied()
+        request.user = user
+
     def authenticate_user(self, request):
         try:
             auth = request.META['HTTP_AUTHORIZATION'].split()
@@ -54,7 +71,9 @@ class AlertMixin(object):
                 login(request, user)
 
     def dispatch(self, request, *args, **kwargs):
-        if 'HTTP_AUTHORIZATION' in request.META:
+        if 'token' in request.GET:
+            self.authenticate_token(request)
+        elif 'HTTP_AUTHORIZATION' in request.META:
             self.authenticate_user(request)
 
         if not self.request.user.is_authenticated():
@@ -74,16 +93,66 @@ class BaseAlertFeed(AlertMixin, Feed, View):
 
 
 class BaseCategoryAlertFeed(AlertMixin, CategoryMixin, Feed, View):
-    """Base class for feeds in a single category."""
+    """Base class for feeds in a single category.
+
+    Feeds are rendered once and kept in cache until something changes in the
+    category (see `feeds.cache`). Readers that already fetched the latest
+    version get a 304 response.
+
+    """
     def populate(self, request, *args, **kwargs):
         self.request = request
         self.kwargs = kwargs
         self.extract_category()
 
+    def get_revisions(self):
+        return self.category.revision_class().objects \
+            .filter(metadata__document__category=self.category)
+
+    def get_latest_update(self):
+        """Return the update date of the latest modified feed item."""
+        return self.get_revisions() \
+            .aggregate(latest=Max('updated_on'))['latest']
+
+    def get_last_modified(self):
+        def get_default():
+            latest = self.get_latest_update() or timezone.now()
+            return timegm(latest.utctimetuple())
+
+        return feed_cache.get_last_modified(self.category.pk, get_default)
+
+    def get_etag(self, last_modified):
+        key = '{}_{}_{}_{}_{}'.format(
+            type(self).__name__, self.category.pk, last_modified,
+            get_language(), self.request.scheme)
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def get_feed_response(self, etag, *args, **kwargs):
+        cached = feed_cache.get_feed_body(etag)
+        if cached is not None:
+            content_type, content = cached
+            return HttpResponse(content, content_type=content_type)
+
+        # Feed.__call__(…)
+        response = self(self.request, *args, **kwargs)
+        feed_cache.set_feed_body(
+            etag, response['Content-Type'], response.content)
+        return response
+
     def get(self, request, *args, **kwargs):
         self.populate(request, *args, **kwargs)
-        # Feed.__call__(…)
-        return self(request, *args, **kwargs)
+
+        last_modified = self.get_last_modified()
+        etag = self.get_etag(last_modified)
+        quoted_etag = quote_etag(etag)
+        response = get_conditional_response(
+            request, etag=quoted_etag, last_modified=int(last_modified))
+        if response is None:
+            response = self.get_feed_response(etag, *args, **kwargs)
+
+        response['ETag'] = quoted_etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
 
 
 class FeedNewDocuments(BaseCategoryAlertFeed):
@@ -96,6 +165,11 @@ class FeedNewDocuments(BaseCategoryAlertFeed):
             self.category.slug
         ])
 
+    def get_latest_update(self):
+        return Document.objects \
+            .filter(category=self.category) \
+            .aggregate(latest=Max('updated_on'))['latest']
+
     def items(self, *args, **kwargs):
         qs = Document.objects \
             .filter(category=self.category) \
@@ -126,8 +200,7 @@ class FeedClosedReviews(BaseCategoryAlertFeed):
         ])
 
     def items(self, *args, **kwargs):
-        qs = self.category.revision_class().objects \
-            .filter(metadata__document__category=self.category) \
+        qs = self.get_revisions() \
             .filter(review_end_date__isnull=False) \
             .select_related('metadata__document') \
             .order_by('-review_end_date')[:settings.ALERT_ELEMENTS]
@@ -160,8 +233,7 @@ class FeedStartedReviews(BaseCategoryAlertFeed):
         ])
 
     def items(self, *args, **kwargs):
-        qs = self.category.revision_class().objects \
-            .filter(metadata__document__category=self.category) \
+        qs = self.get_revisions() \
             .filter(review_start_date__isnull=False) \
             .select_related('metadata__document') \
             .order_by('-review_start_date')[:settings.ALERT_ELEMENTS]
@@ -193,10 +265,16 @@ class FeedOverdueDocuments(BaseCategoryAlertFeed):
             self.category.slug
         ])
 
+    def get_last_modified(self):
+        # Documents become overdue when the day changes
+        last_modified = super(FeedOverdueDocuments, self).get_last_modified()
+        today = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        return max(last_modified, timegm(today.utctimetuple()))
+
     def items(self, *args, **kwargs):
         today = timezone.now().date()
-        qs = self.category.revision_class().objects \
-            .filter(metadata__document__category=self.category) \
+        qs = self.get_revisions() \
             .filter(review_start_date__isnull=False) \
             .filter(review_end_date__isnull=True) \
             .filter(review_due_date__lt=today) \
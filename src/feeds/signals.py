@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+
+from feeds.cache import touch_categories
+
+
+def touch_documents(document_ids):
+    from documents.models import Document
+
+    category_ids = Document.objects \
+        .filter(pk__in=document_ids) \
+        .values_list('category_id', flat=True) \
+        .distinct()
+    touch_categories(category_ids)
+
+
+def document_saved(sender, instance, **kwargs):
+    touch_categories([instance.category_id])
+
+
+def revision_saved(sender, instance, **kwargs):
+    touch_categories([instance.document.category_id])
+
+
+def review_saved(sender, instance, **kwargs):
+    touch_documents([instance.document_id])
+
+
+def documents_updated(sender, document_ids, **kwargs):
+    touch_documents(document_ids)
@@ -9,6 +9,7 @@ from django.test import TestCase
 from accounts.factories import UserFactory
 from categories.factories import CategoryFactory
 from documents.factories import DocumentFactory
+from feeds.tokens import make_feed_token
 
 
 class FeedAuthenticationTests(TestCase):
@@ -87,6 +88,97 @@ class FeedAuthenticationTests(TestCase):
         self.assertEqual(res.status_code, 200)
 
 
+class FeedTokenTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+        self.user = UserFactory(
+            email='testadmin@phase.fr',
+            password='pass',
+            is_superuser=True,
+            category=self.category
+        )
+        self.url = reverse('feed_new_documents', args=[
+            self.category.organisation.slug,
+            self.category.slug,
+        ])
+
+    def test_valid_token(self):
+        res = self.client.get(self.url, {'token': make_feed_token(self.user)})
+        self.assertEqual(res.status_code, 200)
+
+    def test_invalid_token(self):
+        token = '{}-invalid'.format(self.user.pk)
+        res = self.client.get(self.url, {'token': token})
+        self.assertEqual(res.status_code, 403)
+
+        res = self.client.get(self.url, {'token': 'invalid'})
+        self.assertEqual(res.status_code, 403)
+
+    def test_password_change_revokes_token(self):
+        token = make_feed_token(self.user)
+        self.user.set_password('new password')
+        self.user.save()
+
+        res = self.client.get(self.url, {'token': token})
+        self.assertEqual(res.status_code, 403)
+
+    def test_inactive_user(self):
+        token = make_feed_token(self.user)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(self.url, {'token': token})
+        self.assertEqual(res.status_code, 403)
+
+
+class ConditionalFeedTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+        self.user = UserFactory(
+            email='testadmin@phase.fr',
+            password='pass',
+            is_superuser=True,
+            category=self.category
+        )
+        self.client.login(email=self.user.email, password='pass')
+        self.url = reverse('feed_new_documents', args=[
+            self.category.organisation.slug,
+            self.category.slug,
+        ])
+        DocumentFactory(
+            title='document 1',
+            category=self.category,
+        )
+
+    def test_unchanged_feed(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.has_header('Last-Modified'))
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, 304)
+
+    def test_modified_feed(self):
+        res = self.client.get(self.url)
+        etag = res['ETag']
+
+        DocumentFactory(
+            title='document 2',
+            category=self.category,
+        )
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertContains(res, 'document 2')
+
+    def test_cached_feed(self):
+        res = self.client.get(self.url)
+        content = res.content
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.content, content)
+
+
 class AlertNewDocumentTests(TestCase):
     def setUp(self):
         self.category = CategoryFactory()
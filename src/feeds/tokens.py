@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Per-user feed tokens.
+
+Feed readers poll feeds every few minutes. Instead of sending the user's
+password, which must be hashed again on every request, they send a token
+signed with the project secret key, so checking it only costs an hmac.
+
+Tokens are built from the user's password hash, so changing the password
+revokes them.
+
+"""
+from django.contrib.auth import get_user_model
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import urlencode
+
+
+KEY_SALT = 'feeds.tokens'
+
+
+def get_token_hash(user):
+    value = '{}{}'.format(user.pk, user.password)
+    return salted_hmac(KEY_SALT, value).hexdigest()
+
+
+def make_feed_token(user):
+    return '{}-{}'.format(user.pk, get_token_hash(user))
+
+
+def get_token_user(token):
+    """Return the active user the token belongs to, or None."""
+    try:
+        user_id, token_hash = token.split('-', 1)
+        user_id = int(user_id)
+    except ValueError:
+        return None
+
+    User = get_user_model()
+    try:
+        user = User.objects.get(pk=user_id, is_active=True)
+    except User.DoesNotExist:
+        return None
+
+    if not constant_time_compare(get_token_hash(user), token_hash):
+        return None
+    return user
+
+
+def get_feed_url(url, user):
+    """Add the user's token to the feed url."""
+    return '{}?{}'.format(url, urlencode({'token': make_feed_token(user)}))
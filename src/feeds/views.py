@@ -9,6 +9,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 
 from categories.views import CategoryMixin
 from feeds import feeds
+from feeds.tokens import get_feed_url
 
 
 class AlertHome(LoginRequiredMixin, CategoryMixin, TemplateView):
@@ -71,7 +72,8 @@ class BaseAlert(LoginRequiredMixin,
         context.update({
             'title': self.feed.feed['title'],
             'description': self.feed.feed['description'],
-            'feed_url': self.feed.feed['link'],
+            'feed_url': get_feed_url(
+                self.feed.feed['link'], self.request.user),
         })
         return context
 
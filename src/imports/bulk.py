@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+
+from django.apps import apps
+
+from documents.utils import DocumentCache
+
+
+class LookupTable(object):
+    """Maps imported values to related object pks, for a single field.
+
+    All the values of the column are resolved in a single query.
+
+    """
+    def __init__(self, model, lookup_field, values):
+        values = set(value for value in values if value is not None)
+        qs = model.objects \
+            .filter(**{'{}__in'.format(lookup_field): values}) \
+            .values_list(lookup_field, 'pk')
+        self.pks = dict(('{}'.format(value), pk) for value, pk in qs)
+
+    def get(self, value):
+        if value is None:
+            return None
+        return self.pks.get('{}'.format(value))
+
+
+class ImportContext(object):
+    """Data shared by all the lines of an import batch.
+
+    Instead of querying the db for every imported line, existing documents,
+    revisions and related objects are fetched once for all the lines.
+
+    """
+    def __init__(self, batch, rows):
+        self.batch = batch
+        metadata_class = batch.imported_type.model_class()
+        config = getattr(metadata_class, 'PhaseConfig')
+        self.import_fields = getattr(config, 'import_fields', None)
+
+        keys = set(row.get('document_key') for row in rows)
+        keys.discard(None)
+        keys.discard('')
+        self.documents = DocumentCache(metadata_class, keys)
+        self.lookups = self.build_lookups(rows)
+
+    def build_lookups(self, rows):
+        """Create a lookup table for each configured foreign key column."""
+        lookups = {}
+        if not self.import_fields:
+            return lookups
+
+        for field_name, field_config in self.import_fields.items():
+            model_str = field_config.get('model', False)
+            lookup_field = field_config.get('lookup_field', False)
+            if not model_str or not lookup_field:
+                continue
+
+            app_label, model_name = model_str.split('.')
+            model = apps.get_model(app_label=app_label, model_name=model_name)
+            values = [row.get(field_name) for row in rows]
+            lookups[field_name] = LookupTable(model, lookup_field, values)
+        return lookups
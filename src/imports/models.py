@@ -3,9 +3,8 @@ import datetime as dt
 import json
 from itertools import zip_longest
 
-from django.apps import apps
-from django.db import models
-from django.core.exceptions import ObjectDoesNotExist
+from django.conf import settings
+from django.db import models, transaction
 from django.core.urlresolvers import reverse
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils import timezone
@@ -13,13 +12,14 @@ from django.utils.translation import ugettext_lazy as _
 
 from django_extensions.db.fields import UUIDField
 from model_utils import Choices
-from annoying.functions import get_object_or_None
 from openpyxl import load_workbook
 
 from categories.models import Category
 from documents.models import Document
 from documents.forms.models import documentform_factory
 from documents.utils import save_document_forms
+from search.queue import coalesce_indexing
+from imports.bulk import ImportContext
 
 
 class normal_dialect(csv.Dialect):
@@ -109,18 +109,21 @@ class ImportBatch(models.Model):
         return reverse('import_status', args=[self.uid])
 
     def get_form_class(self):
-        form_class = documentform_factory(self.imported_type.model_class())
-        return form_class
+        if not hasattr(self, '_form_class'):
+            self._form_class = documentform_factory(
+                self.imported_type.model_class())
+        return self._form_class
 
     def get_form(self, data=None, **kwargs):
         kwargs.update({'category': self.category})
         return self.get_form_class()(data, **kwargs)
 
     def get_revisionform_class(self):
-        obj_class = self.imported_type.model_class()
-        obj = obj_class()
-        form_class = documentform_factory(obj.get_revision_class())
-        return form_class
+        if not hasattr(self, '_revisionform_class'):
+            obj_class = self.imported_type.model_class()
+            self._revisionform_class = documentform_factory(
+                obj_class.get_revision_class())
+        return self._revisionform_class
 
     def get_revisionform(self, data=None, **kwargs):
         kwargs.update({'category': self.category})
@@ -149,17 +152,31 @@ class ImportBatch(models.Model):
                 imp = Import(batch=self, data=row)
                 yield imp
 
-    def do_import(self):
-        line = 1
+    def do_import(self, chunk_size=None):
+        """Import all the lines of the file.
+
+        Existing documents and related objects are fetched once for the
+        whole file. Lines are saved in chunked transactions, import results
+        are recorded with a single query per chunk, and documents are indexed
+        in bulk once the import is over.
+
+        """
+        chunk_size = chunk_size or settings.IMPORTS_CHUNK_SIZE
+        imports = list(self)
+        context = ImportContext(self, [imp.data for imp in imports])
+
         error_count = 0
-        for imp in self:
-            imp.do_import(line)
-            imp.save()
-            if imp.status == Import.STATUSES.error:
-                error_count += 1
-            line += 1
-
-        if error_count == line - 1:
+        with coalesce_indexing():
+            for start in range(0, len(imports), chunk_size):
+                chunk = imports[start:start + chunk_size]
+                with transaction.atomic():
+                    for line, imp in enumerate(chunk, start=start + 1):
+                        imp.do_import(line, context=context)
+                        if imp.status == Import.STATUSES.error:
+                            error_count += 1
+                    Import.objects.bulk_create(chunk)
+
+        if error_count == len(imports):
             self.status = self.STATUSES.error
         elif error_count > 0:
             self.status = self.STATUSES.partial_success
@@ -200,51 +217,33 @@ class Import(models.Model):
         self.denormalized = {}
         super(Import, self).__init__(*args, **kwargs)
 
-    def get_denormalized_value(self, import_fields, field_name, value):
+    def get_denormalized_value(self, lookups, field_name, value):
         """" Returns the related object pk if the field is a foreign key.
         The PhaseConfig `import_fields` must be configured."""
 
-        field_config = import_fields.get(field_name, None)
-
-        if not field_config:
-            return value
-
-        model_str = field_config.get('model', False)
-        lookup_field = field_config.get('lookup_field', False)
-
-        if not model_str or not lookup_field:
+        lookup = lookups.get(field_name, None)
+        if lookup is None:
             return value
 
-        app_label, model_name = model_str.split('.')
-        model = apps.get_model(app_label=app_label, model_name=model_name)
-        params = {lookup_field: value}
-        try:
-            obj = model.objects.get(**params).pk
-            return obj
-
-        except ObjectDoesNotExist:
+        pk = lookup.get(value)
+        if pk is None:
             self.errors = json.dumps({
                 'An error occurred': ["Unable to retrieve {} field".format(field_name)]
             })
             self.status = self.STATUSES.error
+        return pk
 
-    def denormalize_data(self, category):
+    def denormalize_data(self, context):
         """This method processes data to get foreign key objects."""
 
-        # Check the `PhaseConfig` attribute
-        model_class = category.category_template.metadata_model.model_class()
-        config = getattr(model_class, 'PhaseConfig')
-
         # If `import_fields`is not set, we simply use the initial data
-        if not hasattr(config, 'import_fields'):
+        if not context.import_fields:
             self.denormalized = self.data
             return
 
-        import_fields = config.import_fields
-
         # Process each field_name/value to get the fk pk if any
         for field_name, value in list(self.data.items()):
-            val = self.get_denormalized_value(import_fields, field_name, value)
+            val = self.get_denormalized_value(context.lookups, field_name, value)
             # We fill the dict
             self.denormalized[field_name] = val
 
@@ -254,25 +253,33 @@ class Import(models.Model):
             self.batch.get_revisionform(self.denormalized, instance=revision_instance)
         )
 
-    def do_import(self, line):
+    def do_import(self, line, context=None):
+        """Import a single line.
+
+        The import `context` holds the existing documents and foreign key
+        lookups. When importing a whole batch, the context is shared by all
+        the lines.
+
+        """
         assert hasattr(self, 'data')
 
         self.line = line
+        if context is None:
+            context = ImportContext(self.batch, [self.data])
 
         # Checking if the document already exists
         key = self.data.get('document_key', None)
-        doc = get_object_or_None(Document, document_key=key)
-        metadata = doc.metadata if doc else None
+        metadata = context.documents.get_metadata(key)
 
         # Processing csv data to denormalize foreign keys
-        self.denormalize_data(self.batch.category)
+        self.denormalize_data(context)
         # In case of denormalization error, we exit
         if self.status == self.STATUSES.error:
             return
 
         # Checking if the revision already exists
         revision_num = self.data.get('revision', None)
-        revision = metadata.get_revision(revision_num) if metadata and revision_num else None
+        revision = context.documents.get_revision(metadata, revision_num) if revision_num else None
 
         form, revision_form = self.get_forms(metadata, revision)
         try:
@@ -281,18 +288,22 @@ class Import(models.Model):
                 # ES indexing and schedule field rewriting. Setting
                 # `rewrite_schedule` to False disables rewriting
                 #  (ES indexing is still enabled)
-                doc, metadata, revision = save_document_forms(
-                    form, revision_form,
-                    self.batch.category,
-                    rewrite_schedule=False)
+                with transaction.atomic():
+                    doc, metadata, revision = save_document_forms(
+                        form, revision_form,
+                        self.batch.category,
+                        rewrite_schedule=False)
+                context.documents.add(metadata, revision)
                 self.document = doc
                 self.status = self.STATUSES.success
             else:
                 errors = dict(list(form.errors.items()) + list(revision_form.errors.items()))
                 self.errors = json.dumps(errors)
                 self.status = self.STATUSES.error
+                context.documents.reload(key)
         except Exception as e:
             self.errors = json.dumps({
                 'An error occurred': [str(e)]
             })
             self.status = self.STATUSES.error
+            context.documents.reload(key)
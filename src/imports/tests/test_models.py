@@ -5,7 +5,9 @@ from documents.models import Document
 from accounts.factories import UserFactory
 from default_documents.models import DemoMetadataRevision
 from categories.factories import CategoryFactory
+from accounts.models import User
 from imports.models import ImportBatch, Import
+from imports.bulk import LookupTable
 
 
 class ImportTests(TestCase):
@@ -182,6 +184,29 @@ class ImportTests(TestCase):
         self.assertEqual(doc.current_revision, 0)
         self.assertEqual(doc.latest_revision.docclass, 2)
 
+    def test_batch_import(self):
+        self.batch.do_import()
+        self.assertEqual(self.batch.status, 'success')
+        imports = Import.objects \
+            .filter(batch=self.batch) \
+            .order_by('line')
+        self.assertEqual([imp.line for imp in imports], [1, 2])
+        self.assertEqual(
+            [imp.document.document_key for imp in imports],
+            ['toto', 'tata'])
+
+    def test_batch_import_in_chunks(self):
+        self.batch.do_import(chunk_size=1)
+        self.assertEqual(self.batch.status, 'success')
+        self.assertEqual(Import.objects.filter(batch=self.batch).count(), 2)
+        self.assertEqual(Document.objects.all().count(), 2)
+
+    def test_lookup_table(self):
+        lookup = LookupTable(User, 'email', ['testadmin@phase.fr', 'toto@phase.fr'])
+        self.assertEqual(lookup.get('testadmin@phase.fr'), self.user.pk)
+        self.assertIsNone(lookup.get('toto@phase.fr'))
+        self.assertIsNone(lookup.get(None))
+
 
 class ExcelTests(TestCase):
 
@@ -2,6 +2,7 @@
 
 
 from django.apps import AppConfig
+from django.core.signals import request_started
 from django.db.models.signals import post_migrate
 
 
@@ -10,9 +11,15 @@ class MetadataConfig(AppConfig):
     db_is_ready = False
 
     def ready(self):
+        from metadata.cache import expire_local_version
         from metadata.handlers import save_db_state, populate_values_list_cache
         # Hooking to post_migrate is the only way I've found to
         # make sure the db is really available and can be queried
         # to populate the values list cache
         post_migrate.connect(save_db_state, sender=self)
         post_migrate.connect(populate_values_list_cache, sender=self)
+
+        # Local copies of values lists are checked once per request
+        request_started.connect(
+            expire_local_version,
+            dispatch_uid='expire_local_values_lists')
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""In-process copies of the values lists.
+
+Values lists are stored in the shared cache (see `metadata.handlers`), and
+are needed every time a form with a `ConfigurableChoiceField` is built. To
+save cache round trips, each process keeps the lists it uses in a small LRU
+cache.
+
+Local copies are dropped when `VALUES_LIST_VERSION_KEY` changes. The shared
+version is checked at most once per request or celery task.
+
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from metadata.handlers import VALUES_LIST_VERSION_KEY
+
+
+_lists = OrderedDict()
+_lock = threading.Lock()
+_state = {'version': None, 'checked': False}
+
+
+def expire_local_version(**kwargs):
+    """Make the next lookup check the shared version again.
+
+    Connected to the `request_started` and `task_prerun` signals.
+
+    """
+    _state['checked'] = False
+
+
+def clear_local_values_lists():
+    with _lock:
+        _lists.clear()
+    _state['checked'] = False
+
+
+def check_local_version():
+    if _state['checked']:
+        return
+
+    version = cache.get(VALUES_LIST_VERSION_KEY)
+    if version is None or version != _state['version']:
+        clear_local_values_lists()
+        _state['version'] = version
+    _state['checked'] = True
+
+
+def get_local_values_list(list_index):
+    """Return the local copy of the list, or None."""
+    check_local_version()
+    with _lock:
+        values = _lists.get(list_index)
+        if values is not None:
+            _lists.move_to_end(list_index)
+    return values
+
+
+def set_local_values_list(list_index, values):
+    with _lock:
+        _lists[list_index] = values
+        _lists.move_to_end(list_index)
+        while len(_lists) > settings.VALUES_LIST_LOCAL_CACHE_SIZE:
+            _lists.popitem(last=False)
@@ -8,32 +8,41 @@ from django.db.models.fields import BLANK_CHOICE_DASH
 from django.utils.text import capfirst
 from django.core.cache import cache
 
-from metadata.handlers import populate_values_list_cache
+from metadata.cache import get_local_values_list, set_local_values_list
+from metadata.handlers import populate_values_list_cache, get_values_list_key
 
 
 def get_choices_from_list(list_index):
     """Load the values list from cache.
 
-    Cache is populated in multiple places:
+    Lists are first looked up in the process memory (see `metadata.cache`),
+    then in the shared cache.
+
+    Shared cache is populated in multiple places:
 
      - post-migrate signal handler
      - when admin form is submitted
      - using the `reload_metadata_cache` task
 
     """
-    cache_key = 'values_list_{}'.format(list_index)
+    values = get_local_values_list(list_index)
+    if values is not None:
+        return list(values)
 
-    if cache_key not in cache:
+    cache_key = get_values_list_key(list_index)
+    values = cache.get(cache_key)
+    if values is None:
 
         # The only reason it would fail is because the
         # db is not ready. So we'll try again later.
         try:
             populate_values_list_cache()
         except:  # noqa
-            pass
+            return []
+        values = cache.get(cache_key, [])
 
-    values = cache.get(cache_key, [])
-    return values
+    set_local_values_list(list_index, values)
+    return list(values)
 
 
 class ConfigurableChoiceField(models.CharField):
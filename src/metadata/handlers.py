@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 
 
+import time
+
 from django.db.models import F, Value as V
 from django.db.models.functions import Concat
 from django.core.cache import cache
 
-from metadata.models import ListEntry
+from metadata.models import ValuesList, ListEntry
+
+
+# Changes every time values lists are reloaded
+VALUES_LIST_VERSION_KEY = 'values_list_version'
 
 
 def save_db_state(**kwargs):
@@ -13,6 +19,26 @@ def save_db_state(**kwargs):
     app.db_is_ready = True
 
 
+def get_values_list_key(list_index):
+    return 'values_list_{}'.format(list_index)
+
+
+def bump_values_list_version():
+    from metadata.cache import clear_local_values_lists
+
+    try:
+        cache.incr(VALUES_LIST_VERSION_KEY)
+    except ValueError:
+        cache.set(VALUES_LIST_VERSION_KEY, int(time.time()), None)
+    clear_local_values_lists()
+
+
+def invalidate_values_list(list_index):
+    """Make every process reload the values list."""
+    cache.delete(get_values_list_key(list_index))
+    bump_values_list_version()
+
+
 def populate_values_list_cache(**kwargs):
     values = ListEntry.objects \
         .select_related('values_list') \
@@ -20,12 +46,15 @@ def populate_values_list_cache(**kwargs):
         .order_by('values_list__index', 'order', 'index') \
         .values_list('values_list__index', 'index', 'display')
 
-    grouped = {}
+    # Empty lists are cached too, so they don't trigger a reload
+    grouped = dict(
+        (list_index, [])
+        for list_index in ValuesList.objects.values_list('index', flat=True))
     for values_list, index, value in values:
-        if values_list not in grouped:
-            grouped[values_list] = []
-        grouped[values_list].append((index, value))
+        grouped.setdefault(values_list, []).append((index, value))
 
-    for list_index, list_entries in list(grouped.items()):
-        cache_key = 'values_list_{}'.format(list_index)
-        cache.set(cache_key, list_entries, None)
+    cache.set_many(
+        dict((get_values_list_key(list_index), list_entries)
+             for list_index, list_entries in grouped.items()),
+        None)
+    bump_values_list_version()
@@ -1,8 +1,6 @@
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
-from django.core.cache import cache
-
 
 class IndexManager(models.Manager):
     def get_by_natural_key(self, index):
@@ -58,5 +56,7 @@ class ListEntry(models.Model):
         return '%s - %s' % (self.index, self.value)
 
     def save(self, *args, **kwargs):
+        from metadata.handlers import invalidate_values_list
+
         super(ListEntry, self).save(*args, **kwargs)
-        cache.delete(self.values_list.index)
+        invalidate_values_list(self.values_list.index)
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
 
+from django.core.cache import cache
 from django.test import TestCase
 
-from metadata.factories import ValuesListFactory
+from metadata.cache import expire_local_version
+from metadata.factories import ValuesListFactory, ListEntryFactory
 from metadata.fields import get_choices_from_list
-from metadata.handlers import populate_values_list_cache
+from metadata.handlers import (
+    populate_values_list_cache, get_values_list_key, VALUES_LIST_VERSION_KEY)
 
 
 class ConfigurableChoiceFieldTest(TestCase):
@@ -26,3 +29,42 @@ class ConfigurableChoiceFieldTest(TestCase):
             ('test2', 'test2 - Test 2'),
             ('test3', 'test3 - Test 3'),
         ])
+
+    def test_choices_are_kept_in_memory(self):
+        get_choices_from_list(self.values_list.index)
+        cache.delete(get_values_list_key(self.values_list.index))
+
+        choices = get_choices_from_list(self.values_list.index)
+        self.assertEqual(len(choices), 3)
+
+    def test_version_change_drops_local_copies(self):
+        get_choices_from_list(self.values_list.index)
+
+        # Another process updates the list
+        cache.set(get_values_list_key(self.values_list.index), [
+            ('test1', 'test1 - Test 1'),
+        ], None)
+        cache.incr(VALUES_LIST_VERSION_KEY)
+
+        # The version is only checked once per request
+        choices = get_choices_from_list(self.values_list.index)
+        self.assertEqual(len(choices), 3)
+
+        expire_local_version()
+        choices = get_choices_from_list(self.values_list.index)
+        self.assertEqual(choices, [('test1', 'test1 - Test 1')])
+
+    def test_saving_an_entry_reloads_the_list(self):
+        get_choices_from_list(self.values_list.index)
+        ListEntryFactory(
+            values_list=self.values_list,
+            index='test4',
+            value='Test 4')
+
+        choices = get_choices_from_list(self.values_list.index)
+        self.assertIn(('test4', 'test4 - Test 4'), choices)
+
+    def test_empty_list(self):
+        values_list = ValuesListFactory()
+        populate_values_list_cache()
+        self.assertEqual(get_choices_from_list(values_list.index), [])
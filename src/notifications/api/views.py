@@ -1,9 +1,12 @@
 from django.conf import settings
+from django.contrib.humanize.templatetags.humanize import naturaltime
+from django.template import defaultfilters as filters
 from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import list_route
 from rest_framework.authentication import SessionAuthentication
 
+from notifications import cache
 from notifications.models import Notification
 from notifications.api.serializers import NotificationSerializer
 
@@ -27,6 +30,30 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
 
     @list_route(methods=['post'])
     def mark_as_read(self, request):
-        qs = self.get_queryset()
-        qs.update(seen=True)
+        # Only unseen notifications are updated (see the partial index)
+        Notification.objects \
+            .filter(user=request.user, seen=False) \
+            .update(seen=True)
+        cache.mark_as_read(request.user.id)
         return Response({'status': 'done'})
+
+    @list_route(methods=['get'])
+    def poll(self, request):
+        """Return the number of unread notifications and the latest ones.
+
+        The client calls this every `NOTIFICATIONS_POLL_INTERVAL` seconds.
+        Only the cache is read.
+
+        """
+        user_id = request.user.id
+        unread = cache.get_unread_count(user_id)
+        latest = [{
+            'body': notification['body'],
+            'seen': notification['seen'],
+            'iso_formatted_created_on': filters.date(
+                notification['created_on'], 'c'),
+            'natural_formatted_created_on': naturaltime(
+                notification['created_on']),
+        } for notification in cache.get_latest_notifications(user_id)]
+
+        return Response({'unread': unread, 'latest': latest})
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Per-user notification data, kept in cache.
+
+Every page displays the number of unread notifications and the latest
+ones. Both are stored in cache and updated when notifications are created
+or read, so rendering a page does not require any query.
+
+Cached data is only updated once the surrounding transaction is committed,
+so rolled back changes never show up.
+
+"""
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+FIELDS = ('id', 'body', 'created_on', 'seen')
+
+
+def get_unread_key(user_id):
+    return 'notifications_unread_{}'.format(user_id)
+
+
+def get_latest_key(user_id):
+    return 'notifications_latest_{}'.format(user_id)
+
+
+def serialize(notification):
+    return dict((field, getattr(notification, field)) for field in FIELDS)
+
+
+def get_unread_count(user_id):
+    """Return the number of notifications the user has not seen."""
+    from notifications.models import Notification
+
+    key = get_unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects \
+            .filter(user_id=user_id, seen=False) \
+            .count()
+        cache.set(key, count, settings.NOTIFICATIONS_CACHE_TIMEOUT)
+    return count
+
+
+def get_latest_notifications(user_id):
+    """Return the user's latest notifications, as dicts."""
+    from notifications.models import Notification
+
+    key = get_latest_key(user_id)
+    latest = cache.get(key)
+    if latest is None:
+        latest = Notification.objects \
+            .filter(user_id=user_id) \
+            .order_by('-created_on') \
+            .values(*FIELDS)
+        latest = list(latest[:settings.DISPLAY_NOTIFICATION_COUNT])
+        cache.set(key, latest, settings.NOTIFICATIONS_CACHE_TIMEOUT)
+    return latest
+
+
+def add_notifications(notifications):
+    """Update cached data with newly created notifications.
+
+    Data that is not in cache is left alone, it will be computed when
+    it is needed.
+
+    """
+    transaction.on_commit(partial(_add_notifications, list(notifications)))
+
+
+def _add_notifications(notifications):
+    by_user = defaultdict(list)
+    for notification in notifications:
+        by_user[notification.user_id].append(notification)
+
+    for user_id, new_notifications in by_user.items():
+        try:
+            cache.incr(get_unread_key(user_id), len(new_notifications))
+        except ValueError:
+            pass
+
+        key = get_latest_key(user_id)
+        latest = cache.get(key)
+        if latest is not None:
+            new_notifications.sort(key=lambda n: n.created_on, reverse=True)
+            latest = [serialize(n) for n in new_notifications] + latest
+            latest = latest[:settings.DISPLAY_NOTIFICATION_COUNT]
+            cache.set(key, latest, settings.NOTIFICATIONS_CACHE_TIMEOUT)
+
+
+def mark_as_read(user_id):
+    """Update cached data once all the user's notifications were read."""
+    transaction.on_commit(partial(_mark_as_read, user_id))
+
+
+def _mark_as_read(user_id):
+    cache.set(get_unread_key(user_id), 0, settings.NOTIFICATIONS_CACHE_TIMEOUT)
+
+    key = get_latest_key(user_id)
+    latest = cache.get(key)
+    if latest is not None:
+        for notification in latest:
+            notification['seen'] = True
+        cache.set(key, latest, settings.NOTIFICATIONS_CACHE_TIMEOUT)
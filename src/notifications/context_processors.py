@@ -1,33 +1,25 @@
-from django.contrib.auth.models import AnonymousUser
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
 
-from notifications.models import Notification
+from notifications.cache import get_latest_notifications, get_unread_count
 
 
 def notifications(request):
-    """Fetches data required to render navigation menu.
+    """Fetches the notifications displayed on every page.
 
-    The main menu contains the list of user categories to choose.
-    Here is the query to fetch them.
+    Data is taken from cache, see `notifications.cache`.
 
     """
     user = getattr(request, 'user')
     context = {}
 
     if not isinstance(user, AnonymousUser):
-        qs = Notification.objects \
-            .filter(user=user) \
-            .order_by('-created_on')
-        notifications = list(qs[0:settings.DISPLAY_NOTIFICATION_COUNT])
-
-        if len(notifications) > 0:
-            has_new_notifications = (not notifications[0].seen)
-        else:
-            has_new_notifications = False
-
+        unread_count = get_unread_count(user.id)
         context.update({
-            'notifications': notifications,
-            'has_new_notifications': has_new_notifications,
+            'notifications': get_latest_notifications(user.id),
+            'has_new_notifications': unread_count > 0,
+            'unread_notifications_count': unread_count,
+            'notifications_poll_interval': settings.NOTIFICATIONS_POLL_INTERVAL,
         })
 
     return context
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Send many emails efficiently.
+
+Emails are described by plain dicts (see `build_email`), so they can be
+sent to a celery worker. The worker sends them in batches of
+`EMAIL_BATCH_SIZE` messages through a single smtp connection.
+
+"""
+import time
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+
+logger = logging.getLogger(__name__)
+
+
+STATS = ('sent', 'failed')
+
+
+def build_email(subject, body, recipients, html_body=None, attachments=None,
+                from_email=None):
+    """Return a serializable description of an email.
+
+    `attachments` is a list of file paths.
+
+    """
+    return {
+        'subject': subject,
+        'body': body,
+        'from_email': from_email or settings.DEFAULT_FROM_EMAIL,
+        'to': list(recipients),
+        'html_body': html_body,
+        'attachments': list(attachments or []),
+    }
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email['subject'],
+        email['body'],
+        email['from_email'],
+        email['to'],
+        connection=connection)
+    if email['html_body']:
+        message.attach_alternative(email['html_body'], 'text/html')
+    for path in email['attachments']:
+        message.attach_file(path)
+    return message
+
+
+def get_stat_key(stat):
+    return 'emails_{}'.format(stat)
+
+
+def incr_stat(stat, delta):
+    key = get_stat_key(stat)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, None)
+
+
+def get_stats():
+    """Return the number of emails sent and failed."""
+    keys = [get_stat_key(stat) for stat in STATS]
+    values = cache.get_many(keys)
+    return dict((stat, values.get(key, 0)) for stat, key in zip(STATS, keys))
+
+
+def reset_stats():
+    cache.delete_many([get_stat_key(stat) for stat in STATS])
+
+
+def send_emails_now(emails):
+    """Send the emails through a single connection.
+
+    Returns the number of emails that were sent.
+
+    """
+    emails = [email for email in emails if email['to']]
+    if not emails:
+        return 0
+
+    start = time.time()
+    connection = get_connection()
+    messages = [build_message(email, connection) for email in emails]
+    try:
+        sent = connection.send_messages(messages) or 0
+    except Exception:
+        incr_stat('failed', len(messages))
+        logger.exception('Failed to send {} emails'.format(len(messages)))
+        raise
+
+    duration = time.time() - start
+    incr_stat('sent', sent)
+    if sent < len(messages):
+        incr_stat('failed', len(messages) - sent)
+    logger.info('Sent {} emails in {:.2f}s ({:.1f} emails/sec)'.format(
+        sent, duration, sent / duration if duration else 0))
+    return sent
+
+
+def send_emails(emails):
+    """Send the emails in background, by batches."""
+    from notifications.tasks import send_mass_email
+
+    emails = [email for email in emails if email['to']]
+    batch_size = settings.EMAIL_BATCH_SIZE
+    for i in range(0, len(emails), batch_size):
+        send_mass_email.delay(emails[i:i + batch_size])
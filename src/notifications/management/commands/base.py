@@ -2,15 +2,20 @@
 
 
 from django.core.management.base import BaseCommand, CommandError
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import get_template
 from django.contrib.sites.models import Site
 from django.utils import translation
 from django.conf import settings
 
+from notifications.mail import build_email, send_emails
+
 
 class EmailCommand(BaseCommand):
-    """Base command to send email notifications."""
+    """Base command to send email notifications.
+
+    Emails are sent in batches by a celery worker, once the command is done.
+
+    """
     text_template = None
     html_template = None
 
@@ -23,22 +28,24 @@ class EmailCommand(BaseCommand):
         self.text_template = get_template(self.text_template)
         self.html_template = get_template(self.html_template)
         self.site = Site.objects.get_current()
+        self.emails = []
 
         super(EmailCommand, self).execute(*args, **options)
+        send_emails(self.emails)
 
     def send_notification(self, **kwargs):
-        """Send a single email (eventually to several users at once)."""
-        email = EmailMultiAlternatives(
+        """Queue a single email (eventually to several users at once)."""
+        recipients = self.get_recipient_list(**kwargs)
+        if not recipients:
+            return
+
+        attachment = self.get_attachment(**kwargs)
+        self.emails.append(build_email(
             self.get_subject(**kwargs),
             self.get_text(**kwargs),
-            settings.DEFAULT_FROM_EMAIL,
-            self.get_recipient_list(**kwargs))
-        email.attach_alternative(self.get_html(**kwargs), 'text/html')
-        attachment = self.get_attachment(**kwargs)
-        if attachment:
-            email.attach_file(attachment)
-
-        email.send()
+            recipients,
+            html_body=self.get_html(**kwargs),
+            attachments=[attachment] if attachment else None))
 
     def get_attachment(self, **kwargs):
         return None
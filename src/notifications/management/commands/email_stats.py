@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+
+from django.core.management.base import BaseCommand
+
+from notifications.mail import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    """Display the number of emails sent and failed."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', default=False,
+            help='Reset the counters after display')
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        self.stdout.write('sent: {sent}, failed: {failed}'.format(**stats))
+
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX notifications_notification_unseen '
+            'ON notifications_notification (user_id) WHERE NOT seen',
+            'DROP INDEX notifications_notification_unseen'),
+    ]
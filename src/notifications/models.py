@@ -1,9 +1,14 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from accounts.models import User
+from notifications.cache import add_notifications
 
 
 class Notification(models.Model):
@@ -32,21 +37,73 @@ class Notification(models.Model):
         app_label = 'notifications'
 
 
+_local = threading.local()
+
+
+class NotificationBatch(object):
+    """Notifications waiting to be created with a single query.
+
+    Identical notifications sent to the same user are only created once.
+
+    """
+    def __init__(self):
+        self.notifications = OrderedDict()
+
+    def add(self, user_id, message):
+        key = (user_id, message)
+        if key not in self.notifications:
+            self.notifications[key] = Notification(user_id=user_id, body=message)
+
+    def flush(self):
+        notifications = list(self.notifications.values())
+        Notification.objects.bulk_create(notifications)
+        add_notifications(notifications)
+        self.notifications.clear()
+
+
+@contextmanager
+def batch_notifications():
+    """Group all notifications sent in the block into a single query."""
+    if getattr(_local, 'batch', None) is not None:
+        # Nested batches are merged with the outer one
+        yield _local.batch
+        return
+
+    batch = NotificationBatch()
+    _local.batch = batch
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+    batch.flush()
+
+
+def get_user_id(user):
+    return user.id if isinstance(user, User) else user
+
+
 def notify(user, message):
     """Helper to notify a user.
 
     :arg user: can be a User instance or an user id
 
+    Inside a `batch_notifications` block, the notification is only created
+    at the end of the block, and None is returned.
+
     """
-    if isinstance(user, User):
-        user = user.id
+    user = get_user_id(user)
+    batch = getattr(_local, 'batch', None)
+    if batch is not None:
+        batch.add(user, message)
+        return None
+
     notification = Notification.objects.create(user_id=user, body=message)
+    add_notifications([notification])
     return notification
 
 
 def mass_notify(users, message):
-    """Efficiently notify several users at once."""
-    notifications = [
-        Notification(user=user, body=message) for user in users
-    ]
-    Notification.objects.bulk_create(notifications)
+    """Efficiently notify several users (instances or ids) at once."""
+    with batch_notifications() as batch:
+        for user in users:
+            batch.add(get_user_id(user), message)
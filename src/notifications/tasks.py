@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+
+from smtplib import SMTPException
+import socket
+
+from django.conf import settings
+
+from core.celery import app
+from notifications.mail import send_emails_now
+
+
+@app.task(bind=True,
+          max_retries=settings.EMAIL_MAX_RETRIES,
+          default_retry_delay=settings.EMAIL_RETRY_DELAY)
+def send_mass_email(self, emails):
+    """Send a batch of emails (see `notifications.mail.build_email`).
+
+    The batch is sent again later if the smtp server is unavailable.
+
+    """
+    try:
+        send_emails_now(emails)
+    except (SMTPException, socket.error) as exc:
+        raise self.retry(exc=exc)
@@ -0,0 +1,124 @@
+from smtplib import SMTPException
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from mock import patch
+
+from accounts.factories import UserFactory
+from notifications.cache import get_unread_count, get_latest_notifications
+from notifications.mail import build_email, send_emails, get_stats, reset_stats
+from notifications.models import (
+    Notification, notify, mass_notify, batch_notifications)
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.user1 = UserFactory()
+        self.user2 = UserFactory()
+
+    def test_notify(self):
+        notify(self.user1, 'Hello')
+        notify(self.user2.id, 'Hello')
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_batch_notifications(self):
+        with self.assertNumQueries(1):
+            with batch_notifications():
+                notify(self.user1, 'Hello')
+                notify(self.user1, 'Hello again')
+                notify(self.user2, 'Hello')
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_duplicates_are_ignored(self):
+        with batch_notifications():
+            notify(self.user1, 'Hello')
+            notify(self.user1.id, 'Hello')
+            mass_notify([self.user1, self.user2], 'Hello')
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_mass_notify(self):
+        with self.assertNumQueries(1):
+            mass_notify([self.user1, self.user2.id, self.user2], 'Hello')
+        self.assertEqual(Notification.objects.count(), 2)
+
+
+@override_settings(EMAIL_BATCH_SIZE=2)
+class MassEmailTests(TestCase):
+    def setUp(self):
+        reset_stats()
+
+    def test_send_emails(self):
+        emails = [
+            build_email('Subject', 'Body', ['user{}@phase.fr'.format(i)],
+                        html_body='<p>Body</p>')
+            for i in range(5)]
+        emails.append(build_email('Subject', 'Body', []))
+        send_emails(emails)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Body</p>', 'text/html')])
+        self.assertEqual(get_stats(), {'sent': 5, 'failed': 0})
+
+    def test_failed_batch_is_retried(self):
+        emails = [build_email('Subject', 'Body', ['user@phase.fr'])]
+        with patch('notifications.tasks.send_emails_now') as send_now:
+            send_now.side_effect = [SMTPException(), 1]
+            send_emails(emails)
+        self.assertEqual(send_now.call_count, 2)
+        send_now.assert_called_with(emails)
+
+
+class NotificationCacheTests(TransactionTestCase):
+    """Cached data is updated on transaction commit, so we cannot use
+    TestCase here."""
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory(password='pass')
+        self.client.login(email=self.user.email, password='pass')
+
+    def test_cache_is_updated_on_insert(self):
+        notify(self.user, 'Hello')
+        self.assertEqual(get_unread_count(self.user.id), 1)
+        self.assertEqual(len(get_latest_notifications(self.user.id)), 1)
+
+        with self.assertNumQueries(1):
+            mass_notify([self.user], 'Hello again')
+            self.assertEqual(get_unread_count(self.user.id), 2)
+            latest = get_latest_notifications(self.user.id)
+        self.assertEqual(latest[0]['body'], 'Hello again')
+        self.assertEqual(latest[1]['body'], 'Hello')
+
+    def test_mark_as_read(self):
+        notify(self.user, 'Hello')
+        notify(self.user, 'Hello again')
+        get_latest_notifications(self.user.id)
+
+        self.client.post(reverse('notification-mark-as-read'))
+        self.assertFalse(Notification.objects.filter(seen=False).exists())
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.id), 0)
+            latest = get_latest_notifications(self.user.id)
+        self.assertTrue(all(n['seen'] for n in latest))
+
+    def test_rolled_back_notifications(self):
+        get_unread_count(self.user.id)
+        get_latest_notifications(self.user.id)
+        try:
+            with transaction.atomic():
+                notify(self.user, 'Hello')
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        self.assertEqual(get_latest_notifications(self.user.id), [])
+
+    def test_poll(self):
+        notify(self.user, 'Hello')
+        res = self.client.get(reverse('notification-poll'))
+        data = res.json()
+        self.assertEqual(data['unread'], 1)
+        self.assertEqual(data['latest'][0]['body'], 'Hello')
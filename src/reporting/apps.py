@@ -0,0 +1,8 @@
+from django.apps.config import AppConfig
+
+
+class ReportingConfig(AppConfig):
+    name = 'reporting'
+
+    def ready(self):
+        import reporting.signals  # noqa
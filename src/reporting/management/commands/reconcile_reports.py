@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from categories.models import Category
+from reporting.utils import refresh_report
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Recompute the reporting counters of every category.
+
+    Counters are updated shortly after documents are modified, but some
+    values only depend on the current date (e.g overdue reviews), and
+    scheduled updates can be lost. This command is meant to run nightly.
+
+    """
+    def handle(self, *args, **options):
+        categories = Category.objects \
+            .filter(category_template__display_reporting=True) \
+            .select_related('organisation', 'category_template')
+
+        for category in categories:
+            logger.info('Reconciling report of category {}'.format(category))
+            refresh_report(category)
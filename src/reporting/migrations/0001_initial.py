@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0011_categorytemplate_display_reporting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryReport',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('updated_on', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Updated on')),
+                ('category', models.OneToOneField(related_name='report', verbose_name='Category', to='categories.Category')),
+            ],
+            options={
+                'verbose_name': 'Category report',
+                'verbose_name_plural': 'Category reports',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportCounter',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('kind', models.CharField(max_length=20, verbose_name='Kind', choices=[('by_status', 'Documents by status'), ('by_month', 'Documents received by month'), ('by_revs', 'Documents by number of revisions'), ('by_rc', 'Documents by return code'), ('by_ended_reviews', 'Reviews ended by month'), ('under_review', 'Documents under review by user'), ('overdue_review', 'Overdue reviews by user')])),
+                ('key', models.CharField(max_length=255, verbose_name='Key', blank=True)),
+                ('value', models.PositiveIntegerField(default=0, verbose_name='Value')),
+                ('report', models.ForeignKey(related_name='counters', verbose_name='Report', to='reporting.CategoryReport')),
+            ],
+            options={
+                'verbose_name': 'Report counter',
+                'verbose_name_plural': 'Report counters',
+            },
+        ),
+    ]
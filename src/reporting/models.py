@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from model_utils import Choices
+
+
+class CategoryReport(models.Model):
+    """Pre-aggregated reporting data for a single category.
+
+    Counters are computed off the request path (see `reporting.utils`), so
+    the report page only has to read them.
+
+    """
+    category = models.OneToOneField(
+        'categories.Category',
+        verbose_name=_('Category'),
+        related_name='report')
+    updated_on = models.DateTimeField(
+        _('Updated on'),
+        default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Category report')
+        verbose_name_plural = _('Category reports')
+
+    def __str__(self):
+        return '{}'.format(self.category)
+
+
+class ReportCounter(models.Model):
+    """A single value of a report chart, e.g "12 documents with status B"."""
+    KINDS = Choices(
+        ('by_status', _('Documents by status')),
+        ('by_month', _('Documents received by month')),
+        ('by_revs', _('Documents by number of revisions')),
+        ('by_rc', _('Documents by return code')),
+        ('by_ended_reviews', _('Reviews ended by month')),
+        ('under_review', _('Documents under review by user')),
+        ('overdue_review', _('Overdue reviews by user')),
+    )
+
+    report = models.ForeignKey(
+        CategoryReport,
+        verbose_name=_('Report'),
+        related_name='counters')
+    kind = models.CharField(
+        _('Kind'),
+        max_length=20,
+        choices=KINDS)
+    key = models.CharField(
+        _('Key'),
+        max_length=255,
+        blank=True)
+    value = models.PositiveIntegerField(
+        _('Value'),
+        default=0)
+
+    class Meta:
+        verbose_name = _('Report counter')
+        verbose_name_plural = _('Report counters')
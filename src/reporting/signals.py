@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from documents.models import Document
+from documents.signals import documents_updated
+from reporting.utils import schedule_report_update
+
+
+@receiver(post_save, sender=Document, dispatch_uid='update_report_on_save')
+@receiver(post_delete, sender=Document, dispatch_uid='update_report_on_delete')
+def update_report(sender, instance, **kwargs):
+    """Revisions and reviews updates always end up saving the document."""
+    schedule_report_update(instance.category_id)
+
+
+@receiver(documents_updated, dispatch_uid='update_report_bulk')
+def update_reports_bulk(sender, document_ids, **kwargs):
+    category_ids = Document.objects \
+        .filter(pk__in=document_ids) \
+        .values_list('category_id', flat=True) \
+        .distinct()
+    for category_id in category_ids:
+        schedule_report_update(category_id)
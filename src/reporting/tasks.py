@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+
+import logging
+
+from django.core.cache import cache
+
+from core.celery import app
+
+
+logger = logging.getLogger(__name__)
+
+
+@app.task
+def update_category_report(category_id):
+    """Recompute the reporting counters of a category."""
+    from categories.models import Category
+    from reporting.utils import refresh_report
+
+    # New changes must schedule a new update from now on
+    cache.delete('report_update_pending_{}'.format(category_id))
+
+    try:
+        category = Category.objects \
+            .select_related('category_template') \
+            .get(pk=category_id)
+    except Category.DoesNotExist:
+        return
+
+    if not category.category_template.display_reporting:
+        return
+
+    logger.info('Updating report of category {}'.format(category_id))
+    refresh_report(category)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+
+import datetime
+
+from django.test import TestCase
+
+from accounts.factories import UserFactory
+from categories.factories import CategoryFactory
+from documents.factories import DocumentFactory
+from reporting.models import CategoryReport
+from reporting.utils import format_results, get_report_data, refresh_report
+
+
+class FormatResultsTests(TestCase):
+    def test_empty_results(self):
+        self.assertEqual(format_results([]), [])
+
+    def test_fill_missing_months(self):
+        results = format_results([
+            {'year': 2017, 'month': 2, 'pk__count': 3},
+            {'year': 2016, 'month': 11, 'pk__count': 1},
+        ])
+        self.assertEqual(results, [
+            {'year': 2016, 'month': 11, 'value': 1},
+            {'year': 2016, 'month': 12, 'value': 0},
+            {'year': 2017, 'month': 1, 'value': 0},
+            {'year': 2017, 'month': 2, 'value': 3},
+        ])
+
+
+class ReportDataTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+        self.user = UserFactory(
+            name='User',
+            password='pass',
+            category=self.category)
+        self.reviewer = UserFactory(
+            name='Reviewer',
+            password='pass',
+            category=self.category)
+        for i in range(3):
+            doc = DocumentFactory(
+                category=self.category,
+                revision={
+                    'reviewers': [self.reviewer],
+                    'leader': self.user,
+                    'received_date': datetime.date(2017, 1, 15),
+                })
+            doc.latest_revision.start_review()
+
+    def test_report_is_computed_on_first_access(self):
+        self.assertFalse(CategoryReport.objects.exists())
+        data = get_report_data(self.category)
+        self.assertTrue(CategoryReport.objects.filter(category=self.category).exists())
+        self.assertEqual(data['by_month'], [{'year': 2017, 'month': 1, 'value': 3}])
+        self.assertEqual(data['by_revs'], [{'value': 1, 'count': 3}])
+        self.assertCountEqual(data['under_review'], [
+            {'value': 'User', 'count': 3},
+            {'value': 'Reviewer', 'count': 3},
+        ])
+
+    def test_stored_counters_are_read_in_one_query(self):
+        refresh_report(self.category)
+        with self.assertNumQueries(1):
+            data = get_report_data(self.category)
+        self.assertEqual(len(data['under_review']), 2)
+
+    def test_refresh_replaces_counters(self):
+        refresh_report(self.category)
+        DocumentFactory(
+            category=self.category,
+            revision={'received_date': datetime.date(2017, 3, 1)})
+        refresh_report(self.category)
+
+        data = get_report_data(self.category)
+        self.assertEqual(data['by_month'], [
+            {'year': 2017, 'month': 1, 'value': 3},
+            {'year': 2017, 'month': 2, 'value': 0},
+            {'year': 2017, 'month': 3, 'value': 1},
+        ])
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+
+import datetime
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldError
+from django.db import transaction
+from django.db.models import Func, Count
+from django.utils import timezone
+
+from reporting.models import CategoryReport, ReportCounter
+
+
+# Charts displaying a value per month
+MONTHLY_KINDS = (
+    ReportCounter.KINDS.by_month,
+    ReportCounter.KINDS.by_ended_reviews,
+)
+
+
+class Extract(Func):
+    """
+    Performs extraction of `what_to_extract` from `*expressions`.
+
+    Arguments:
+        *expressions (string): Only single value is supported, should be field name to
+                               extract from.
+        what_to_extract (string): Extraction specificator.
+
+    Returns:
+        class: Func() expression class, representing 'EXTRACT(`what_to_extract` FROM `*expressions`)'.
+
+    See: http://stackoverflow.com/questions/35368274/django-count-grouping-by-year-month-without-extra
+    """
+
+    function = 'EXTRACT'
+    template = '%(function)s(%(what_to_extract)s FROM %(expressions)s)'
+
+
+def format_results(by_month):
+    """Fill the gaps between months with zeros.
+
+    `by_month` is a list of dicts with `year`, `month` and `pk__count` keys.
+
+    """
+    counts = Counter()
+    for elt in by_month:
+        counts[(int(elt['year']), int(elt['month']))] += elt['pk__count']
+
+    if not counts:
+        return []
+
+    year, month = min(counts)
+    last = max(counts)
+    results = []
+    while (year, month) <= last:
+        results.append({
+            'month': month,
+            'year': year,
+            'value': counts[(year, month)]})
+        if month == 12:
+            year, month = year + 1, 1
+        else:
+            month += 1
+    return results
+
+
+def sort_key(item):
+    """Sort numbers before strings, since they cannot be compared."""
+    key = item[0]
+    if isinstance(key, int):
+        return (0, key, '')
+    return (1, 0, '{}'.format(key))
+
+
+def build_list(values):
+    """Format a `Counter` for the charts, sorted by value."""
+    labels = Counter()
+    for key, count in values.items():
+        labels[key or 'None'] += count
+
+    return [{'value': key, 'count': count}
+            for key, count in sorted(labels.items(), key=sort_key)]
+
+
+class ReportBuilder(object):
+    """Compute the reporting counters of a category.
+
+    Every chart is computed with a single (grouped) query.
+
+    """
+    def __init__(self, category):
+        self.category = category
+        self.metadata_class = category.document_class()
+        self.revision_class = category.revision_class()
+
+    def get_documents(self):
+        return self.metadata_class.objects \
+            .filter(document__category=self.category)
+
+    def get_revisions(self):
+        return self.revision_class.objects \
+            .filter(metadata__document__category=self.category)
+
+    def by_month(self, revisions, date_field):
+        by_month = revisions \
+            .exclude(**{'{}__isnull'.format(date_field): True}) \
+            .annotate(
+                year=Extract(date_field, what_to_extract='year'),
+                month=Extract(date_field, what_to_extract='month')) \
+            .values('year', 'month') \
+            .annotate(Count('pk'))
+        return format_results(by_month)
+
+    def get_docs_by_status(self):
+        """Count documents by status"""
+        statuses = self.get_documents() \
+            .values_list('latest_revision__status', flat=True)
+        return build_list(Counter(statuses))
+
+    def get_docs_by_month(self):
+        """Count documents received by month"""
+        return self.by_month(self.get_revisions(), 'received_date')
+
+    def get_docs_by_revs(self):
+        """Count documents received by numbers of revs"""
+        related_name = self.revision_class.__name__.lower()
+        by_revs = self.get_documents() \
+            .annotate(nb_rev=Count(related_name)) \
+            .values_list('nb_rev', flat=True)
+        return build_list(Counter(by_revs))
+
+    def get_docs_by_ended_reviews(self):
+        """Count revisions ended in each month"""
+        try:
+            return self.by_month(self.get_revisions(), 'review_end_date')
+        except FieldError:
+            return []
+
+    def get_docs_by_rc(self):
+        try:
+            return_codes = self.get_documents() \
+                .values_list('latest_revision__return_code', flat=True)
+            return build_list(Counter(return_codes))
+        except FieldError:
+            return []
+
+    def count_revisions_by_user(self, filter_dict):
+        """Count the filtered revisions each category user is involved in.
+
+        Instead of running a query per user, (user, revision) pairs are
+        fetched for each role, so a revision is counted only once for a
+        user holding several roles.
+
+        """
+        revisions_by_user = defaultdict(set)
+        try:
+            revisions = self.get_revisions().filter(**filter_dict)
+            for role in ('reviewers', 'leader', 'approver'):
+                pairs = revisions \
+                    .exclude(**{'{}__isnull'.format(role): True}) \
+                    .values_list(role, 'pk')
+                for user_id, revision_id in pairs:
+                    revisions_by_user[user_id].add(revision_id)
+        except FieldError:
+            return []
+
+        users = self.category.users.values_list('pk', 'name')
+        return [
+            {'value': name, 'count': len(revisions_by_user[user_id])}
+            for user_id, name in users if user_id in revisions_by_user]
+
+    def get_docs_under_reviews(self):
+        """Returns docs under review by user."""
+        return self.count_revisions_by_user({
+            'review_start_date__isnull': False,
+            'review_end_date__isnull': True})
+
+    def get_docs_with_overdue_review(self):
+        """Returns docs under review which date is overdue by user."""
+        today = datetime.datetime.today()
+        return self.count_revisions_by_user({
+            'review_start_date__isnull': False,
+            'review_end_date__isnull': False,
+            'review_due_date__lt': today})
+
+    def build(self):
+        """Return the (kind, key, value) counters of the category."""
+        KINDS = ReportCounter.KINDS
+        charts = (
+            (KINDS.by_status, self.get_docs_by_status()),
+            (KINDS.by_month, self.get_docs_by_month()),
+            (KINDS.by_revs, self.get_docs_by_revs()),
+            (KINDS.by_rc, self.get_docs_by_rc()),
+            (KINDS.by_ended_reviews, self.get_docs_by_ended_reviews()),
+            (KINDS.under_review, self.get_docs_under_reviews()),
+            (KINDS.overdue_review, self.get_docs_with_overdue_review()),
+        )
+
+        counters = []
+        for kind, values in charts:
+            for elt in values:
+                if kind in MONTHLY_KINDS:
+                    key = '{:04d}-{:02d}'.format(elt['year'], elt['month'])
+                    counters.append((kind, key, elt['value']))
+                else:
+                    counters.append((kind, '{}'.format(elt['value']), elt['count']))
+        return counters
+
+
+def refresh_report(category):
+    """Recompute and store the reporting counters of a category."""
+    counters = ReportBuilder(category).build()
+    with transaction.atomic():
+        report, created = CategoryReport.objects \
+            .select_for_update() \
+            .get_or_create(category=category)
+        report.counters.all().delete()
+        ReportCounter.objects.bulk_create([
+            ReportCounter(report=report, kind=kind, key=key, value=value)
+            for kind, key, value in counters])
+        report.updated_on = timezone.now()
+        report.save(update_fields=['updated_on'])
+    return counters
+
+
+def get_report_data(category):
+    """Return the charts data of a category, indexed by kind.
+
+    Stored counters are used when available, so this only costs a single
+    query. The report is computed on the fly the very first time.
+
+    """
+    counters = ReportCounter.objects \
+        .filter(report__category=category) \
+        .order_by('pk') \
+        .values_list('kind', 'key', 'value')
+    counters = list(counters)
+    if not counters and not CategoryReport.objects.filter(category=category).exists():
+        counters = refresh_report(category)
+
+    data = dict((kind, []) for kind, label in ReportCounter.KINDS)
+    for kind, key, value in counters:
+        if kind in MONTHLY_KINDS:
+            year, month = key.split('-')
+            data[kind].append({
+                'month': int(month),
+                'year': int(year),
+                'value': value})
+        else:
+            if kind == ReportCounter.KINDS.by_revs and key.isdigit():
+                key = int(key)
+            data[kind].append({'value': key, 'count': value})
+    return data
+
+
+def schedule_report_update(category_id):
+    """Update the category report once the current transaction is committed.
+
+    Documents are often saved many times in a row (imports, batch reviews…),
+    so the update is delayed by `REPORTING_UPDATE_DELAY` seconds and only a
+    single update can be pending for a category.
+
+    """
+    from reporting.tasks import update_category_report
+
+    def schedule():
+        cache_key = 'report_update_pending_{}'.format(category_id)
+        delay = settings.REPORTING_UPDATE_DELAY
+        if cache.add(cache_key, True, delay * 10):
+            update_category_report.apply_async(
+                args=[category_id], countdown=delay)
+
+    transaction.on_commit(schedule)
@@ -1,5 +1,12 @@
+from django.conf import settings
 from rest_framework import pagination
 
 
 class CustomPagination(pagination.PageNumberPagination):
     page_size_query_param = 'page_limit'
+
+
+class CustomCursorPagination(pagination.CursorPagination):
+    """Paginate without counting nor offsetting over the whole queryset."""
+    page_size = settings.API_PAGINATE_BY
+    page_size_query_param = 'page_limit'
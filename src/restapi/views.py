@@ -9,7 +9,7 @@ from django.http import HttpResponse
 from rest_framework.permissions import BasePermission
 from celery.result import AsyncResult
 
-from categories.models import Category
+from accounts.access import get_request_access
 
 
 class TaskPollView(View):
@@ -69,7 +69,7 @@ class CategoryPermission(BasePermission):
         category = view.get_category()
         if category is None:
             return False
-        return request.user in category.users.all()
+        return get_request_access(request).has_category(category)
 
 
 class CategoryAPIViewMixin(object):
@@ -92,11 +92,8 @@ class CategoryAPIViewMixin(object):
         if self._category is None:
             organisation_slug = self.kwargs.get('organisation')
             category_slug = self.kwargs.get('category')
-            try:
-                self._category = Category.objects.get(
-                    organisation__slug=organisation_slug,
-                    category_template__slug=category_slug)
-            except Category.DoesNotExist:
-                self._category = None
+            # Categories the user does not belong to are not found
+            access = get_request_access(self.request)
+            self._category = access.get_category(organisation_slug, category_slug)
 
         return self._category
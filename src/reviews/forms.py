@@ -21,6 +21,23 @@ from categories.models import Category
 
 
 class ReviewSearchForm(forms.Form):
+    """Filter the review lists.
+
+    Document numbers and titles are searched with `icontains`, backed by
+    trigram indexes (see documents migration 0009). Other filters are exact
+    matches.
+
+    """
+    # Both "reviewed" statuses share the same label in the model
+    STEP_LABELS = {
+        Review.STATUSES.reviewed: _('Reviewed without comments'),
+        Review.STATUSES.commented: _('Reviewed with comments'),
+    }
+    STEP_CHOICES = [('', '---------')] + [
+        (status, STEP_LABELS.get(status, label))
+        for status, label in Review.STATUSES
+        if status != Review.STATUSES.void]
+
     key_title = forms.CharField(
         label=_('Document nb. / Title'),
         required=False)
@@ -28,7 +45,7 @@ class ReviewSearchForm(forms.Form):
         queryset=Category.objects.all(),
         required=False)
     status = forms.ChoiceField(choices=[], required=False)
-    step = forms.CharField(required=False)
+    step = forms.ChoiceField(choices=STEP_CHOICES, required=False)
 
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
@@ -48,24 +65,26 @@ class ReviewSearchForm(forms.Form):
             .order_by('organisation__name', 'category_template__name')
 
         # Only display existing statuses
-        statuses = self.reviews.values_list('revision_status', flat=True)
-        statuses = [_f for _f in statuses if _f]
+        statuses = self.reviews \
+            .exclude(revision_status__isnull=True) \
+            .exclude(revision_status='') \
+            .order_by('revision_status') \
+            .values_list('revision_status', flat=True) \
+            .distinct()
         choices = [
             ('', '---------'),
-        ] + list(zip(statuses, statuses))
+        ] + [(status, status) for status in statuses]
         self.fields['status'].choices = choices
 
     def filter_reviews(self):
-        if not self.is_bound:
+        if not self.is_bound or not self.is_valid():
             return self.reviews
 
-        if self.is_valid():
-            qs = self.reviews
-            qs = self.filter_qs_by_number_and_title(qs)
-            qs = self.filter_qs_by_category(qs)
-            qs = self.filter_qs_by_status(qs)
-            qs = self.filter_qs_by_step(qs)
-
+        qs = self.reviews
+        qs = self.filter_qs_by_number_and_title(qs)
+        qs = self.filter_qs_by_category(qs)
+        qs = self.filter_qs_by_status(qs)
+        qs = self.filter_qs_by_step(qs)
         return qs
 
     def filter_qs_by_number_and_title(self, qs):
@@ -87,14 +106,14 @@ class ReviewSearchForm(forms.Form):
     def filter_qs_by_status(self, qs):
         status = self.cleaned_data['status']
         if status:
-            qs = qs.filter(revision_status__icontains=status)
+            qs = qs.filter(revision_status=status)
 
         return qs
 
     def filter_qs_by_step(self, qs):
         step = self.cleaned_data['step']
         if step:
-            qs = qs.filter(status__icontains=step)
+            qs = qs.filter(status=step)
 
         return qs
 
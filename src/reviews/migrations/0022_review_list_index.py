@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0021_auto_20160510_1414'),
+        ('documents', '0009_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='review',
+            index_together=set([('reviewer', 'role', 'closed_on', 'due_date'), ('reviewer', 'document', 'revision', 'role')]),
+        ),
+    ]
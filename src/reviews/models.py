@@ -2,11 +2,15 @@
 
 
 import datetime
+import operator
+from collections import defaultdict
+from functools import reduce
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models, transaction
+from django.db.models import Q, prefetch_related_objects
 from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
@@ -117,7 +121,10 @@ class Review(models.Model):
     class Meta:
         verbose_name = _('Review')
         verbose_name_plural = _('Reviews')
-        index_together = (('reviewer', 'document', 'revision', 'role'),)
+        index_together = (
+            ('reviewer', 'document', 'revision', 'role'),
+            ('reviewer', 'role', 'closed_on', 'due_date'),
+        )
         unique_together = ('reviewer', 'document', 'revision')
         app_label = 'reviews'
 
@@ -275,6 +282,15 @@ class ReviewMixin(models.Model):
 
         """
         start_date = at_date or timezone.now()
+        self.set_review_dates(start_date, due_date)
+
+        for review in self.build_reviews(start_date):
+            review.save()
+
+        self.reload_reviews()
+        self.save(update_document=True)
+
+    def set_review_dates(self, start_date, due_date=None):
         self.review_start_date = start_date
 
         duration = self.get_review_duration()
@@ -282,18 +298,29 @@ class ReviewMixin(models.Model):
             self.received_date + \
             datetime.timedelta(days=duration)
 
+    def build_reviews(self, start_date):
+        """Returns the unsaved `Review` objects of a starting review.
+
+        If there are no reviewers, the reviewers step is closed right away.
+
+        """
+        review_data = {
+            'document': self.document,
+            'revision': self.revision,
+            'received_date': self.received_date,
+            'start_date': start_date,
+            'due_date': self.review_due_date,
+            'docclass': self.docclass,
+            'revision_status': self.status,
+        }
+
+        reviews = []
         reviewers = self.reviewers.all()
         for reviewer in reviewers:
-            Review.objects.create(
+            reviews.append(Review(
                 reviewer=reviewer,
-                document=self.document,
-                revision=self.revision,
-                received_date=self.received_date,
-                start_date=start_date,
-                due_date=self.review_due_date,
-                docclass=self.docclass,
                 status='progress',
-                revision_status=self.status)
+                **review_data))
 
         # If no reviewers, close reviewers step immediatly
         if len(reviewers) == 0:
@@ -303,34 +330,82 @@ class ReviewMixin(models.Model):
             leader_review_status = 'pending'
 
         # Leader is mandatory, no need to test it
-        Review.objects.create(
+        reviews.append(Review(
             reviewer_id=self.leader_id,
             role=Review.ROLES.leader,
-            document=self.document,
-            revision=self.revision,
-            received_date=self.received_date,
-            start_date=start_date,
-            due_date=self.review_due_date,
             status=leader_review_status,
-            docclass=self.docclass,
-            revision_status=self.status)
+            **review_data))
 
         # Approver is not mandatory
         if self.approver_id:
-            Review.objects.create(
+            reviews.append(Review(
                 reviewer_id=self.approver_id,
                 role=Review.ROLES.approver,
-                document=self.document,
-                revision=self.revision,
-                received_date=self.received_date,
-                start_date=start_date,
-                due_date=self.review_due_date,
                 status=leader_review_status,
-                docclass=self.docclass,
-                revision_status=self.status)
+                **review_data))
 
-        self.reload_reviews()
-        self.save(update_document=True)
+        return reviews
+
+    @classmethod
+    @transaction.atomic
+    def bulk_start_review(cls, revisions, at_date=None):
+        """Starts the review process of several revisions at once.
+
+        Same as `start_review`, but all the `Review` objects are inserted
+        with a single query, and revisions are updated with a query per
+        distinct due date.
+
+        """
+        from reviews.signals import delete_review_count_caches
+
+        if not revisions:
+            return
+
+        start_date = at_date or timezone.now()
+        prefetch_related_objects(revisions, 'reviewers')
+
+        reviews = []
+        for revision in revisions:
+            revision.set_review_dates(start_date)
+            reviews += revision.build_reviews(start_date)
+            revision.reload_reviews()
+        Review.objects.bulk_create(reviews)
+        delete_review_count_caches(reviews)
+
+        updates = defaultdict(list)
+        for revision in revisions:
+            key = (revision.review_due_date, revision.reviewers_step_closed)
+            updates[key].append(revision.pk)
+
+        for (due_date, reviewers_step_closed), pks in updates.items():
+            cls.objects \
+                .filter(pk__in=pks) \
+                .update(
+                    review_start_date=start_date,
+                    review_due_date=due_date,
+                    reviewers_step_closed=reviewers_step_closed,
+                    updated_on=timezone.now())
+
+        cls.touch_documents(revisions)
+
+    @classmethod
+    def touch_documents(cls, revisions):
+        """Bulk version of `save(update_document=True)`."""
+        from documents.signals import documents_updated
+
+        document_ids = [revision.metadata.document_id for revision in revisions]
+        Document.objects \
+            .filter(pk__in=document_ids) \
+            .update(updated_on=timezone.now())
+        documents_updated.send(sender=cls, document_ids=document_ids)
+
+    @classmethod
+    def get_reviews_query(cls, revisions):
+        """Returns a filter matching all reviews of the given revisions."""
+        queries = [
+            Q(document_id=revision.metadata.document_id, revision=revision.revision)
+            for revision in revisions]
+        return reduce(operator.or_, queries)
 
     @transaction.atomic
     def cancel_review(self):
@@ -358,6 +433,40 @@ class ReviewMixin(models.Model):
         from reviews.signals import review_canceled
         review_canceled.send(sender=self.__class__, instance=self)
 
+    @classmethod
+    @transaction.atomic
+    def bulk_cancel_review(cls, revisions):
+        """Stops the review process of several revisions at once."""
+        from reviews.signals import review_canceled
+
+        if not revisions:
+            return
+
+        Review.objects \
+            .filter(cls.get_reviews_query(revisions)) \
+            .delete()
+
+        for revision in revisions:
+            revision.review_start_date = None
+            revision.review_due_date = None
+            revision.review_end_date = None
+            revision.reviewers_step_closed = None
+            revision.leader_step_closed = None
+            revision.reload_reviews()
+        cls.objects \
+            .filter(pk__in=[revision.pk for revision in revisions]) \
+            .update(
+                review_start_date=None,
+                review_due_date=None,
+                review_end_date=None,
+                reviewers_step_closed=None,
+                leader_step_closed=None,
+                updated_on=timezone.now())
+        cls.touch_documents(revisions)
+
+        for revision in revisions:
+            review_canceled.send(sender=cls, instance=revision)
+
     @transaction.atomic
     def end_reviewers_step(self, at_date=None, save=True):
         """Ends the first step of the review."""
@@ -381,6 +490,39 @@ class ReviewMixin(models.Model):
         if save:
             self.save(update_document=True)
 
+    @classmethod
+    @transaction.atomic
+    def bulk_end_reviewers_step(cls, revisions, at_date=None):
+        """Ends the first step of the review of several revisions at once."""
+        from reviews.signals import delete_review_count_caches
+
+        if not revisions:
+            return
+
+        end_date = at_date or timezone.now()
+        query = cls.get_reviews_query(revisions)
+
+        reviews = Review.objects \
+            .filter(query) \
+            .filter(role__in=(Review.ROLES.reviewer, Review.ROLES.leader))
+        delete_review_count_caches(reviews.only('reviewer_id', 'role'))
+
+        reviews \
+            .filter(role=Review.ROLES.reviewer) \
+            .filter(closed_on=None) \
+            .update(closed_on=end_date, status='not_reviewed')
+        reviews \
+            .filter(role=Review.ROLES.leader) \
+            .update(status='progress')
+
+        for revision in revisions:
+            revision.reviewers_step_closed = end_date
+            revision.reload_reviews()
+        cls.objects \
+            .filter(pk__in=[revision.pk for revision in revisions]) \
+            .update(reviewers_step_closed=end_date, updated_on=timezone.now())
+        cls.touch_documents(revisions)
+
     @transaction.atomic
     def end_leader_step(self, at_date=None, save=True):
         """Ends the second step of the review.
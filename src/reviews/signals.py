@@ -4,6 +4,7 @@ from django.core.cache import cache
 
 from reviews.models import Review
 from documents.models import Document
+from documents.signals import documents_updated
 
 
 review_canceled = Signal()
@@ -20,6 +21,15 @@ def delete_review_count_cache(sender, instance, **kwargs):
     cache.delete(cache_key)
 
 
+def delete_review_count_caches(reviews):
+    """Same as `delete_review_count_cache`, for reviews updated in bulk."""
+    keys = set()
+    for review in reviews:
+        keys.add('review_step_count_%d_%s' % (review.reviewer_id, review.role))
+        keys.add('review_step_count_%d_priorities' % review.reviewer_id)
+    cache.delete_many(list(keys))
+
+
 post_save.connect(delete_review_count_cache, sender=Review, dispatch_uid='update_review_cache_count_on_save')
 post_delete.connect(delete_review_count_cache, sender=Review, dispatch_uid='update_review_cache_count_on_delete')
 
@@ -43,3 +53,12 @@ def delete_distribution_list_cache(sender, instance, **kwargs):
 
     cache_key = 'dummy_reviews_{}'.format(instance.id)
     cache.delete(cache_key)
+
+
+@receiver(documents_updated, dispatch_uid='delete_distrib_list_cache_bulk')
+def delete_distribution_lists_cache(sender, document_ids, **kwargs):
+    keys = []
+    for document_id in document_ids:
+        keys.append('all_reviews_{}'.format(document_id))
+        keys.append('dummy_reviews_{}'.format(document_id))
+    cache.delete_many(keys)
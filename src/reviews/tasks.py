@@ -6,18 +6,65 @@ from django.contrib.contenttypes.models import ContentType
 from celery import current_task
 
 from accounts.models import User
+from categories.models import Category
+from documents.serialization import get_revision_serializer
 from audit_trail.models import Activity
-from audit_trail.signals import activity_log
+from audit_trail.signals import bulk_activity_log
 from core.celery import app
 from reviews.signals import pre_batch_review, post_batch_review, batch_item_indexed
 from reviews.models import Review
-from notifications.models import notify
+from reviews.utils import close_reviewers_reviews
+from notifications.models import notify, batch_notifications
 from discussion.models import Note
+from search.queue import coalesce_indexing
 
 
 logger = logging.getLogger(__name__)
 
 
+def format_documents_list(message, documents):
+    links = '</li><li>'.join(
+        '<a href="%s">%s</a>' % (doc.get_absolute_url(), doc) for doc in documents)
+    return '{} <ul><li>{}</li></ul>'.format(message, links)
+
+
+def notify_batch_results(user_id, ok, nok, ok_message, nok_message):
+    """Send success and failure notifications, with a single query."""
+    with batch_notifications():
+        if len(ok) > 0:
+            notify(user_id, format_documents_list(ok_message, ok))
+        if len(nok) > 0:
+            notify(user_id, format_documents_list(nok_message, nok))
+
+
+def start_reviews(revision_class, revisions):
+    """Start the review of all the given revisions.
+
+    Reviews are started in bulk. If it fails, they are started one by one
+    to find out which revisions cannot be reviewed.
+
+    Returns the lists of started and failed revisions.
+
+    """
+    try:
+        with transaction.atomic():
+            revision_class.bulk_start_review(revisions)
+        return revisions, []
+    except:  # noqa
+        logger.warning('Cannot start reviews in bulk, falling back to '
+                       'one by one review start.')
+
+    ok = []
+    nok = []
+    for revision in revisions:
+        try:
+            revision.start_review()
+            ok.append(revision)
+        except:  # noqa
+            nok.append(revision)
+    return ok, nok
+
+
 @app.task
 def do_batch_import(user_id, category_id, contenttype_id, document_ids,
                     remark=None):
@@ -25,86 +72,81 @@ def do_batch_import(user_id, category_id, contenttype_id, document_ids,
     # Fetch document list
     contenttype = ContentType.objects.get_for_id(contenttype_id)
     document_class = contenttype.model_class()
+    revision_class = document_class.get_revision_class()
     docs = document_class.objects \
-        .select_related() \
+        .select_related(
+            'document__category__organisation',
+            'document__category__category_template',
+            'latest_revision__metadata__document') \
         .filter(document__category_id=category_id) \
         .filter(document_id__in=document_ids)
-
-    ok = []
-    nok = []
-    count = 0
-    total_docs = docs.count()
-
-    # We compute the progress as the proportion of documents for which the
-    # review has started.
-    # However, after all documents are treated, there is still the
-    # index + refresh step which takes quite some time. So we artificially
-    # increase the document count as a hackish way to never display a 100%
-    # progress bar as long as the task is not truly finished.
-    total_docs += 30
+    category = Category.objects \
+        .select_related('organisation', 'category_template') \
+        .get(pk=category_id)
+    user = User.objects.get(pk=user_id)
 
     pre_batch_review.send(sender=do_batch_import)
 
-    # Try to start the review for every listed document
+    # Only revisions with a leader and no review yet can be reviewed
+    ok = []
+    nok = []
     for doc in docs:
-        try:
-            if not doc.latest_revision.can_be_reviewed:
-                raise RuntimeError()
-
-            doc.latest_revision.start_review()
-            user = User.objects.get(pk=user_id)
-            activity_log.send(verb=Activity.VERB_STARTED_REVIEW,
-                              target=doc.latest_revision,
-                              sender=do_batch_import,
-                              actor=user)
-            # In case of batch review start with a remark,
-            # the same remark is added for every review.
-            # Note: using "bulk_create" to create all the discussion
-            # at the end of the task would be much more efficient.
-            # However, by doing so, individual `post_save` signals would not
-            # be fired. Since the request is expected to take some time anyway,
-            # we will let this as is for now.
-            if remark:
-                Note.objects.create(
-                    author_id=user_id,
-                    document_id=doc.document.id,
-                    revision=doc.latest_revision.revision,
-                    body=remark)
+        if doc.latest_revision.can_be_reviewed:
+            ok.append(doc)
+        else:
+            nok.append(doc)
 
+    current_task.update_state(
+        state='PROGRESS',
+        meta={'progress': 10})
+
+    # Start all reviews at once, documents are indexed in a single batch
+    with coalesce_indexing():
+        revisions = [doc.latest_revision for doc in ok]
+        started, failed = start_reviews(revision_class, revisions)
+
+    failed = set(revision.pk for revision in failed)
+    nok += [doc for doc in ok if doc.latest_revision.pk in failed]
+    ok = [doc for doc in ok if doc.latest_revision.pk not in failed]
+
+    current_task.update_state(
+        state='PROGRESS',
+        meta={'progress': 70})
+
+    bulk_activity_log(
+        Activity.VERB_STARTED_REVIEW,
+        actor=user,
+        targets=[doc.latest_revision for doc in ok])
+
+    # In case of batch review start with a remark,
+    # the same remark is added for every review.
+    # Note: using "bulk_create" to create all the discussion
+    # would be much more efficient. However, by doing so, individual
+    # `post_save` signals would not be fired.
+    if remark:
+        for doc in ok:
+            Note.objects.create(
+                author_id=user_id,
+                document_id=doc.document.id,
+                revision=doc.latest_revision.revision,
+                body=remark)
+
+    if batch_item_indexed.has_listeners(sender=do_batch_import):
+        serializer = get_revision_serializer(category)
+        for doc in ok:
             batch_item_indexed.send(
                 sender=do_batch_import,
                 document_type=doc.document.document_type(),
                 document_id=doc.id,
-                json=doc.latest_revision.to_json())
-            ok.append(doc)
-        except:  # noqa
-            nok.append(doc)
-
-        # Update the task progression bar
-        count += 1
-        progress = float(count) / total_docs * 100
-        current_task.update_state(
-            state='PROGRESS',
-            meta={'progress': progress})
+                json=serializer.to_json(doc.latest_revision))
 
     post_batch_review.send(sender=do_batch_import, user_id=user_id)
 
     # Send success and failure notifications
-    if len(ok) > 0:
-        ok_message = ugettext('The review started for the following documents:')
-        ok_list = '</li><li>'.join('<a href="%s">%s</a>' % (doc.get_absolute_url(), doc) for doc in ok)
-        notify(user_id, '{} <ul><li>{}</li></ul>'.format(
-            ok_message,
-            ok_list
-        ))
-
-    if len(nok) > 0:
-        nok_message = ugettext("We failed to start the review for the following documents:")
-        nok_list = '</li><li>'.join('<a href="%s">%s</a>' % (doc.get_absolute_url(), doc) for doc in nok)
-        notify(user_id, '{} <ul><li>{}</li></ul>'.format(
-            nok_message,
-            nok_list
-        ))
+    notify_batch_results(
+        user_id, ok, nok,
+        ugettext('The review started for the following documents:'),
+        ugettext("We failed to start the review for the following documents:"))
 
     return 'done'
 
@@ -119,72 +161,49 @@ def batch_close_reviews(user_id, review_ids):
     logger.info('Closing several reviews at once: {}'.format(
         ', '.join(review_ids)))
 
-    ok = []
-    nok = []
-    nb_reviews = len(review_ids)
     reviews = Review.objects \
         .filter(reviewer_id=user_id) \
         .filter(role=Review.ROLES.reviewer) \
         .filter(status=Review.STATUSES.progress) \
         .filter(id__in=review_ids) \
-        .select_related()
+        .select_related(
+            'document__category__organisation',
+            'document__category__category_template')
+    reviews = list(reviews)
+    user = User.objects.get(pk=user_id)
 
-    counter = float(1)
-    comments = None
-    for review in reviews:
+    current_task.update_state(
+        state='PROGRESS',
+        meta={'progress': 10})
 
-        # Update progress counter
-        progress = counter / nb_reviews * 100
-        current_task.update_state(
-            state='PROGRESS',
-            meta={'progress': progress})
-
-        try:
-            with transaction.atomic():
-                # Post an empty review
-                logger.info('Closing review {}'.format(review.id))
-                review.post_review(comments, save=True)
-
-                # Check if the review step has ended
-                # TODO This is highly inefficient. Maybe one day
-                # find another way to do it?
-                document = review.document
-                latest_revision = document.get_latest_revision()
-                waiting_reviews = Review.objects \
-                    .filter(document=document) \
-                    .filter(revision=review.revision) \
-                    .filter(role='reviewer') \
-                    .exclude(closed_on=None)
-                if waiting_reviews.count() == latest_revision.reviewers.count():
-                    logger.info('Closing reviewers step')
-                    latest_revision.end_reviewers_step(save=False)
-                    user = User.objects.get(pk=user_id)
-                    activity_log.send(verb=Activity.VERB_CLOSED_REVIEWER_STEP,
-                                      target=latest_revision,
-                                      sender=do_batch_import,
-                                      actor=user)
-            ok.append(review.document)
-        except:  # noqa
-            nok.append(review.document)
-            pass
-
-        counter += 1
-
-    if len(ok) > 0:
-        ok_message = ugettext('You closed the review for the following documents:')
-        ok_list = '</li><li>'.join('<a href="%s">%s</a>' % (doc.get_absolute_url(), doc) for doc in ok)
-        notify(user_id, '{} <ul><li>{}</li></ul>'.format(
-            ok_message,
-            ok_list
-        ))
-
-    if len(nok) > 0:
-        nok_message = ugettext("We failed to close the review for the following documents:")
-        nok_list = '</li><li>'.join('<a href="%s">%s</a>' % (doc.get_absolute_url(), doc) for doc in nok)
-        notify(user_id, '{} <ul><li>{}</li></ul>'.format(
-            nok_message,
-            nok_list
-        ))
+    ok = []
+    nok = []
+    closed_revisions = []
+    try:
+        # Post empty reviews, and close the reviewers steps that are over
+        with transaction.atomic(), coalesce_indexing():
+            closed_revisions = close_reviewers_reviews(reviews)
+        ok = [review.document for review in reviews]
+    except:  # noqa
+        logger.exception('Cannot close reviews {}'.format(review_ids))
+        nok = [review.document for review in reviews]
+
+    current_task.update_state(
+        state='PROGRESS',
+        meta={'progress': 80})
+
+    if closed_revisions:
+        logger.info('Closing reviewers step for {} revisions'.format(
+            len(closed_revisions)))
+        bulk_activity_log(
+            Activity.VERB_CLOSED_REVIEWER_STEP,
+            actor=user,
+            targets=closed_revisions)
+
+    notify_batch_results(
+        user_id, ok, nok,
+        ugettext('You closed the review for the following documents:'),
+        ugettext("We failed to close the review for the following documents:"))
 
     return 'done'
 
@@ -193,55 +212,50 @@ def batch_close_reviews(user_id, review_ids):
 def batch_cancel_reviews(user_id, category_id, contenttype_id, document_ids):
     contenttype = ContentType.objects.get_for_id(contenttype_id)
     document_class = contenttype.model_class()
+    revision_class = document_class.get_revision_class()
 
     docs = document_class.objects \
-        .select_related() \
+        .select_related(
+            'document__category__organisation',
+            'document__category__category_template',
+            'latest_revision__metadata__document') \
         .filter(document__category_id=category_id) \
         .filter(document_id__in=document_ids)
+    user = User.objects.get(pk=user_id)
 
     ok = []
     nok = []
-    counter = float(1)
-    nb_reviews = docs.count()
-
     for doc in docs:
-
-        # Update progress counter
-        progress = counter / nb_reviews * 100
-        current_task.update_state(
-            state='PROGRESS',
-            meta={'progress': progress})
-
-        try:
-            if not doc.latest_revision.is_under_review():
-                raise RuntimeError()
-
-            doc.latest_revision.cancel_review()
-            user = User.objects.get(pk=user_id)
-            activity_log.send(verb=Activity.VERB_CANCELLED_REVIEW,
-                              target=doc.latest_revision,
-                              sender=batch_cancel_reviews,
-                              actor=user)
+        if doc.latest_revision.is_under_review():
             ok.append(doc)
-        except:  # noqa
+        else:
             nok.append(doc)
 
-        counter += 1
-
-    if len(ok) > 0:
-        ok_message = ugettext('You canceled the review for the following documents:')
-        ok_list = '</li><li>'.join('<a href="%s">%s</a>' % (doc.get_absolute_url(), doc) for doc in ok)
-        notify(user_id, '{} <ul><li>{}</li></ul>'.format(
-            ok_message,
-            ok_list
-        ))
-
-    if len(nok) > 0:
-        nok_message = ugettext("We failed to cancel the review for the following documents:")
-        nok_list = '</li><li>'.join('<a href="%s">%s</a>' % (doc.get_absolute_url(), doc) for doc in nok)
-        notify(user_id, '{} <ul><li>{}</li></ul>'.format(
-            nok_message,
-            nok_list
-        ))
+    current_task.update_state(
+        state='PROGRESS',
+        meta={'progress': 10})
+
+    try:
+        with transaction.atomic(), coalesce_indexing():
+            revision_class.bulk_cancel_review(
+                [doc.latest_revision for doc in ok])
+    except:  # noqa
+        logger.exception('Cannot cancel reviews')
+        nok += ok
+        ok = []
+
+    current_task.update_state(
+        state='PROGRESS',
+        meta={'progress': 80})
+
+    bulk_activity_log(
+        Activity.VERB_CANCELLED_REVIEW,
+        actor=user,
+        targets=[doc.latest_revision for doc in ok])
+
+    notify_batch_results(
+        user_id, ok, nok,
+        ugettext('You canceled the review for the following documents:'),
+        ugettext("We failed to cancel the review for the following documents:"))
 
     return 'done'
@@ -13,6 +13,7 @@ from default_documents.models import ContractorDeliverable
 from default_documents.forms import ContractorDeliverableRevisionForm
 from default_documents.factories import (ContractorDeliverableFactory,
                                          ContractorDeliverableRevisionFactory)
+from reviews.forms import ReviewSearchForm
 from reviews.models import Review
 
 
@@ -357,3 +358,72 @@ class UpdateDistribListTests(BaseReviewFormMixinTests):
         self.assertIsNone(review)
 
         self.assertIsNone(self.rev.review_end_date)
+
+
+class ReviewSearchFormTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+        self.user = UserFactory(
+            email='testadmin@phase.fr',
+            password='pass',
+            is_superuser=True,
+            category=self.category)
+        self.other_user = UserFactory(
+            email='test@phase.fr',
+            category=self.category)
+
+        self.doc1 = DocumentFactory(
+            category=self.category,
+            document_key='HAZOP-REPORT',
+            title='Hazop report',
+            revision={
+                'reviewers': [self.user],
+                'leader': self.other_user,
+                'received_date': datetime.date.today(),
+                'status': 'STD',
+            })
+        self.doc1.latest_revision.start_review()
+        self.doc2 = DocumentFactory(
+            category=self.category,
+            document_key='PIPING-DRAWING',
+            title='Piping drawing',
+            revision={
+                'reviewers': [self.user],
+                'leader': self.other_user,
+                'received_date': datetime.date.today(),
+                'status': 'STD2',
+            })
+        self.doc2.latest_revision.start_review()
+
+        self.reviews = Review.objects.filter(reviewer=self.user)
+
+    def search(self, **data):
+        form = ReviewSearchForm(data, user=self.user, reviews=self.reviews)
+        return form.filter_reviews()
+
+    def test_status_choices_are_distinct(self):
+        form = ReviewSearchForm(user=self.user, reviews=self.reviews)
+        self.assertEqual(form.fields['status'].choices, [
+            ('', '---------'), ('STD', 'STD'), ('STD2', 'STD2')])
+
+    def test_search_by_key_or_title(self):
+        reviews = self.search(key_title='hazop')
+        self.assertEqual([r.document for r in reviews], [self.doc1])
+
+        reviews = self.search(key_title='drawing')
+        self.assertEqual([r.document for r in reviews], [self.doc2])
+
+    def test_status_is_an_exact_match(self):
+        reviews = self.search(status='STD')
+        self.assertEqual([r.document for r in reviews], [self.doc1])
+
+    def test_step_is_an_exact_match(self):
+        self.assertEqual(self.search(step='progress').count(), 2)
+        self.assertEqual(self.search(step='reviewed').count(), 0)
+
+    def test_step_labels_are_unique(self):
+        labels = [label for status, label in ReviewSearchForm.STEP_CHOICES]
+        self.assertEqual(len(labels), len(set(labels)))
+
+    def test_invalid_search_returns_all_reviews(self):
+        self.assertEqual(self.search(step='unknown').count(), 2)
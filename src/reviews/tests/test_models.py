@@ -215,6 +215,46 @@ class ReviewMixinTests(TestCase):
         self.assertIsNone(revision.reviewers_step_closed)
         self.assertIsNone(revision.leader_step_closed)
 
+    def test_bulk_start_review(self):
+        revision = self.create_reviewable_document()
+        leader_only_revision = self.create_leader_only_document()
+
+        revision.__class__.bulk_start_review([revision, leader_only_revision])
+
+        revision = revision.document.get_latest_revision()
+        self.assertTrue(revision.is_under_review())
+        self.assertIsNone(revision.reviewers_step_closed)
+        self.assertEqual(len(revision.get_reviews()), 3)
+        self.assertEqual(revision.get_leader_review().status, 'pending')
+
+        leader_only_revision = leader_only_revision.document.get_latest_revision()
+        self.assertTrue(leader_only_revision.is_under_review())
+        self.assertIsNotNone(leader_only_revision.reviewers_step_closed)
+        self.assertEqual(leader_only_revision.get_leader_review().status, 'progress')
+
+    def test_bulk_cancel_review(self):
+        revision = self.create_reviewable_document()
+        revision.start_review()
+
+        revision.__class__.bulk_cancel_review([revision])
+        reviews = Review.objects.filter(document=revision.document)
+        self.assertEqual(reviews.count(), 0)
+
+        revision = revision.document.get_latest_revision()
+        self.assertIsNone(revision.review_start_date)
+        self.assertIsNone(revision.review_due_date)
+
+    def test_bulk_end_reviewers_step(self):
+        revision = self.create_reviewable_document()
+        revision.start_review()
+
+        revision.__class__.bulk_end_reviewers_step([revision])
+
+        revision = revision.document.get_latest_revision()
+        self.assertIsNotNone(revision.reviewers_step_closed)
+        self.assertEqual(revision.get_review(self.user2).status, 'not_reviewed')
+        self.assertEqual(revision.get_leader_review().status, 'progress')
+
     def test_end_reviewers_step(self):
         revision = self.create_reviewable_document()
         revision.start_review()
@@ -4,7 +4,8 @@ from django.test import TestCase
 from django.contrib.contenttypes.models import ContentType
 
 from audit_trail.models import Activity
-from reviews.tasks import do_batch_import, batch_cancel_reviews
+from reviews.tasks import (
+    do_batch_import, batch_cancel_reviews, batch_close_reviews)
 
 from documents.models import Document
 from categories.factories import CategoryFactory
@@ -132,3 +133,31 @@ class BatchReviewTests(TestCase):
                              Activity.VERB_CANCELLED_REVIEW)
             self.assertEqual(activities[i].target,
                              doc.get_latest_revision())
+
+    def test_batch_close_reviews(self):
+        reviewer = UserFactory(
+            email='reviewer@phase.fr',
+            password='pass',
+            category=self.category)
+        doc = DocumentFactory(
+            category=self.category,
+            revision={
+                'leader': self.user,
+                'reviewers': [reviewer],
+                'received_date': datetime.date.today(),
+            }
+        )
+        revision = doc.get_latest_revision()
+        revision.start_review()
+        review = revision.get_review(reviewer)
+
+        batch_close_reviews.delay(reviewer.id, [str(review.id)])
+
+        revision = doc.get_latest_revision()
+        self.assertIsNotNone(revision.reviewers_step_closed)
+        self.assertEqual(revision.get_review(reviewer).status, 'reviewed')
+        self.assertEqual(revision.get_leader_review().status, 'progress')
+
+        activity = Activity.objects.get()
+        self.assertEqual(activity.verb, Activity.VERB_CLOSED_REVIEWER_STEP)
+        self.assertEqual(activity.target, revision)
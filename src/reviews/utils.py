@@ -1,6 +1,9 @@
 from itertools import groupby
+from collections import defaultdict
 
 from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 
 from reviews.models import Review, ReviewMixin
@@ -110,3 +113,68 @@ def get_all_reviewable_classes():
     """Return all available ReviewMixin subclasses."""
     classes = [ct.model_class() for ct in get_all_reviewable_types()]
     return classes
+
+
+def close_reviewers_reviews(reviews, at_date=None):
+    """Post empty reviews for several reviewers at once.
+
+    When all the reviewers of a revision have posted their review, the
+    reviewers step is closed. Reviews that are still open are counted for
+    all the revisions with a single grouped query.
+
+    Returns the list of revisions which reviewers step was closed.
+
+    """
+    from reviews.signals import delete_review_count_caches
+
+    if not reviews:
+        return []
+
+    end_date = at_date or timezone.now()
+    review_ids = [review.pk for review in reviews]
+    qs = Review.objects.filter(pk__in=review_ids)
+    qs.exclude(closed_on=None).update(
+        amended_on=end_date,
+        status=Review.STATUSES.reviewed,
+        comments=None,
+        return_code=None)
+    qs.filter(closed_on=None).update(
+        closed_on=end_date,
+        status=Review.STATUSES.reviewed,
+        comments=None,
+        return_code=None)
+    delete_review_count_caches(reviews)
+
+    document_ids = set(review.document_id for review in reviews)
+    cache.delete_many(['all_reviews_{}'.format(document_id)
+                       for document_id in document_ids])
+
+    # Which revisions still have open reviewers reviews?
+    open_reviews = Review.objects \
+        .filter(document_id__in=document_ids) \
+        .filter(role=Review.ROLES.reviewer) \
+        .filter(closed_on=None) \
+        .values('document_id', 'revision') \
+        .annotate(nb_open=Count('id'))
+    still_open = set((row['document_id'], row['revision']) for row in open_reviews)
+
+    # Group completed revisions by revision class
+    completed = defaultdict(set)
+    for review in reviews:
+        key = (review.document_id, review.revision)
+        if key not in still_open:
+            revision_class = review.document.category.revision_class()
+            completed[revision_class].add(key)
+
+    closed_revisions = []
+    for revision_class, keys in completed.items():
+        revisions = revision_class.objects \
+            .filter(metadata__document_id__in=[key[0] for key in keys]) \
+            .select_related('metadata__document')
+        revisions = [
+            revision for revision in revisions
+            if (revision.metadata.document_id, revision.revision) in keys]
+        revision_class.bulk_end_reviewers_step(revisions, at_date=end_date)
+        closed_revisions += revisions
+
+    return closed_revisions
@@ -29,6 +29,7 @@ from reviews.models import Review
 from reviews.tasks import (do_batch_import, batch_close_reviews,
                            batch_cancel_reviews)
 from reviews.forms import BasePostReviewForm, ReviewSearchForm
+from feeds.tokens import get_feed_url
 from privatemedia.views import serve_model_file_field
 
 
@@ -211,7 +212,8 @@ class BaseReviewDocumentList(LoginRequiredMixin, ListView):
         })
         if hasattr(self, 'feed_url'):
             context.update({
-                'feed_url': reverse(self.feed_url),
+                'feed_url': get_feed_url(
+                    reverse(self.feed_url), self.request.user),
             })
         return context
 
@@ -9,7 +9,19 @@ class SchedulesConfig(AppConfig):
     verbose_name = 'Schedules'
 
     def ready(self):
+        from django.apps import apps
+        from django.db.models.signals import post_save
         from documents import signals
-        from schedules.handlers import update_schedule_section
+        from schedules.models import ScheduleMixin
+        from schedules.handlers import (
+            update_schedule_section, update_next_due_forecast_date)
 
         signals.document_form_saved.connect(update_schedule_section)
+
+        for model in apps.get_models():
+            if issubclass(model, ScheduleMixin):
+                post_save.connect(
+                    update_next_due_forecast_date,
+                    sender=model.get_revision_class(),
+                    dispatch_uid='update_next_due_forecast_date_{}'.format(
+                        model._meta.label_lower))
@@ -33,4 +33,19 @@ def update_schedule_section(document, metadata, revision, rewrite_schedule=True,
             if not getattr(metadata, field, None):
                 setattr(metadata, field, rev.created_on)
 
+    # The next due forecast date is also updated on save
     metadata.save()
+
+
+def update_next_due_forecast_date(sender, instance, **kwargs):
+    """The next due date depends on the status of the latest revision."""
+    metadata = instance.metadata
+    if metadata.latest_revision_id != instance.pk:
+        return
+
+    due_date = metadata.get_next_due_forecast_date(status=instance.status)
+    if due_date != metadata.next_due_forecast_date:
+        metadata.next_due_forecast_date = due_date
+        type(metadata).objects \
+            .filter(pk=metadata.pk) \
+            .update(next_due_forecast_date=due_date)
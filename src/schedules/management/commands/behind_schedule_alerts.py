@@ -1,16 +1,14 @@
-import operator
-from functools import reduce
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db.models import Q
+from django.db import connection
 from django.utils import timezone
 from django.template.loader import render_to_string
-from django.core.mail import send_mail
 from django.contrib.sites.models import Site
-from django.core.exceptions import FieldDoesNotExist
-from django.conf import settings
 
-from metadata.fields import get_choices_from_list
+from notifications.mail import build_email, send_emails
 from schedules.models import ScheduleMixin
 from categories.models import Category
 from accounts.models import User
@@ -21,54 +19,62 @@ ALERT_MAIL_BODY_HTML_TPL = 'schedules/behind_schedule_alert_body.html'
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int,
+            default=settings.BEHIND_SCHEDULE_ALERTS_THREADS,
+            help='Number of categories processed in parallel')
+
+    def handle(self, *args, **options):
         # Get all categories
         # Filter categories, get the ones with Metadata inheriting "ScheduleMixin"
         # For each category, fetch documents behind schedule
 
         site = Site.objects.get_current()
         recipients = self.fetch_alert_recipients()
+        if not recipients:
+            return
+
         categories = self.fetch_categories_with_schedulable_content()
-        documents = []
-        for category in categories:
-            category_documents = self.fetch_documents_behind_schedule(category)
-            if len(category_documents) > 0:
-                documents.append((category, category_documents))
+        documents = self.fetch_all_documents_behind_schedule(
+            categories, options['threads'])
+        if not documents:
+            return
+
+        recipients_categories = self.fetch_recipients_categories(recipients)
+        email_subject = 'Documents behind schedule on {:%d/%m/%Y}'.format(
+            timezone.now()
+        )
 
+        emails = []
         for recipient in recipients:
             # Let's build a subset of the document list, depending on the
             # categories the current recipient has access to.
-            recipient_categories = recipient.categories.all()
-            recipient_documents = [(cat, doc) for cat, doc in documents
-                                   if cat in recipient_categories]
+            category_ids = recipients_categories[recipient.pk]
+            recipient_documents = [
+                (cat, docs) for cat, docs in documents
+                if cat.pk in category_ids]
             if not recipient_documents:
                 continue
 
-            email_subject = 'Documents behind schedule on {:%d/%m/%Y}'.format(
-                timezone.now()
-            )
-            email_body = render_to_string(ALERT_MAIL_BODY_TPL, {
-                'user': recipient,
-                'documents': recipient_documents,
-                'scheme': 'https',
-                'domain': site.domain,
-            })
-            html_body = render_to_string(ALERT_MAIL_BODY_HTML_TPL, {
+            context = {
                 'user': recipient,
                 'documents': recipient_documents,
                 'scheme': 'https',
                 'domain': site.domain,
-            })
-            send_mail(
+            }
+            email_body = render_to_string(ALERT_MAIL_BODY_TPL, context)
+            html_body = render_to_string(ALERT_MAIL_BODY_HTML_TPL, context)
+            emails.append(build_email(
                 email_subject,
                 email_body,
-                settings.DEFAULT_FROM_EMAIL,
                 [recipient.email],
-                html_message=html_body
-            )
+                html_body=html_body))
             self.stdout.write('Sending mail to {} ({})'.format(
                 recipient, recipient.email))
 
+        send_emails(emails)
+
     def fetch_categories_with_schedulable_content(self):
         """Fetch all categories where the document class has a Schedulable behavior."""
 
@@ -82,7 +88,30 @@ class Command(BaseCommand):
             return issubclass(metadata_cls, ScheduleMixin)
 
         schedulables_categories = filter(has_schedulable_content, categories)
-        return schedulables_categories
+        return list(schedulables_categories)
+
+    def fetch_all_documents_behind_schedule(self, categories, threads=1):
+        """Return a list of (category, documents) for every late category."""
+        if threads > 1:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                results = list(executor.map(
+                    self.fetch_documents_in_thread, categories))
+        else:
+            results = [
+                self.fetch_documents_behind_schedule(category)
+                for category in categories]
+
+        return [
+            (category, category_documents)
+            for category, category_documents in zip(categories, results)
+            if category_documents]
+
+    def fetch_documents_in_thread(self, category):
+        try:
+            return self.fetch_documents_behind_schedule(category)
+        finally:
+            # Every thread opens its own db connection
+            connection.close()
 
     def fetch_documents_behind_schedule(self, category):
         """Fetch documents behind schedule.
@@ -91,97 +120,34 @@ class Command(BaseCommand):
         certain status at a certain date (forecast), and that date has
         already passed whereas the document still has not reached that status.
 
-        It technical terms, it means:
-
-          - in it's "schedule" table, the document has one line with a
-            `forecast` value that is < today and an `actual` value that is null.
-          - that lines concerns a status that is higher than the current status
-            in the document workflow.
+        The earliest forecast date of the statuses a document has not
+        reached yet is computed when it is saved (see `ScheduleMixin`), so
+        a single query is required.
         """
-
-        # Get the list of existing statuses for this category's document class
         Metadata = category.document_class()
-        Revision = Metadata.get_revision_class()
-        list_index = Revision._meta.get_field('status').list_index
-        statuses = [
-            status.lower() for status, _ in get_choices_from_list(list_index)
-        ]
         today = timezone.now().date()
-
-        # Create a first coarse filter to get all documents that MAY be
-        # behind schedule.
-        # Get all documents with any X status with a past forecast date AND
-        # not actual date.
-        #
-        # However, that does not mean that this document is behind schedule,
-        # because statuses can be skipped. E.g a document with a forecast date
-        # for status A that goes directly to the next status B will have an
-        # empty value for the `status_A_actual_date` but is still not
-        # behind schedule.
-        #
-        # The reason we don't filter everything in a single query is because it
-        # would make the said query ridiculously complex.
-        conditions = []
-        for status in statuses:
-            forecast_field = 'status_{}_forecast_date'.format(status)
-            actual_field = 'status_{}_actual_date'.format(status)
-
-            # Let's check that the actual schedule fields corresponding to
-            # this status exists
-            try:
-                Metadata._meta.get_field(forecast_field)
-                Metadata._meta.get_field(actual_field)
-            except FieldDoesNotExist:
-                continue
-
-            forecast_condition = '{}__lt'.format(forecast_field)
-            actual_condition = '{}__isnull'.format(actual_field)
-            conditions.append(
-                Q(**{forecast_condition: today}) & Q(**{actual_condition: True}))
-
-        coarse_filter = reduce(operator.or_, conditions)
         documents = Metadata.objects \
             .filter(document__category=category) \
-            .filter(coarse_filter) \
-            .select_related('document', 'latest_revision')
-
-        def is_behind_schedule(document):
-            """Tells if a single document is actually behind schedule.
-
-            Check for a "behind schedule" condition, but only for statuses
-            that the document has not reached yet.
-            """
-
-            current_status = document.status.lower()
-            # statuses are sorted by chronological order
-            current_status_index = statuses.index(current_status)
-            for status_index, status in enumerate(statuses):
-                if status_index <= current_status_index:
-                    # The document has already passed this status, ignore
-                    # this schedule line.
-                    continue
-
-                forecast_field = 'status_{}_forecast_date'.format(status)
-                actual_field = 'status_{}_actual_date'.format(status)
-
-                if getattr(document, forecast_field, None) is None:
-                    continue
-
-                forecast_date = getattr(document, forecast_field)
-                actual_date = getattr(document, actual_field)
-                if forecast_date < today and actual_date is None:
-                    return True
-
-            return False
-
-        # Here, we filter the queryset to remove false positives.
-        behind_schedule_documents = filter(is_behind_schedule, documents)
-        return list(behind_schedule_documents)
+            .filter(next_due_forecast_date__lt=today) \
+            .select_related('document', 'latest_revision') \
+            .order_by('document_key')
+        return list(documents)
 
     def fetch_alert_recipients(self):
         """Return users that must receive the alerts."""
 
         users = User.objects \
-            .filter(send_behind_schedule_alert_mails=True) \
-            .prefetch_related('categories')
-        return users
+            .filter(send_behind_schedule_alert_mails=True)
+        return list(users)
+
+    def fetch_recipients_categories(self, recipients):
+        """Return the ids of the categories every recipient has access to."""
+        Membership = Category.users.through
+        memberships = Membership.objects \
+            .filter(user__in=recipients) \
+            .values_list('user_id', 'category_id')
+
+        categories = defaultdict(set)
+        for user_id, category_id in memberships:
+            categories[user_id].add(category_id)
+        return categories
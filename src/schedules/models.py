@@ -1,7 +1,84 @@
-class ScheduleMixin(object):
+# -*- coding: utf-8 -*-
+
+
+from datetime import datetime
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from metadata.fields import get_choices_from_list
+
+
+class ScheduleMixin(models.Model):
     """Add behavior of a document with a "Schedule" section.
 
     This is use to filter document classes in signal handling.
 
+    The schedule section contains a forecast and an actual date for every
+    status. A document is behind schedule when the forecast date of a status
+    it has not reached yet is passed, and that status has no actual date.
+
+    The earliest of those forecast dates is stored when the document is
+    saved, so documents behind schedule can be found with a single query.
+
     """
-    pass
+    next_due_forecast_date = models.DateField(
+        _('Next due forecast date'),
+        null=True, blank=True,
+        db_index=True,
+        editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def get_schedule_statuses(cls):
+        """Return statuses, in chronological order."""
+        Revision = cls.get_revision_class()
+        list_index = Revision._meta.get_field('status').list_index
+        return [
+            status.lower() for status, _ in get_choices_from_list(list_index)
+        ]
+
+    def get_next_due_forecast_date(self, status=None, statuses=None):
+        """Return the earliest forecast date of the statuses to come."""
+        if status is None and self.latest_revision_id:
+            status = self.latest_revision.status
+        status = (status or '').lower()
+
+        if statuses is None:
+            statuses = self.get_schedule_statuses()
+
+        # Schedule lines of statuses the document has already passed
+        # are ignored
+        if status in statuses:
+            statuses = statuses[statuses.index(status) + 1:]
+
+        dates = []
+        for status in statuses:
+            forecast_date = getattr(
+                self, 'status_{}_forecast_date'.format(status), None)
+            actual_date = getattr(
+                self, 'status_{}_actual_date'.format(status), None)
+            if forecast_date is not None and actual_date is None:
+                if isinstance(forecast_date, datetime):
+                    forecast_date = forecast_date.date()
+                dates.append(forecast_date)
+
+        return min(dates) if dates else None
+
+    def is_behind_schedule(self, today=None):
+        today = today or timezone.now().date()
+        return self.next_due_forecast_date is not None and \
+            self.next_due_forecast_date < today
+
+    def save(self, *args, **kwargs):
+        self.next_due_forecast_date = self.get_next_due_forecast_date()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = \
+                list(update_fields) + ['next_due_forecast_date']
+
+        super(ScheduleMixin, self).save(*args, **kwargs)
@@ -106,3 +106,31 @@ class ScheduleAlertTests(TestCase):
         revision.save()
         call_command('behind_schedule_alerts')
         self.assertEqual(len(mail.outbox), 1)
+
+    def test_next_due_forecast_date(self):
+        """The earliest forecast date of future statuses is stored."""
+
+        metadata = self.doc1.metadata
+        metadata.status_ifr_forecast_date = yesterday.date()
+        metadata.status_ifa_forecast_date = today.date()
+        metadata.save()
+        metadata.refresh_from_db()
+        self.assertEqual(metadata.next_due_forecast_date, yesterday.date())
+        self.assertTrue(metadata.is_behind_schedule())
+
+        metadata.status_ifr_actual_date = today.date()
+        metadata.save()
+        metadata.refresh_from_db()
+        self.assertEqual(metadata.next_due_forecast_date, today.date())
+        self.assertFalse(metadata.is_behind_schedule())
+
+    def test_next_due_forecast_date_follows_the_status(self):
+        metadata = self.doc1.metadata
+        metadata.status_ifr_forecast_date = yesterday.date()
+        metadata.save()
+
+        revision = metadata.latest_revision
+        revision.status = 'IFA'
+        revision.save()
+        metadata.refresh_from_db()
+        self.assertIsNone(metadata.next_due_forecast_date)
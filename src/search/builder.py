@@ -1,14 +1,46 @@
 # -*- coding: utf-8 -*-
 
 
+import json
+import base64
+import binascii
+
 from django.conf import settings
-from django.forms import ModelChoiceField
-from django.db import models
 
 from elasticsearch_dsl import Search
 
-from documents.forms.filters import filterform_factory
 from search import elastic
+from search.schema import get_search_schema
+
+
+# Sort field used to make the ordering of hits stable
+TIEBREAKER_FIELD = 'pk'
+
+# Sort values returned by Elasticsearch for documents missing the field
+MISSING_SORT_VALUES = (None, 2 ** 63 - 1, -2 ** 63, float('inf'), float('-inf'))
+
+
+def encode_cursor(sort_values):
+    """Turn the sort values of a hit into an opaque string."""
+    data = json.dumps(list(sort_values)).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        data = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        sort_values = json.loads(data.decode('utf-8'))
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        raise RuntimeError('Search cursor is invalid')
+
+    if not isinstance(sort_values, list) or len(sort_values) != 2:
+        raise RuntimeError('Search cursor is invalid')
+    return sort_values
+
+
+def get_cursor(hit):
+    """Return the cursor to fetch the results following the given hit."""
+    return encode_cursor(hit.meta.sort)
 
 
 class SearchBuilder(object):
@@ -24,12 +56,15 @@ class SearchBuilder(object):
         if filters is None:
             filters = {}
         self.category = category
+        self.schema = get_search_schema(category)
         self.init_filters(filters)
 
-        DocumentModel = self.category.document_class()
-        Config = DocumentModel.PhaseConfig
-        self.filter_fields = Config.filter_fields
-        self.custom_filters = getattr(Config, 'custom_filters', {})
+        # Opaque cursor returned with a previous page of results
+        self.cursor = filters.get('after', None)
+        self.size = None  # Set once the pagination is built
+
+        self.filter_fields = list(self.schema.filter_fields.keys())
+        self.custom_filters = self.schema.custom_filters
 
         # filter_on_entities parameters is used for OutgoingTransmittals and
         # indicates to restrict items to those whose recipient id is in
@@ -37,14 +72,8 @@ class SearchBuilder(object):
         self.filter_on_entities = filter_on_entities
 
     def init_filters(self, filters):
-        DocumentModel = self.category.document_class()
-        FilterForm = filterform_factory(DocumentModel)
-        form = FilterForm(filters)
-        if not form.is_valid():
-            raise RuntimeError('Search filters are invalid')
-
-        self.filter_form = form
-        self.filters = form.cleaned_data
+        """Validate filters. Foreign keys are cleaned as primary keys."""
+        self.filters = self.schema.clean(filters)
 
     def get_results(self, *args, **kwargs):
         return self.build_query(*args, **kwargs).execute()
@@ -52,9 +81,8 @@ class SearchBuilder(object):
     def scan_results(self, *args, **kwargs):
         return self.build_query(*args, **kwargs).scan()
 
-    def build_query(self, fields=None, only_latest_revisions=True):
-        if fields is None:
-            fields = []
+    def build_filtered_query(self, only_latest_revisions=True):
+        """Build the query, without sort nor pagination."""
         document_type = self.category.document_type()
 
         s = Search(using=elastic, doc_type=document_type) \
@@ -67,6 +95,13 @@ class SearchBuilder(object):
         s = self._add_custom_filters(s)
         s = self._add_search_query(s)
         s = self._add_filter_on_entities(s)
+        return s
+
+    def build_query(self, fields=None, only_latest_revisions=True):
+        if fields is None:
+            fields = []
+
+        s = self.build_filtered_query(only_latest_revisions)
         s = self._add_sort(s)
         s = self._add_pagination(s)
         if fields:
@@ -74,15 +109,10 @@ class SearchBuilder(object):
         return s
 
     def _add_filter_fields(self, s):
-        for field in self.filter_fields:
+        for field, es_field in self.schema.filter_fields.items():
             value = self.filters.get(field, None)
             if value:
-                if isinstance(value, models.Model):
-                    value = value.pk
-                    field = '%s_id' % field
-                else:
-                    field = '%s.raw' % field
-                s = s.filter({'term': {field: value}})
+                s = s.filter({'term': {es_field: value}})
         return s
 
     def _add_custom_filters(self, s):
@@ -99,18 +129,29 @@ class SearchBuilder(object):
             s = s.filter({'terms': {'recipient_id': self.filter_on_entities}})
         return s
 
-    def add_aggregations(self, s):
+    def build_aggregations_query(self, facets=None, size=None):
+        """Build a query returning facet counts only, without any hit."""
+        s = self.build_filtered_query()
+        s = s.extra(size=0)
+        s = self.add_aggregations(s, facets=facets, size=size)
+        return s
+
+    def add_aggregations(self, s, facets=None, size=None):
         """Add aggregations (facets) to the search query.
 
-        For foreign key fields, we need to organize buckets by primary keys
-        For every other field, the ".raw" field is what we want
+        Buckets are organized by indexed values (e.g primary keys for foreign
+        keys, see `SearchSchema`).
+
+        `facets` restricts the list of filter fields to aggregate. Only the
+        `size` (`SEARCH_FACETS_SIZE` by default) biggest buckets of each
+        facet are returned.
 
         """
-        for field in self.filter_fields:
-            if isinstance(self.filter_form.fields[field], ModelChoiceField):
-                s.aggs.bucket(field, 'terms', field='%s_id' % field, size=0)
-            else:
-                s.aggs.bucket(field, 'terms', field='%s.raw' % field, size=0)
+        size = size or settings.SEARCH_FACETS_SIZE
+        for field, es_field in self.schema.filter_fields.items():
+            if facets is not None and field not in facets:
+                continue
+            s.aggs.bucket(field, 'terms', field=es_field, size=size)
 
         return s
 
@@ -128,24 +169,82 @@ class SearchBuilder(object):
 
         return s
 
-    def _add_sort(self, s):
+    def get_sort(self):
+        """Return the sort field and direction."""
         sort_field = self.filters.get('sort_by', 'document_key') or 'document_key'
-        sort_field = '%s.raw' % sort_field
         if sort_field.startswith('-'):
             sort_field = sort_field.lstrip('-')
             sort_direction = 'desc'
         else:
             sort_direction = 'asc'
-        s = s.sort({sort_field: {
-            'order': sort_direction,
-            'unmapped_type': "String"}})
+        return self.schema.get_sort_field(sort_field), sort_direction
+
+    def _add_sort(self, s):
+        """Sort the results.
+
+        The tiebreaker makes the order stable, which is required for
+        cursor pagination.
+
+        """
+        sort_field, sort_direction = self.get_sort()
+        s = s.sort(
+            {sort_field: {
+                'order': sort_direction,
+                'unmapped_type': "String"}},
+            {TIEBREAKER_FIELD: {
+                'order': 'asc',
+                'unmapped_type': 'long'}})
         return s
 
+    def _add_cursor(self, s, cursor):
+        """Only return results following the hit the cursor was built from.
+
+        This is equivalent to the `search_after` parameter, which our
+        Elasticsearch version does not support. Unlike `from`, the cost
+        of a query does not depend on how deep we are in the results.
+
+        Documents missing the sort field are sorted last.
+
+        """
+        value, tiebreaker = decode_cursor(cursor)
+        sort_field, sort_direction = self.get_sort()
+        missing = {'bool': {'must_not': {'exists': {'field': sort_field}}}}
+        after_tiebreaker = {'range': {TIEBREAKER_FIELD: {'gt': tiebreaker}}}
+
+        if value in MISSING_SORT_VALUES:
+            return s.filter({'bool': {
+                'must': [missing, after_tiebreaker]}})
+
+        operator = 'gt' if sort_direction == 'asc' else 'lt'
+        return s.filter({'bool': {
+            'should': [
+                {'range': {sort_field: {operator: value}}},
+                {'bool': {'must': [
+                    {'term': {sort_field: value}},
+                    after_tiebreaker]}},
+                missing,
+            ],
+            'minimum_should_match': 1}})
+
     def _add_pagination(self, s):
-        s = s.extra(
-            from_=self.filters.get('start', 0),
-            size=self.filters.get('size', settings.PAGINATE_BY)
-        )
+        """Paginate with a cursor if one is given, with `from` otherwise.
+
+        Elasticsearch refuses to go further than `ELASTIC_MAX_RESULT_WINDOW`
+        results with `from` and `size`, so we never ask it to.
+
+        """
+        size = self.filters.get('size') or settings.PAGINATE_BY
+        if self.cursor:
+            s = self._add_cursor(s, self.cursor)
+            start = 0
+        else:
+            start = self.filters.get('start') or 0
+
+        max_window = settings.ELASTIC_MAX_RESULT_WINDOW
+        start = min(start, max_window)
+        size = max(min(size, max_window - start), 0)
+        self.size = size
+        s = s.extra(from_=start, size=size)
         return s
 
     def _limit_fields(self, s, fields):
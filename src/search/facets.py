@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Cached facet counts for the document list.
+
+Facet counts only depend on the search filters, not on the pagination or
+the sort order, so they are computed once per filter set and cached until
+the category index changes.
+
+"""
+import json
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from search.utils import get_index_generation
+
+
+# Those filters don't change the facet counts
+IGNORED_FILTERS = ('start', 'size', 'sort_by')
+
+
+def normalize_filters(filters):
+    """Return a stable string representation of the search filters."""
+    normalized = {}
+    for key, value in filters.items():
+        if key in IGNORED_FILTERS or value in (None, ''):
+            continue
+        if isinstance(value, models.Model):
+            value = value.pk
+        normalized[key] = '{}'.format(value)
+    return json.dumps(normalized, sort_keys=True)
+
+
+def get_facets_key(builder, facets, size):
+    generation = get_index_generation(builder.category.pk)
+    signature = json.dumps([
+        normalize_filters(builder.filters),
+        builder.filter_on_entities,
+        facets,
+        size,
+        generation,
+    ])
+    digest = hashlib.md5(signature.encode('utf-8')).hexdigest()
+    return 'search_facets_{}_{}'.format(builder.category.pk, digest)
+
+
+def format_aggregations(aggregations):
+    """Transforms the ES "aggregations" response into something we can use.
+
+    aggregations = {
+        'filter_name': {
+            'buckets': [
+                {'key': 'some_name', 'doc_count': 123},
+                …
+            ],
+            'sum_other_doc_count': 0,
+        },
+        …
+    }
+
+    We want :
+
+    aggregations = {
+        'filter_name': {'some_name': 123, …},
+        …
+    }
+
+    The list of facets with buckets left out of the response is returned
+    as well.
+
+    """
+    buckets = {}
+    truncated = []
+    for facet, aggregation in aggregations.to_dict().items():
+        buckets[facet] = dict(
+            (b['key'], b['doc_count']) for b in aggregation['buckets'])
+        if aggregation.get('sum_other_doc_count', 0) > 0:
+            truncated.append(facet)
+    return buckets, sorted(truncated)
+
+
+def get_facets(builder, facets=None, size=None):
+    """Return the facet counts for the builder filters.
+
+    `facets` restricts the list of computed facets, and `size` the number
+    of buckets for each of them (`SEARCH_FACETS_SIZE` by default).
+
+    """
+    size = size or settings.SEARCH_FACETS_SIZE
+    cache_key = get_facets_key(builder, facets, size)
+    data = cache.get(cache_key)
+    if data is None:
+        query = builder.build_aggregations_query(facets=facets, size=size)
+        response = query.execute()
+        aggregations, truncated = format_aggregations(response.aggregations)
+        data = {
+            'aggregations': aggregations,
+            'truncated': truncated,
+        }
+        cache.set(cache_key, data, settings.SEARCH_FACETS_CACHE_TTL)
+    return data
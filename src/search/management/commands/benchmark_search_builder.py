@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from categories.models import Category
+from search.builder import SearchBuilder
+from search.schema import SearchSchema, get_search_schema
+
+
+class Command(BaseCommand):
+    """Measure how many search queries can be built per second.
+
+    Only the query building is measured, Elasticsearch is never queried.
+
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('organisation', type=str)
+        parser.add_argument('category', type=str)
+        parser.add_argument(
+            '--iterations', type=int, default=1000,
+            help='Number of queries to build')
+        parser.add_argument(
+            '--querystring', type=str, default='',
+            help='Search filters, e.g "status=STD&sort_by=-title"')
+
+    def handle(self, *args, **options):
+        try:
+            category = Category.objects \
+                .select_related(
+                    'organisation', 'category_template',
+                    'category_template__metadata_model') \
+                .get(organisation__slug=options['organisation'],
+                     category_template__slug=options['category'])
+        except Category.DoesNotExist:
+            raise CommandError('This category does not exist.')
+
+        filters = QueryDict(options['querystring'])
+        iterations = options['iterations']
+
+        start = time.time()
+        SearchSchema(category)
+        duration = time.time() - start
+        self.stdout.write('Schema built in {:.2f}ms'.format(duration * 1000))
+
+        # Make sure the schema is in memory
+        get_search_schema(category)
+
+        start = time.time()
+        for _ in range(iterations):
+            builder = SearchBuilder(category, filters)
+            builder.build_query().to_dict()
+        duration = time.time() - start
+
+        self.stdout.write(
+            '{} queries built in {:.2f}s ({:.1f} queries/sec)'.format(
+                iterations, duration,
+                iterations / duration if duration else 0))
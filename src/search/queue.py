@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+# Indexing modes
+ASYNC = None  # Index in a celery task, the index is refreshed once per batch
+WAIT_FOR = 'wait_for'  # Index and refresh before giving the hand back
+
+
+class IndexQueue(threading.local):
+    """Collects ids of documents that must be (re)indexed.
+
+    A single document edit can trigger several indexing signals (e.g
+    `post_save` and `document_form_saved`), and some operations save many
+    documents in a row. Instead of indexing documents as soon as a signal
+    is received, ids are stored in a set and sent to the indexing task in a
+    single batch.
+
+    The queue is flushed when the current transaction is committed, or when
+    the outermost `coalesce_indexing` block exits.
+
+    """
+    def __init__(self):
+        self.pending = set()
+        self.depth = 0
+        self.refresh = ASYNC
+
+    def add(self, document_id):
+        self.pending.add(document_id)
+
+        # Outside of a coalescing block, index as soon as the data is
+        # committed. If many ids are added in the same transaction, only the
+        # first flush will have something to do.
+        if self.depth == 0:
+            transaction.on_commit(self.flush)
+
+    def flush(self, refresh=ASYNC):
+        if not self.pending:
+            return
+
+        from search.utils import index_documents
+
+        document_ids = sorted(self.pending)
+        self.pending = set()
+        logger.debug('Indexing documents {}'.format(document_ids))
+
+        if refresh == WAIT_FOR:
+            index_documents(document_ids, refresh=True)
+        else:
+            index_documents.delay(document_ids)
+
+
+index_queue = IndexQueue()
+
+
+@contextmanager
+def coalesce_indexing(refresh=ASYNC):
+    """Index documents saved in the block in a single batch.
+
+    Blocks can be nested, documents are only indexed when the outermost
+    block exits (or when the current transaction is committed).
+
+    Use `refresh='wait_for'` when the user expects to see the changes in
+    search results right away (e.g after an interactive edit). Elasticsearch
+    2 does not support `wait_for` natively, so documents are then indexed
+    synchronously and the index is refreshed before the block exits.
+
+    """
+    index_queue.depth += 1
+    if refresh == WAIT_FOR:
+        index_queue.refresh = WAIT_FOR
+    try:
+        yield index_queue
+    finally:
+        index_queue.depth -= 1
+        if index_queue.depth == 0:
+            mode = index_queue.refresh
+            index_queue.refresh = ASYNC
+            transaction.on_commit(lambda: index_queue.flush(refresh=mode))
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from elasticsearch.helpers import parallel_bulk
+
+from documents.utils import get_all_revision_classes
+from documents.serialization import prepare_queryset
+from search import elastic
+from search.utils import (
+    build_index_data, bump_index_generation, create_index, put_category_mapping,
+    switch_alias, set_reindex_target, clear_reindex_target)
+from categories.models import Category
+
+
+logger = logging.getLogger(__name__)
+
+
+class Reindexer(object):
+    """Rebuilds the whole search index without downtime.
+
+    `settings.ELASTIC_INDEX` is used as an alias. Revisions are indexed into
+    a brand new versioned index, and the alias is atomically switched to the
+    new index once it is complete. Search keeps working on the previous index
+    in the mean time. While the new index is built, every index write is
+    also sent to it (see `search.utils.get_write_indices`), so revisions
+    modified after they were copied are not outdated once the alias is
+    switched. If a run is interrupted, writes keep going to both indices
+    until it is resumed and completed.
+
+    Revisions are streamed from the db in keyset paginated chunks, so memory
+    usage does not grow with the corpus size. Chunks are sent to
+    Elasticsearch with `parallel_bulk`. Revisions that cannot be indexed
+    are logged, and don't abort the run.
+
+    After each chunk, the progress is saved in a checkpoint file, so an
+    interrupted run can be resumed.
+
+    """
+    def __init__(self, chunk_size=None, thread_count=None,
+                 checkpoint_path=None, stdout=None):
+        self.chunk_size = chunk_size or settings.ELASTIC_REINDEX_CHUNK_SIZE
+        self.thread_count = thread_count or settings.ELASTIC_REINDEX_THREADS
+        self.checkpoint_path = checkpoint_path or settings.ELASTIC_REINDEX_CHECKPOINT
+        self.stdout = stdout
+        self.checkpoint = None
+
+    def log(self, message):
+        logger.info(message)
+        if self.stdout:
+            self.stdout.write(message)
+
+    def run(self, resume=False):
+        """Performs the whole reindex process.
+
+        Returns the name of the newly created index.
+
+        """
+        self.checkpoint = self.load_checkpoint() if resume else None
+        if self.checkpoint:
+            self.log('Resuming reindex into {}'.format(self.checkpoint['index']))
+        else:
+            self.checkpoint = {
+                'index': self.get_new_index_name(),
+                'last_pks': {},
+            }
+            self.prepare_index(self.checkpoint['index'])
+            self.save_checkpoint()
+
+        index = self.checkpoint['index']
+        set_reindex_target(index)
+        start = time.time()
+        total = 0
+        for revision_class in get_all_revision_classes():
+            total += self.index_revision_class(index, revision_class)
+
+        elastic.indices.refresh(index=index)
+        old_indices = switch_alias(index)
+        clear_reindex_target()
+        bump_index_generation()
+        for old_index in old_indices:
+            if old_index != index:
+                elastic.indices.delete(index=old_index, ignore=404)
+        self.clear_checkpoint()
+
+        duration = time.time() - start
+        self.log('Indexed {} revisions in {:.1f}s ({:.1f} docs/sec)'.format(
+            total, duration, total / duration if duration else 0))
+        return index
+
+    def get_new_index_name(self):
+        return '{}_{}'.format(
+            settings.ELASTIC_INDEX,
+            timezone.now().strftime('%Y%m%d%H%M%S'))
+
+    def prepare_index(self, index):
+        """Create the new index and set all category mappings."""
+        self.log('Creating index {}'.format(index))
+        create_index(index)
+        categories = Category.objects.values_list('id', flat=True)
+        for category_id in categories:
+            put_category_mapping(category_id, index=index)
+
+    def index_revision_class(self, index, revision_class):
+        """Index all revisions of a single class, chunk by chunk."""
+        label = revision_class._meta.label
+        last_pk = self.checkpoint['last_pks'].get(label, 0)
+        self.log('Indexing {} revisions (from pk {})'.format(label, last_pk))
+
+        count = 0
+        start = time.time()
+        for chunk in self.iter_chunks(revision_class, last_pk):
+            actions = [build_index_data(revision, index) for revision in chunk]
+            for ok, info in parallel_bulk(
+                    elastic,
+                    actions,
+                    thread_count=self.thread_count,
+                    chunk_size=settings.ELASTIC_BULK_SIZE,
+                    raise_on_error=False,
+                    raise_on_exception=False,
+                    request_timeout=600):
+                if not ok:
+                    logger.error('Failed to index revision: {}'.format(info))
+
+            count += len(chunk)
+            self.checkpoint['last_pks'][label] = chunk[-1].pk
+            self.save_checkpoint()
+
+            duration = time.time() - start
+            self.log('{}: {} revisions indexed ({:.1f} docs/sec)'.format(
+                label, count, count / duration if duration else 0))
+        return count
+
+    def iter_chunks(self, revision_class, last_pk=0):
+        """Yields lists of revisions using keyset pagination.
+
+        Unlike offset pagination, fetching the n-th chunk does not require
+        to scan all the previous rows.
+
+        """
+        qs = revision_class.objects \
+            .filter(metadata__document__is_indexable=True) \
+            .order_by('pk')
+        qs = prepare_queryset(qs)
+        while True:
+            chunk = list(qs.filter(pk__gt=last_pk)[:self.chunk_size])
+            if not chunk:
+                break
+            yield chunk
+            last_pk = chunk[-1].pk
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def save_checkpoint(self):
+        with open(self.checkpoint_path, 'w') as f:
+            json.dump(self.checkpoint, f)
+
+    def clear_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Per-category search schemas.
+
+Turning a querystring into an Elasticsearch query requires the filter form
+of the category, and to know how each filter maps to the index fields.
+Generating the filter form is expensive, so everything is computed once per
+category and kept in memory.
+
+Schemas are rebuilt when the category mapping is updated, or when a values
+list changes (values lists are used as choices for some filter fields).
+
+"""
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.forms import ModelChoiceField
+
+from documents.forms.filters import filterform_factory
+from metadata.handlers import VALUES_LIST_VERSION_KEY
+
+
+SCHEMA_VERSION_KEY = 'search_schema_version'
+
+_schemas = {}
+
+
+class SearchSchema(object):
+    """Everything needed to build a search query for a category."""
+
+    def __init__(self, category, version=None):
+        self.version = version
+        DocumentModel = category.document_class()
+        Config = DocumentModel.PhaseConfig
+
+        self.form_class = filterform_factory(DocumentModel)
+        self.form_fields = self.form_class.base_fields
+
+        # Filter name -> indexed field
+        # For foreign keys, we filter on primary keys. For every other
+        # field, the ".raw" field is what we want
+        self.filter_fields = OrderedDict()
+        self.model_fields = set()
+        for field in Config.filter_fields:
+            if isinstance(self.form_fields[field], ModelChoiceField):
+                self.filter_fields[field] = '%s_id' % field
+                self.model_fields.add(field)
+            else:
+                self.filter_fields[field] = '%s.raw' % field
+
+        self.custom_filters = getattr(Config, 'custom_filters', {})
+
+        sortable = list(dict(Config.column_fields).values())
+        sortable += ['document_key', 'document_number']
+        self.sort_fields = dict(
+            (field, '%s.raw' % field) for field in sortable)
+
+    def get_sort_field(self, field):
+        return self.sort_fields.get(field) or '%s.raw' % field
+
+    def clean(self, data):
+        """Validate the search filters, and return cleaned values.
+
+        This is what `FilterForm(data).cleaned_data` would return, except
+        that foreign keys are returned as primary keys, and the db is
+        never queried.
+
+        """
+        cleaned_data = {}
+        for name, field in self.form_fields.items():
+            value = field.widget.value_from_datadict(data, {}, name)
+            try:
+                if name in self.model_fields:
+                    cleaned_data[name] = self.clean_pk(field, value)
+                else:
+                    cleaned_data[name] = field.clean(value)
+            except ValidationError:
+                raise RuntimeError('Search filters are invalid')
+        return cleaned_data
+
+    def clean_pk(self, field, value):
+        if value in field.empty_values:
+            return None
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            raise ValidationError(field.error_messages['invalid_choice'])
+
+
+def get_schema_version():
+    versions = cache.get_many([SCHEMA_VERSION_KEY, VALUES_LIST_VERSION_KEY])
+    if SCHEMA_VERSION_KEY not in versions:
+        # If the version was evicted, don't start from a previous value
+        cache.add(SCHEMA_VERSION_KEY, int(time.time()), None)
+        versions[SCHEMA_VERSION_KEY] = cache.get(SCHEMA_VERSION_KEY)
+    return (versions[SCHEMA_VERSION_KEY],
+            versions.get(VALUES_LIST_VERSION_KEY))
+
+
+def get_search_schema(category):
+    """Return the search schema of the category, built only if necessary."""
+    key = (category.pk, category.document_type())
+    version = get_schema_version()
+    schema = _schemas.get(key)
+    if schema is None or schema.version != version:
+        schema = SearchSchema(category, version)
+        _schemas[key] = schema
+    return schema
+
+
+def invalidate_search_schemas():
+    """Make all processes rebuild their search schemas."""
+    try:
+        cache.incr(SCHEMA_VERSION_KEY)
+    except ValueError:
+        cache.set(SCHEMA_VERSION_KEY, int(time.time()), None)
+
+
+def clear_search_schemas():
+    _schemas.clear()
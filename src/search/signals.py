@@ -1,12 +1,14 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_save, pre_delete, post_delete
 from django.conf import settings
 
 
-from categories.models import Category
+from categories.models import Category, CategoryTemplate, Organisation
 from search.utils import (
-    index_document, unindex_document, put_category_mapping, refresh_index)
+    unindex_document, put_category_mapping, refresh_index)
+from search.queue import index_queue
 from documents.models import Document
-from documents.signals import document_form_saved
+from documents.serialization import clear_revision_serializers
+from documents.signals import document_form_saved, documents_updated
 
 
 def update_index(**kwargs):
@@ -20,10 +22,20 @@ def update_index(**kwargs):
     # Then, the Document is saved again
     # Thus, we MUST not index the document on the first save, since the
     # metadata and revision does not exist yet
+    #
+    # Documents are not indexed right away, see `search.queue`.
     created = kwargs.pop('created', False)
     if not created and doc.is_indexable:
-        index_document(doc.pk)
-    refresh_index()
+        index_queue.add(doc.pk)
+
+
+def update_index_bulk(document_ids, **kwargs):
+    indexable_ids = Document.objects \
+        .filter(pk__in=document_ids) \
+        .filter(is_indexable=True) \
+        .values_list('pk', flat=True)
+    for doc_id in indexable_ids:
+        index_queue.add(doc_id)
 
 
 def remove_from_index(sender, instance, **kwargs):
@@ -37,9 +49,15 @@ def save_mapping(sender, instance, **kwargs):
         put_category_mapping.delay(instance.pk)
 
 
+def clear_serializers(sender, **kwargs):
+    """Serializers build document urls from the category slugs."""
+    clear_revision_serializers()
+
+
 def connect_signals():
     document_form_saved.connect(update_index, sender=Document, dispatch_uid='update_index')
     post_save.connect(update_index, sender=Document, dispatch_uid='update_index')
+    documents_updated.connect(update_index_bulk, dispatch_uid='update_index_bulk')
     pre_delete.connect(remove_from_index, sender=Document, dispatch_uid='remove_from_index')
     post_save.connect(save_mapping, sender=Category, dispatch_uid='put_category_mapping')
 
@@ -47,9 +65,14 @@ def connect_signals():
 def disconnect_signals():
     document_form_saved.disconnect(update_index, sender=Document, dispatch_uid='update_index')
     post_save.disconnect(update_index, sender=Document, dispatch_uid='update_index')
+    documents_updated.disconnect(update_index_bulk, dispatch_uid='update_index_bulk')
     pre_delete.disconnect(remove_from_index, sender=Document, dispatch_uid='remove_from_index')
     post_save.disconnect(save_mapping, sender=Category, dispatch_uid='put_category_mapping')
 
 
 if settings.ELASTIC_AUTOINDEX:
     connect_signals()
+
+for model in (Category, CategoryTemplate, Organisation):
+    post_save.connect(clear_serializers, sender=model, dispatch_uid='serializers_save_{}'.format(model.__name__))
+    post_delete.connect(clear_serializers, sender=model, dispatch_uid='serializers_delete_{}'.format(model.__name__))
@@ -0,0 +1,84 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from categories.factories import CategoryFactory
+from search.builder import SearchBuilder, encode_cursor, decode_cursor
+from search.schema import get_search_schema, invalidate_search_schemas
+
+
+class SearchBuilderTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+
+    def test_sort_has_a_tiebreaker(self):
+        builder = SearchBuilder(self.category, {'sort_by': '-title'})
+        query = builder.build_query().to_dict()
+        self.assertEqual(query['sort'], [
+            {'title.raw': {'order': 'desc', 'unmapped_type': 'String'}},
+            {'pk': {'order': 'asc', 'unmapped_type': 'long'}},
+        ])
+
+    @override_settings(ELASTIC_MAX_RESULT_WINDOW=100)
+    def test_pagination_does_not_exceed_result_window(self):
+        builder = SearchBuilder(self.category, {'start': 80, 'size': 50})
+        query = builder.build_query().to_dict()
+        self.assertEqual(query['from'], 80)
+        self.assertEqual(query['size'], 20)
+
+        builder = SearchBuilder(self.category, {'start': 500, 'size': 50})
+        query = builder.build_query().to_dict()
+        self.assertEqual(query['from'], 100)
+        self.assertEqual(query['size'], 0)
+
+    def test_cursor_pagination(self):
+        cursor = encode_cursor(['Document title', 42])
+        builder = SearchBuilder(self.category, {
+            'start': 50000, 'size': 50, 'after': cursor})
+        query = builder.build_query().to_dict()
+        self.assertEqual(query['from'], 0)
+        self.assertEqual(query['size'], 50)
+        self.assertIn('Document title', str(query['query']))
+
+    def test_cursor_on_missing_values(self):
+        cursor = encode_cursor([None, 42])
+        builder = SearchBuilder(self.category, {'after': cursor})
+        query = builder.build_query().to_dict()
+        self.assertIn('must_not', str(query['query']))
+
+    def test_invalid_cursor(self):
+        builder = SearchBuilder(self.category, {'after': 'invalid'})
+        with self.assertRaises(RuntimeError):
+            builder.build_query()
+
+    def test_cursor_round_trip(self):
+        sort_values = ['value', 12]
+        self.assertEqual(decode_cursor(encode_cursor(sort_values)), sort_values)
+
+
+class SearchSchemaTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+
+    def test_schema_is_built_once(self):
+        schema = get_search_schema(self.category)
+        self.assertIs(get_search_schema(self.category), schema)
+
+        invalidate_search_schemas()
+        self.assertIsNot(get_search_schema(self.category), schema)
+
+    def test_foreign_keys_are_cleaned_as_pks(self):
+        schema = get_search_schema(self.category)
+        with self.assertNumQueries(0):
+            filters = schema.clean({'leader': '12', 'search_terms': 'test'})
+        self.assertEqual(filters['leader'], 12)
+        self.assertEqual(filters['search_terms'], 'test')
+
+    def test_invalid_filters(self):
+        schema = get_search_schema(self.category)
+        with self.assertRaises(RuntimeError):
+            schema.clean({'leader': 'toto'})
+
+    def test_foreign_key_filter(self):
+        builder = SearchBuilder(self.category, {'leader': '12'})
+        query = builder.build_query().to_dict()
+        self.assertIn({'term': {'leader_id': 12}}, query['query']['bool']['filter'])
@@ -0,0 +1,56 @@
+from django.test import TestCase
+
+from mock import patch
+
+from categories.factories import CategoryFactory
+from default_documents.models import DemoMetadataRevision
+from documents.factories import DocumentFactory
+from search.builder import SearchBuilder
+from search.facets import get_facets_key, normalize_filters
+from search.utils import (
+    bump_index_generation, get_index_generation, index_revisions)
+
+
+class FacetsCacheTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+
+    def test_pagination_and_sort_are_ignored(self):
+        self.assertEqual(
+            normalize_filters({'search_terms': 'test', 'start': 50,
+                               'size': 50, 'sort_by': 'title'}),
+            normalize_filters({'search_terms': 'test', 'start': 0}))
+
+    def test_empty_filters_are_ignored(self):
+        self.assertEqual(
+            normalize_filters({'search_terms': '', 'status': None}),
+            normalize_filters({}))
+
+    def test_cache_key_depends_on_filters(self):
+        builder = SearchBuilder(self.category, {'search_terms': 'test'})
+        key = get_facets_key(builder, None, 10)
+
+        builder = SearchBuilder(self.category, {
+            'search_terms': 'test', 'start': 100, 'sort_by': 'title'})
+        self.assertEqual(get_facets_key(builder, None, 10), key)
+
+        builder = SearchBuilder(self.category, {'search_terms': 'other'})
+        self.assertNotEqual(get_facets_key(builder, None, 10), key)
+
+    def test_cache_key_depends_on_index_generation(self):
+        builder = SearchBuilder(self.category, {})
+        key = get_facets_key(builder, None, 10)
+        bump_index_generation([self.category.pk])
+        self.assertNotEqual(get_facets_key(builder, None, 10), key)
+
+    @patch('search.utils.refresh_index')
+    @patch('search.utils.bulk')
+    def test_indexing_revisions_bumps_generation(self, bulk_mock, refresh_mock):
+        DocumentFactory(category=self.category)
+        generation = get_index_generation(self.category.pk)
+
+        revisions = DemoMetadataRevision.objects \
+            .filter(metadata__document__category=self.category)
+        index_revisions(revisions)
+        self.assertEqual(bulk_mock.call_count, 1)
+        self.assertNotEqual(get_index_generation(self.category.pk), generation)
@@ -0,0 +1,89 @@
+import os
+import json
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from mock import patch
+
+from categories.factories import CategoryFactory
+from documents.factories import DocumentFactory
+from default_documents.models import DemoMetadataRevision
+from search.reindex import Reindexer
+from search.utils import (
+    bulk_actions, set_reindex_target, clear_reindex_target, get_reindex_target)
+
+
+CHECKPOINT = '/tmp/phase_test_reindex_checkpoint.json'
+
+
+@override_settings(ELASTIC_REINDEX_CHECKPOINT=CHECKPOINT)
+class ReindexerTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+        self.docs = [
+            DocumentFactory(category=self.category)
+            for i in range(0, 7)]
+        if os.path.exists(CHECKPOINT):
+            os.remove(CHECKPOINT)
+
+    def test_iter_chunks(self):
+        reindexer = Reindexer(chunk_size=3)
+        chunks = list(reindexer.iter_chunks(DemoMetadataRevision))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+
+        pks = [rev.pk for chunk in chunks for rev in chunk]
+        self.assertEqual(pks, sorted(pks))
+
+    def test_iter_chunks_from_pk(self):
+        reindexer = Reindexer(chunk_size=3)
+        first_pk = DemoMetadataRevision.objects.order_by('pk')[0].pk
+        chunks = list(reindexer.iter_chunks(DemoMetadataRevision, first_pk))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3])
+
+    def test_resume_from_checkpoint(self):
+        first_pk = DemoMetadataRevision.objects.order_by('pk')[0].pk
+        with open(CHECKPOINT, 'w') as f:
+            json.dump({
+                'index': 'test_documents_resumed',
+                'last_pks': {DemoMetadataRevision._meta.label: first_pk},
+            }, f)
+
+        reindexer = Reindexer(chunk_size=3)
+        with patch('search.reindex.parallel_bulk', return_value=[]), \
+                patch('search.reindex.elastic'), \
+                patch('search.reindex.switch_alias', return_value=[]) as switch_mock:
+            index = reindexer.run(resume=True)
+
+        self.assertEqual(index, 'test_documents_resumed')
+        switch_mock.assert_called_once_with('test_documents_resumed')
+        self.assertFalse(os.path.exists(CHECKPOINT))
+
+    def test_failed_revisions_dont_abort_the_run(self):
+        reindexer = Reindexer(chunk_size=3)
+        results = [(False, {'index': {'error': 'failed'}})]
+        with patch('search.reindex.parallel_bulk', return_value=results), \
+                patch('search.reindex.elastic'), \
+                patch('search.reindex.create_index'), \
+                patch('search.reindex.put_category_mapping'), \
+                patch('search.reindex.switch_alias', return_value=[]) as switch_mock:
+            index = reindexer.run()
+
+        switch_mock.assert_called_once_with(index)
+        self.assertIsNone(get_reindex_target())
+
+
+class ReindexTargetTests(TestCase):
+    def tearDown(self):
+        clear_reindex_target()
+
+    def test_writes_go_to_the_new_index(self):
+        action = {'_index': 'test_documents', '_type': 'doc', '_id': 1}
+        set_reindex_target('test_documents_new')
+        with patch('search.utils.bulk') as bulk_mock:
+            bulk_actions([action])
+
+        actions = bulk_mock.call_args[0][1]
+        self.assertEqual(
+            [a['_index'] for a in actions],
+            ['test_documents', 'test_documents_new'])
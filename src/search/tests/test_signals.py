@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TransactionTestCase
 from django.core.management import call_command
 from django.test.utils import override_settings
 
@@ -8,11 +8,14 @@ from accounts.factories import UserFactory
 from categories.factories import CategoryFactory
 from documents.utils import save_document_forms
 from search.signals import connect_signals
+from search.queue import coalesce_indexing, WAIT_FOR
 from default_documents.forms import DemoMetadataForm, DemoMetadataRevisionForm
 
 
 @override_settings(ELASTIC_AUTOINDEX=True)
-class SignalTests(TestCase):
+class SignalTests(TransactionTestCase):
+    """Documents are indexed on transaction commit, so we cannot use
+    TestCase here."""
     def setUp(self):
         self.category = CategoryFactory()
         user = UserFactory(
@@ -35,7 +38,7 @@ class SignalTests(TestCase):
         CategoryFactory()
         self.assertEqual(index_mock.call_count, 1)
 
-    @patch('search.signals.index_document')
+    @patch('search.utils.index_documents')
     def test_created_document_is_indexed(self, index_mock):
         form = DemoMetadataForm({
             'title': 'Title',
@@ -46,11 +49,11 @@ class SignalTests(TestCase):
             'created_on': '2015-01-01',
         }, category=self.category)
         save_document_forms(form, rev_form, self.category)
-        self.assertEqual(index_mock.call_count, 1)
+        self.assertEqual(index_mock.delay.call_count, 1)
 
-    @patch('search.signals.index_document')
+    @patch('search.utils.index_documents')
     @patch('search.signals.unindex_document')
-    def test_deleted_document_is_unindexed(self, index_mock, unindex_mock):
+    def test_deleted_document_is_unindexed(self, unindex_mock, index_mock):
         form = DemoMetadataForm({
             'title': 'Title',
         }, category=self.category)
@@ -63,7 +66,7 @@ class SignalTests(TestCase):
         doc.delete()
         self.assertEqual(unindex_mock.call_count, 1)
 
-    @patch('search.signals.index_document')
+    @patch('search.utils.index_documents')
     def test_updated_document_is_indexed(self, index_mock):
         form = DemoMetadataForm({
             'title': 'Title',
@@ -76,9 +79,9 @@ class SignalTests(TestCase):
         doc, meta, rev = save_document_forms(form, rev_form, self.category)
         doc.title = 'foobar'
         doc.save()
-        self.assertEqual(index_mock.call_count, 2)
+        self.assertEqual(index_mock.delay.call_count, 2)
 
-    @patch('search.signals.index_document')
+    @patch('search.utils.index_documents')
     def test_revised_document_is_indexed(self, index_mock):
         form = DemoMetadataForm({
             'title': 'Title',
@@ -93,4 +96,37 @@ class SignalTests(TestCase):
         revision.pk = None
         revision.save()
         doc.save()
-        self.assertEqual(index_mock.call_count, 2)
+        self.assertEqual(index_mock.delay.call_count, 2)
+
+    @patch('search.utils.index_documents')
+    def test_saves_are_coalesced(self, index_mock):
+        form = DemoMetadataForm({
+            'title': 'Title',
+        }, category=self.category)
+        rev_form = DemoMetadataRevisionForm({
+            'docclass': '1',
+            'received_date': '2015-01-01',
+            'created_on': '2015-01-01',
+        }, category=self.category)
+        with coalesce_indexing():
+            doc, meta, rev = save_document_forms(form, rev_form, self.category)
+            doc.title = 'foobar'
+            doc.save()
+            doc.save()
+        self.assertEqual(index_mock.delay.call_count, 1)
+        index_mock.delay.assert_called_once_with([doc.pk])
+
+    @patch('search.utils.index_documents')
+    def test_wait_for_indexes_synchronously(self, index_mock):
+        form = DemoMetadataForm({
+            'title': 'Title',
+        }, category=self.category)
+        rev_form = DemoMetadataRevisionForm({
+            'docclass': '1',
+            'received_date': '2015-01-01',
+            'created_on': '2015-01-01',
+        }, category=self.category)
+        with coalesce_indexing(refresh=WAIT_FOR):
+            doc, meta, rev = save_document_forms(form, rev_form, self.category)
+        self.assertEqual(index_mock.delay.call_count, 0)
+        index_mock.assert_called_once_with([doc.pk], refresh=True)
@@ -0,0 +1,54 @@
+import json
+
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from accounts.factories import UserFactory
+from categories.factories import CategoryFactory
+from documents.factories import DocumentFactory
+from search.utils import index_documents
+
+
+class SearchDocumentsTests(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory()
+        user = UserFactory(
+            email='testadmin@phase.fr',
+            password='pass',
+            is_superuser=True,
+            category=self.category,
+        )
+        self.client.login(email=user.email, password='pass')
+        self.url = reverse('search_documents', args=[
+            self.category.organisation.slug,
+            self.category.slug,
+        ])
+
+        call_command('delete_index')
+        call_command('create_index')
+        call_command('set_mappings')
+
+        docs = [
+            DocumentFactory(category=self.category)
+            for i in range(0, 7)]
+        index_documents([doc.pk for doc in docs])
+
+    def search(self, **params):
+        res = self.client.get(self.url, params)
+        return json.loads(res.content.decode())
+
+    def test_paginate_with_cursor(self):
+        page = self.search(size=3)
+        self.assertEqual(page['total'], 7)
+        documents = [hit['pk'] for hit in page['data']]
+
+        pages = 1
+        while page['next']:
+            page = self.search(size=3, after=page['next'])
+            documents += [hit['pk'] for hit in page['data']]
+            pages += 1
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(documents), 7)
+        self.assertEqual(len(set(documents)), 7)
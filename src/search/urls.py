@@ -1,11 +1,14 @@
 from django.conf.urls import url
 
 
-from search.views import SearchDocuments
+from search.views import SearchDocuments, SearchFacets
 
 
 urlpatterns = [
     url(r'^(?P<organisation>[\w-]+)/(?P<category>[\w-]+)/$',
         SearchDocuments.as_view(),
         name='search_documents'),
+    url(r'^(?P<organisation>[\w-]+)/(?P<category>[\w-]+)/facets/$',
+        SearchFacets.as_view(),
+        name='search_facets'),
 ]
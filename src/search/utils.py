@@ -1,7 +1,9 @@
 import logging
 
+from django.core.cache import cache
 from django.db.models.fields import FieldDoesNotExist
 from django.db import models
+from django.db.models.query import QuerySet
 
 from elasticsearch.helpers import bulk
 from elasticsearch.exceptions import ConnectionError
@@ -9,7 +11,9 @@ from elasticsearch.exceptions import ConnectionError
 from core.celery import app
 from categories.models import Category
 from search import elastic, INDEX_SETTINGS
+from search.schema import invalidate_search_schemas
 from documents.models import Document
+from documents.serialization import get_revision_serializer, prepare_queryset
 from django.conf import settings
 
 
@@ -22,9 +26,9 @@ def refresh_index():
     elastic.indices.refresh(index=index)
 
 
-def create_index():
+def create_index(index=None):
     """Create all needed indexes."""
-    index = settings.ELASTIC_INDEX
+    index = index or settings.ELASTIC_INDEX
     elastic.indices.create(index=index, ignore=400, body=INDEX_SETTINGS)
 
 
@@ -34,17 +38,113 @@ def delete_index():
     elastic.indices.delete(index=index, ignore=404)
 
 
+def get_aliased_indices(alias=None):
+    """Return the list of concrete indices the alias points to."""
+    alias = alias or settings.ELASTIC_INDEX
+    if not elastic.indices.exists_alias(name=alias):
+        return []
+    return list(elastic.indices.get_alias(name=alias).keys())
+
+
+def switch_alias(new_index, alias=None):
+    """Atomically make the alias point to `new_index`.
+
+    Returns the list of indices that were previously aliased.
+
+    If a concrete index with the same name as the alias exists (e.g an
+    index created before aliases were used), it must be deleted before
+    the alias can be created. This only happens once.
+
+    """
+    alias = alias or settings.ELASTIC_INDEX
+    old_indices = get_aliased_indices(alias)
+    if not old_indices and elastic.indices.exists(index=alias):
+        logger.warning('Deleting concrete index {} to replace it with an '
+                       'alias'.format(alias))
+        elastic.indices.delete(index=alias)
+
+    actions = [{'remove': {'index': index, 'alias': alias}}
+               for index in old_indices]
+    actions.append({'add': {'index': new_index, 'alias': alias}})
+    elastic.indices.update_aliases(body={'actions': actions})
+    return old_indices
+
+
+def get_generation_key(category_id=None):
+    if category_id is None:
+        return 'index_generation'
+    return 'index_generation_{}'.format(category_id)
+
+
+def get_index_generation(category_id):
+    """Return a value that changes every time the category index changes.
+
+    Anything computed from search results (e.g dashboards) can be cached
+    along with this value, and considered outdated when it changes.
+
+    """
+    keys = [get_generation_key(), get_generation_key(category_id)]
+    generations = cache.get_many(keys)
+    return tuple(generations.get(key, 0) for key in keys)
+
+
+def bump_index_generation(category_ids=None):
+    """Mark the given categories (or the whole index) as modified."""
+    if category_ids is None:
+        keys = [get_generation_key()]
+    else:
+        keys = [get_generation_key(category_id) for category_id in category_ids]
+
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+# Name of the index being built by `search.reindex.Reindexer`
+REINDEX_TARGET_KEY = 'search_reindex_target'
+
+
+def get_reindex_target():
+    return cache.get(REINDEX_TARGET_KEY)
+
+
+def set_reindex_target(index):
+    """Send all index writes to `index` too, until the reindex is over."""
+    cache.set(REINDEX_TARGET_KEY, index, None)
+
+
+def clear_reindex_target():
+    cache.delete(REINDEX_TARGET_KEY)
+
+
+def get_write_indices():
+    """Return the indices that must receive every index write.
+
+    During a reindex, documents that were already copied to the new index
+    must be kept up to date, so writes go to both indices.
+
+    """
+    target = get_reindex_target()
+    if target:
+        return [settings.ELASTIC_INDEX, target]
+    return [settings.ELASTIC_INDEX]
+
+
 def index_revision(revision):
     """Saves a document's revision into ES's index."""
     document = revision.document
     es_key = '{}_{}'.format(document.document_key, revision.revision)
     try:
-        elastic.index(
-            index=settings.ELASTIC_INDEX,
-            doc_type=document.document_type(),
-            id=es_key,
-            body=revision.to_json(),
-        )
+        for index in get_write_indices():
+            elastic.index(
+                index=index,
+                doc_type=document.document_type(),
+                id=es_key,
+                body=revision.to_json(),
+            )
+        bump_index_generation([document.category_id])
     except ConnectionError:
         logger.error('Error connecting to ES. The doc %d will no be indexed' %
                      es_key)
@@ -54,43 +154,93 @@ def index_revision(revision):
 def index_document(document_id):
     """Index all revisions for a document"""
     document = Document.objects \
-        .select_related() \
+        .select_related('category__organisation', 'category__category_template') \
         .get(pk=document_id)
-    revisions = document.get_all_revisions()
-    actions = list(map(build_index_data, revisions))
+    serializer = get_revision_serializer(document.category)
+    revisions = prepare_queryset(document.get_all_revisions())
+    actions = [build_index_data(revision, serializer=serializer)
+               for revision in revisions]
 
-    bulk(
-        elastic,
-        actions,
-        chunk_size=settings.ELASTIC_BULK_SIZE,
-        request_timeout=60)
+    bulk_actions(actions)
+    bump_index_generation([document.category_id])
+
+
+@app.task
+def index_documents(document_ids, refresh=True):
+    """Index all revisions of several documents in a single bulk request.
+
+    The index is refreshed once for the whole batch.
+
+    """
+    documents = Document.objects \
+        .filter(pk__in=document_ids) \
+        .filter(is_indexable=True) \
+        .select_related('category__organisation', 'category__category_template')
+
+    # Fetch revisions with a single query per category
+    documents_by_category = {}
+    categories = {}
+    for document in documents:
+        categories[document.category_id] = document.category
+        documents_by_category.setdefault(document.category_id, []).append(document.pk)
+
+    actions = []
+    for category_id, ids in documents_by_category.items():
+        category = categories[category_id]
+        serializer = get_revision_serializer(category)
+        revisions = category.revision_class().objects \
+            .filter(metadata__document_id__in=ids)
+        revisions = prepare_queryset(revisions)
+        actions += [build_index_data(revision, serializer=serializer)
+                    for revision in revisions]
+
+    bulk_actions(actions)
+    if refresh:
+        refresh_index()
+    bump_index_generation(list(categories.keys()))
 
 
 def index_revisions(revisions):
     """Index a bunch of revisions."""
-    actions = list(map(build_index_data, revisions))
-    bulk(
-        elastic,
-        actions,
-        chunk_size=settings.ELASTIC_BULK_SIZE,
-        request_timeout=60)
+    if isinstance(revisions, QuerySet):
+        revisions = prepare_queryset(revisions)
+
+    actions = []
+    category_ids = set()
+    for revision in revisions:
+        category_ids.add(revision.metadata.document.category_id)
+        actions.append(build_index_data(revision))
+
+    bulk_actions(actions)
     refresh_index()
+    bump_index_generation(list(category_ids))
 
 
-def bulk_actions(actions):
+def bulk_actions(actions, raise_on_error=True):
+    """Send the actions, also to the index being rebuilt if any."""
+    actions = list(actions)
+    target = get_reindex_target()
+    if target:
+        actions += [
+            dict(action, _index=target) for action in actions
+            if action['_index'] == settings.ELASTIC_INDEX]
+
     bulk(
         elastic,
         actions,
+        raise_on_error=raise_on_error,
         chunk_size=settings.ELASTIC_BULK_SIZE,
         request_timeout=60)
 
 
-def build_index_data(revision):
+def build_index_data(revision, index=None, serializer=None):
+    if serializer is None:
+        serializer = get_revision_serializer(revision.metadata.document.category)
     return {
-        '_index': settings.ELASTIC_INDEX,
-        '_type': revision.metadata.document.document_type(),
+        '_index': index or settings.ELASTIC_INDEX,
+        '_type': serializer.document_type,
         '_id': revision.unique_id,
-        '_source': revision.to_json(),
+        '_source': serializer.to_json(revision),
     }
 
 
@@ -108,12 +258,9 @@ def unindex_document(document_id):
         '_id': revision.unique_id,
     } for revision in revisions]
 
-    bulk(
-        elastic,
-        actions,
-        raise_on_error=False,
-        chunk_size=settings.ELASTIC_BULK_SIZE,
-        request_timeout=60)
+    # Revisions may not be in the index (yet)
+    bulk_actions(actions, raise_on_error=False)
+    bump_index_generation([document.category_id])
 
 
 TYPE_MAPPING = [
@@ -126,7 +273,7 @@ TYPE_MAPPING = [
 
 
 @app.task
-def put_category_mapping(category_id):
+def put_category_mapping(category_id, index=None):
     category = Category.objects \
         .select_related('organisation', 'category_template__metadata_model') \
         .get(pk=category_id)
@@ -135,10 +282,11 @@ def put_category_mapping(category_id):
     doc_type = category.document_type()
     mapping = get_mapping(doc_class)
     elastic.indices.put_mapping(
-        index=settings.ELASTIC_INDEX,
+        index=index or settings.ELASTIC_INDEX,
         doc_type=doc_type,
         body=mapping,
     )
+    invalidate_search_schemas()
 
 
 def get_mapping(doc_class):
@@ -1,77 +1,100 @@
 from braces.views import JSONResponseMixin
 
-from search.builder import SearchBuilder
+from search.builder import SearchBuilder, get_cursor
+from search.facets import get_facets
 from documents.views import BaseDocumentList
 from django.conf import settings
 
 
-class SearchDocuments(JSONResponseMixin, BaseDocumentList):
+class SearchMixin(JSONResponseMixin):
     http_method_names = ['get']
 
-    def get_queryset(self):
-        """Given DataTables' GET parameters, filter the initial queryset."""
-        super(SearchDocuments, self).get_queryset()
+    def get_builder(self):
         if self.request.user.is_external:
             entities = self.get_external_filtering()
         else:
             entities = None
+        return SearchBuilder(self.category,
+                             self.request.GET,
+                             filter_on_entities=entities)
+
+    def render_to_response(self, context, **response_kwargs):
+        return self.render_json_response(context, **response_kwargs)
+
+
+class SearchDocuments(SearchMixin, BaseDocumentList):
+
+    def get_queryset(self):
+        """Given DataTables' GET parameters, filter the initial queryset."""
+        super(SearchDocuments, self).get_queryset()
         try:
-            builder = SearchBuilder(self.category,
-                                    self.request.GET,
-                                    filter_on_entities=entities)
-            query = builder.build_query()
-            query = builder.add_aggregations(query)
-            results = query.execute()
+            self.builder = self.get_builder()
+            results = self.builder.get_results()
         except RuntimeError:
-            results = []
+            self.builder = None
+            results = None
 
         return results
 
-    def render_to_response(self, context, **response_kwargs):
-        return self.render_json_response(context, **response_kwargs)
+    def is_first_page(self):
+        return not self.request.GET.get('after') and \
+            not int(self.request.GET.get('start', 0))
 
     def get_context_data(self, **kwargs):
-        response = self.get_queryset()
+        response = self.object_list
+        if response is None:
+            return {
+                'total': 0,
+                'display': 0,
+                'data': [],
+                'aggregations': {},
+                'next': None,
+            }
+
         start = int(self.request.GET.get('start', 0))
         end = start + int(self.request.GET.get('length', settings.PAGINATE_BY))
         total = response.hits.total
         display = min(end, total)
         search_data = [hit._d_ for hit in response.hits]
-        aggregations = self.format_aggregations(response.aggregations)
 
-        return {
+        # Next pages are fetched with this cursor, which is much cheaper
+        # than paginating with `start`.
+        # With a cursor, `total` only counts the hits following it, so we
+        # can only tell there are more results if the page is full
+        if search_data and len(search_data) == self.builder.size:
+            next_cursor = get_cursor(response.hits[-1])
+        else:
+            next_cursor = None
+
+        context = {
             'total': total,
             'display': display,
             'data': search_data,
-            'aggregations': aggregations,
+            'next': next_cursor,
         }
 
-    def format_aggregations(self, aggregations):
-        """Transfroms the ES "aggregations" response into something we can use.
-
-        aggregations = {
-            'filter_name': {
-                'buckets': [
-                    {'key': 'some_name', 'doc_count': 123},
-                    …
-                ]
-            },
-            …
-        }
+        # Facet counts don't change with pagination, so they are only
+        # returned with the first page of results
+        if self.is_first_page():
+            context.update(get_facets(self.builder))
+        return context
 
-        We want :
 
-        aggregations = {
-            'filter_name': [{'some_name': 123}, …],
-            …
-        }
+class SearchFacets(SearchMixin, BaseDocumentList):
+    """Return facet counts for the given search filters.
 
-        """
-        def flatten(bucket):
-            key = bucket[0]
-            buckets = bucket[1]['buckets']
-            bucket_values = dict([(b['key'], b['doc_count']) for b in buckets])
-            return (key, bucket_values)
-        buckets = list(aggregations.to_dict().items())
-        response = dict(list(map(flatten, buckets)))
-        return response
+    Only the biggest buckets are returned by the search view. This is used
+    to fetch all buckets of the `facet` filters.
+
+    """
+    def get_queryset(self):
+        return None
+
+    def get_context_data(self, **kwargs):
+        facets = self.request.GET.getlist('facet') or None
+        size = settings.SEARCH_FACETS_MAX_SIZE if facets else None
+        try:
+            builder = self.get_builder()
+        except RuntimeError:
+            return {'aggregations': {}, 'truncated': []}
+        return get_facets(builder, facets=facets, size=size)
@@ -214,7 +214,11 @@ var Phase = Phase || {};
      */
     Phase.Views.DiscussionAppView = Backbone.View.extend({
         initialize: function() {
-            var discussionButtons = $('div.discussion-buttons');
+            this.listenTo(dispatcher, 'onRevisionPanelLoaded', this.addButtons);
+            this.addButtons($(document));
+        },
+        addButtons: function(container) {
+            var discussionButtons = container.find('div.discussion-buttons');
             _.each(discussionButtons, function(buttons) {
                 var discussionView = new Phase.Views.DiscussionView({
                     buttons: buttons
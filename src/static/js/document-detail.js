@@ -5,20 +5,44 @@ jQuery(function ($) {
     "use strict";
 
     /* Disable the whole form and let value selectable and copy/pastable by users*/
-    var documentDetail = $('#document-detail');
-    documentDetail.find('input, textarea')
-        .each(function (el) {
-            $(this).attr('readonly', true);
-            $(this).attr('disabled', false);
-        });
     var inputTpl = _.template('<input maxlength="250" class="form-control" readonly="true" value="<%= text  %>"/>');
-    documentDetail.find('select')
-        .each(function (el) {
-            var selected = $(this).find(":selected").text();
-            var text = inputTpl({text: selected});
-            $(this).after(text);
-            $(this).hide();
+    var disableFields = function (container) {
+        container.find('input, textarea')
+            .each(function (el) {
+                $(this).attr('readonly', true);
+                $(this).attr('disabled', false);
+            });
+        container.find('select')
+            .each(function (el) {
+                var selected = $(this).find(":selected").text();
+                var text = inputTpl({text: selected});
+                $(this).after(text);
+                $(this).hide();
+            });
+    };
+    var documentDetail = $('#document-detail');
+    disableFields(documentDetail);
+
+    /* Older revisions are loaded when their tab is displayed */
+    var loadRevisionPanel = function (panel) {
+        var url = panel.data('url');
+        if (!url || panel.data('loaded')) {
+            return;
+        }
+        panel.data('loaded', true);
+        $.get(url).done(function (html) {
+            panel.html(html);
+            disableFields(panel);
+            panel.find('[data-toggle="tooltip"]').tooltip();
+            Phase.Events.dispatcher.trigger('onRevisionPanelLoaded', panel);
+        }).fail(function () {
+            panel.data('loaded', false);
         });
+    };
+    $('#fieldset-revision a[data-toggle="tab"]').on('shown.bs.tab', function (e) {
+        loadRevisionPanel($($(e.target).attr('href')));
+    });
+    loadRevisionPanel(documentDetail.find('.revision-panel.active'));
 
     /* Initialize datepickers and hide on select */
     $('.dateinput:not([readonly]):not(:disabled)').datepicker({
@@ -8,9 +8,16 @@ var Phase = Phase || {};
     Phase.Collections.DocumentCollection = Backbone.Collection.extend({
         model: Phase.Models.Document,
         url: Phase.Config.searchUrl,
-        parse: function(response) {
-            this.total = response.total;
+        parse: function(response, options) {
+            // Following pages only count the results after the cursor,
+            // so we keep the total of the first page
+            var data = options.data || {};
+            if (!data.after) {
+                this.total = response.total;
+            }
             this.aggregations = response.aggregations;
+            this.truncated = response.truncated;
+            this.next = response.next;
             return response.data;
         }
     });
@@ -40,11 +40,13 @@ var Phase = Phase || {};
          * Since we don't want to replace the currently displayed results,
          * we don't trigger the "change" event, and let the calling object
          * be responsible of triggering the actual search query.
+         *
+         * The cursor returned with the previous results is used to fetch
+         * the next ones, `start` is not needed anymore.
          */
-        nextPage: function() {
-            var start = this.get('start');
-            var size = this.get('size');
-            this.set('start', start + size, {silent: true});
+        nextPage: function(cursor) {
+            this.unset('start', {silent: true});
+            this.set('after', cursor, {silent: true});
         },
         /**
          * Set the pagination params to fetch the first results.
@@ -58,6 +60,7 @@ var Phase = Phase || {};
                 'start': defaults.start,
                 'size': defaults.size
             }, {silent: true});
+            this.unset('after', {silent: true});
         }
     });
 
@@ -83,6 +83,7 @@ var Phase = Phase || {};
             // because it breaks… stuff.
             delete searchParams.size;
             delete searchParams.start;
+            delete searchParams.after;
 
             return searchParams;
         },
@@ -113,18 +114,24 @@ var Phase = Phase || {};
             var displayedDocuments = this.documentsCollection.length;
             var totalDocuments = this.documentsCollection.total;
             var aggregations = this.documentsCollection.aggregations;
+            var truncated = this.documentsCollection.truncated;
             dispatcher.trigger('onDocumentsFetched', {
                 displayed: displayedDocuments,
-                total: totalDocuments
+                total: totalDocuments,
+                next: this.documentsCollection.next
             });
-            dispatcher.trigger('onAggregationsFetched', aggregations);
+
+            // Facets are only returned with the first page of results
+            if (aggregations !== undefined) {
+                dispatcher.trigger('onAggregationsFetched', aggregations, truncated);
+            }
         },
         /**
          * User scrolled all the way to the bottom of the page, let's
          * download more search results.
          */
         onMoreDocumentsRequested: function() {
-            this.search.nextPage();
+            this.search.nextPage(this.documentsCollection.next);
             this.fetchDocuments(false);
         },
         /**
@@ -270,12 +270,16 @@ var Phase = Phase || {};
             'keyup input': 'debouncedSetInput',
             'click input[type=checkbox]': 'setInput',
             'change select.filter': 'setFilter',
+            'focus select.filter': 'fetchMoreFacets',
             'click span.glyphicon-remove': 'removeFilter',
             'click #resetForm': 'resetForm'
         },
         initialize: function() {
             _.bindAll(this, 'synchronizeAttribute', 'updateFacets', 'updateFacet');
 
+            // Facets with buckets missing from the search results
+            this.truncated = [];
+
             this.filterForm = this.$el.find('form').first();
             this.filterForm.get(0).reset();
 
@@ -379,9 +383,27 @@ var Phase = Phase || {};
             var sort_by = this.model.get('sort_by');
             this.model.reset({sort_by: sort_by});
         },
-        updateFacets: function(aggregations) {
+        updateFacets: function(aggregations, truncated) {
+            this.truncated = truncated || [];
             _.each(aggregations, this.updateFacet);
         },
+        /**
+         * Only the biggest buckets of each facet are returned with the
+         * search results. Fetch the missing ones when the user opens
+         * the filter.
+         */
+        fetchMoreFacets: function(event) {
+            var name = $(event.currentTarget).attr('name');
+            if (!_.contains(this.truncated, name)) {
+                return;
+            }
+
+            this.truncated = _.without(this.truncated, name);
+            var data = _.extend({facet: name}, this.model.attributes);
+            $.getJSON(Phase.Config.facetsUrl, data, _.bind(function(response) {
+                this.updateFacet(response.aggregations[name], name);
+            }, this));
+        },
         /**
          * Get the buckets values from Elasticsearch aggregations, and
          * update the filter fields display accordingly.
@@ -391,6 +413,7 @@ var Phase = Phase || {};
             var field = this.filterForm.find('#id_' + facet).first();
             var options = field.children('option');
             var option_text_re = /^(.+) \(\d+\)$/i;
+            var truncated = _.contains(this.truncated, facet);
             _.each(options, function(option) {
                 option = $(option);
                 var text = option.text();
@@ -407,9 +430,14 @@ var Phase = Phase || {};
                     text = match[1];
                 }
 
-                // ES doesn'nt return a value if the bucket is empty
+                // ES doesn'nt return a value if the bucket is empty, or
+                // if it is not part of the biggest ones
                 var bucket_number = buckets[val];
                 if (bucket_number === undefined) {
+                    if (truncated) {
+                        option.text(text);
+                        return;
+                    }
                     bucket_number = 0;
                 }
 
@@ -439,7 +467,7 @@ var Phase = Phase || {};
             var displayed = data.displayed;
             var total = data.total;
 
-            if (displayed < total) {
+            if (displayed < total && data.next) {
                 this.showPaginationButton();
                 _.delay(this.bindInviewEvent, 300);
             } else {
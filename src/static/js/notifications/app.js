@@ -4,16 +4,59 @@ jQuery(function($) {
     "use strict";
 
     var notifButton = $('#notifications-button');
-    var notifList = $('#notifications div.notification');
+    var notifItems = $('#right-sidebar div.notification-items');
+    var notifTemplate = _.template($('#tpl-notification').html());
+    var unreadCount = Phase.Config.unreadNotifications || 0;
+    var pollInterval = (Phase.Config.notificationsPollInterval || 60) * 1000;
 
-    // TODO Get this magic value from python instead
-    var markAsReadUrl = '/api/notifications/mark_as_read/';
+    var markAsReadUrl = Phase.Config.notificationsMarkAsReadUrl;
+    var pollUrl = Phase.Config.notificationsPollUrl;
 
-    notifButton.one('click', function() {
-        notifButton.removeClass('btn-danger');
-        notifButton.addClass('btn-link');
-        $.post(markAsReadUrl, {});
-    });
+    var bindMarkAsRead = function() {
+        notifButton.off('click.markAsRead');
+        notifButton.one('click.markAsRead', function() {
+            notifButton.removeClass('btn-danger');
+            notifButton.addClass('btn-link');
+            unreadCount = 0;
+            $.post(markAsReadUrl, {});
+        });
+    };
+
+    var renderLatest = function(latest) {
+        notifItems.html('');
+        _.each(latest, function(notification) {
+            var item = $('<div class="notification"></div>');
+            item.html(notifTemplate(notification));
+            notifItems.append(item);
+        });
+    };
+
+    /**
+     * Periodically check the number of unread notifications. The server
+     * only reads it from cache, so this is cheap.
+     */
+    var poll = function() {
+        $.getJSON(pollUrl)
+            .done(function(data) {
+                if (data.unread !== unreadCount) {
+                    unreadCount = data.unread;
+                    renderLatest(data.latest);
+                    if (unreadCount > 0) {
+                        notifButton.removeClass('btn-link');
+                        notifButton.addClass('btn-danger');
+                        bindMarkAsRead();
+                    }
+                }
+            })
+            .always(function() {
+                _.delay(poll, pollInterval);
+            });
+    };
+
+    if (notifButton.length) {
+        bindMarkAsRead();
+        _.delay(poll, pollInterval);
+    }
 
     var collection = new Phase.Collections.NotificationCollection();
     var notificationsModalView = new Phase.Views.NotificationsModalView({ collection: collection });
@@ -5,16 +5,14 @@ import os
 import csv
 import shutil
 import logging
-import glob
 import datetime
 
 from django.db import transaction
+from django.db.models import Q
 from django.core.files import File
 
-from annoying.functions import get_object_or_None
-
 from documents.models import Document
-from documents.utils import save_document_forms
+from documents.utils import save_document_forms, DocumentCache
 from transmittals.validation import (
     TrsValidator, CSVLineValidator, RevisionsValidator)
 from transmittals.reports import ErrorReport
@@ -24,6 +22,97 @@ from accounts.models import Entity
 logger = logging.getLogger(__name__)
 
 
+class TrsImportIndex(object):
+    """In memory data used to validate and save a transmittal import.
+
+    Validators would otherwise query the db and the filesystem for every
+    csv line. Instead, the directory content, all the referenced documents
+    with their revisions, the originators and the related transmittals are
+    fetched once per import, and validation only performs lookups in this
+    index.
+
+    """
+    def __init__(self, trs_import):
+        self.trs_import = trs_import
+        self.files = self.list_files()
+
+        lines = trs_import.csv_lines()
+        keys = set(line.get('document_key') for line in lines)
+        keys.discard(None)
+        self.documents = self.fetch_documents(keys)
+        self.caches = self.fetch_metadata()
+
+        trigrams = set(line.get('originator') for line in lines)
+        trigrams.discard(None)
+        self.entities = dict(Entity.objects
+                             .filter(trigram__in=trigrams)
+                             .values_list('trigram', 'id'))
+
+        self.transmittals = self.fetch_transmittals()
+
+    def list_files(self):
+        try:
+            return set(os.listdir(self.trs_import.trs_dir))
+        except OSError:
+            return set()
+
+    def fetch_documents(self, keys):
+        documents = Document.objects \
+            .select_related('category__category_template') \
+            .filter(document_key__in=keys)
+        return dict((doc.document_key, doc) for doc in documents)
+
+    def fetch_metadata(self):
+        """Fetch metadata and revisions, grouped by category."""
+        categories = {}
+        keys = {}
+        for doc in self.documents.values():
+            categories[doc.category_id] = doc.category
+            keys.setdefault(doc.category_id, set()).add(doc.document_key)
+
+        caches = dict(
+            (pk, DocumentCache(categories[pk].document_class(), keys[pk]))
+            for pk in keys)
+        return caches
+
+    def fetch_transmittals(self):
+        """Fetch the imported transmittal and the previous one in sequence."""
+        from transmittals.models import Transmittal
+
+        basename = self.trs_import.basename
+        query = Q(document_key=basename)
+        try:
+            contract_number, originator, recipient, _, seq_number = basename.split('-')
+            query |= Q(
+                contract_number=contract_number,
+                originator=originator,
+                recipient=recipient,
+                sequential_number=int(seq_number) - 1)
+        except ValueError:
+            pass
+
+        transmittals = Transmittal.objects \
+            .filter(query) \
+            .values('document_key', 'contract_number', 'originator',
+                    'recipient', 'sequential_number', 'status')
+        return list(transmittals)
+
+    def get_document(self, document_key):
+        return self.documents.get(document_key, None)
+
+    def get_metadata(self, document_key):
+        doc = self.get_document(document_key)
+        if doc is None:
+            return None
+        return self.caches[doc.category_id].get_metadata(document_key)
+
+    def get_revision(self, metadata, revision_num):
+        if metadata is None:
+            return None
+        cache = self.caches[metadata.document.category_id]
+        return cache.get_revision(metadata, revision_num)
+
+
 class TrsImport(object):
     """A transmittals import encapsulation.
 
@@ -53,6 +142,7 @@ class TrsImport(object):
         self._csv_lines = None
         self._pdf_names = None
         self._native_names = None
+        self._index = None
 
     def __iter__(self):
         for line in self.csv_lines():
@@ -171,10 +261,16 @@ class TrsImport(object):
             self._csv_lines = lines
         return self._csv_lines
 
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = TrsImportIndex(self)
+        return self._index
+
     def pdf_names(self):
         """Returns the list of pdf files."""
         if not self._pdf_names:
-            files = os.listdir(self.trs_dir)
+            files = self.index.files
             self._pdf_names = [f for f in files if f.endswith('pdf')]
 
         return self._pdf_names
@@ -182,7 +278,7 @@ class TrsImport(object):
     def native_names(self):
         """Returns the list of native files."""
         if not self._native_names:
-            files = os.listdir(self.trs_dir)
+            files = self.index.files
             self._native_names = [f for f in files if (not f.endswith('pdf')) and f != self.csv_basename]
 
         return self._native_names
@@ -372,13 +468,7 @@ class TrsImportLine(object):
         return self._form_data
 
     def clean_originator(self, value):
-        try:
-            originator = Entity.objects \
-                .get(trigram=value)
-        except:  # noqa
-            return None
-
-        return originator.id
+        return self.trs_import.index.entities.get(value, None)
 
     @property
     def errors(self):
@@ -403,11 +493,11 @@ class TrsImportLine(object):
     @property
     def native_fullname(self):
         """Get the fullname of the native file or None if there isn't one."""
-        # Since we don't know the native file extension, we have to perform
-        # a search using the `glob` module.
-        pdf = self.pdf_fullname
-        stripped_name = pdf[0:-4]
-        natives = glob.glob('{}*'.format(stripped_name))
+        # Since we don't know the native file extension, we have to search
+        # the directory content.
+        stripped_name = self.pdf_basename[0:-4]
+        natives = [f for f in self.trs_import.index.files
+                   if f.startswith(stripped_name)]
 
         if len(natives) < 1 or len(natives) > 2:
             raise RuntimeError('Oops. Wrong number of files here.')
@@ -420,9 +510,9 @@ class TrsImportLine(object):
             # We found the pdf and the native
             first_extension = natives[0].split('.')[-1]
             if first_extension == 'pdf':
-                return natives[1]
+                return os.path.join(self.trs_dir, natives[1])
             else:
-                return natives[0]
+                return os.path.join(self.trs_dir, natives[0])
 
     @property
     def sequential_number(self):
@@ -430,19 +520,15 @@ class TrsImportLine(object):
 
     def get_document(self):
         if self._document is None:
-            qs = Document.objects \
-                .select_related('category__category_template')
-            self._document = get_object_or_None(
-                qs,
-                document_key=self.csv_data['document_key'])
+            self._document = self.trs_import.index.get_document(
+                self.csv_data['document_key'])
 
         return self._document
 
     def get_metadata(self):
         if self._metadata is None:
-            doc = self.get_document()
-            if doc is not None:
-                self._metadata = doc.metadata
+            self._metadata = self.trs_import.index.get_metadata(
+                self.csv_data['document_key'])
 
         return self._metadata
 
@@ -467,7 +553,7 @@ class TrsImportLine(object):
             category=self.trs_import.doc_category)
 
         revision_num = self.csv_data['revision']
-        revision = metadata.get_revision(revision_num) if metadata else None
+        revision = self.trs_import.index.get_revision(metadata, revision_num)
 
         RevisionForm = self.get_revision_form_class()
         revision_form = RevisionForm(
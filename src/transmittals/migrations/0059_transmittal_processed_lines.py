@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transmittals', '0058_set_due_dates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transmittal',
+            name='processed_lines',
+            field=models.PositiveIntegerField(default=0, verbose_name='Processed lines'),
+        ),
+    ]
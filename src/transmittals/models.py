@@ -5,8 +5,6 @@ import os
 import logging
 import shutil
 import uuid
-import zipfile
-import tempfile
 from collections import OrderedDict
 
 from django import forms
@@ -19,11 +17,13 @@ from django.utils import timezone
 from model_utils import Choices
 from elasticsearch_dsl import Q
 
-from documents.utils import save_document_forms
+from documents.utils import save_document_forms, DocumentCache
 from documents.models import Document, Metadata, MetadataRevision, MetadataRevisionBase
 from documents.templatetags.documents import MenuItem
 from reviews.models import CLASSES, ReviewMixin
-from search.utils import build_index_data, bulk_actions
+from search.utils import (
+    build_index_data, bulk_actions, bump_index_generation)
+from search.queue import coalesce_indexing
 from metadata.fields import ConfigurableChoiceField
 from default_documents.validators import StringNumberValidator
 from privatemedia.fields import ProtectedFileField, PrivateFileField
@@ -104,6 +104,11 @@ class Transmittal(Metadata):
         related_name='transmittals_related_set',
         blank=True)
 
+    # Number of lines already imported, to resume an interrupted processing
+    processed_lines = models.PositiveIntegerField(
+        _('Processed lines'),
+        default=0)
+
     contractor = models.CharField(max_length=255, null=True, blank=True)
     tobechecked_dir = models.CharField(max_length=255, null=True, blank=True)
     accepted_dir = models.CharField(max_length=255, null=True, blank=True)
@@ -431,8 +436,14 @@ class TrsRevision(models.Model):
 
         return fields_dict, files_dict
 
-    def save_to_document(self):
-        """Use self data to create / update the corresponding revision."""
+    def save_to_document(self, documents=None):
+        """Use self data to create / update the corresponding revision.
+
+        `documents` is a `documents.utils.DocumentCache` instance holding
+        the existing documents. When processing a whole transmittal, the
+        same cache is used for all lines.
+
+        """
 
         fields, files = self.get_document_fields()
         kwargs = {
@@ -441,29 +452,39 @@ class TrsRevision(models.Model):
             'files': files
         }
 
-        # The document was created earlier during
+        if documents is None:
+            documents = DocumentCache(
+                self.category.document_class(), [self.document_key])
+
+        # The document may have been created earlier during
         # the batch import
-        if self.document is None and self.revision > 0:
-            self.document = Document.objects.get(document_key=self.document_key)
+        metadata = documents.get_metadata(self.document_key)
+        if metadata is None and self.revision > 0:
+            raise Document.DoesNotExist(
+                'Document {} does not exist'.format(self.document_key))
 
-        metadata = getattr(self.document, 'metadata', None)
         kwargs.update({'instance': metadata})
         Form = self.category.get_metadata_form_class()
         metadata_form = Form(**kwargs)
 
         # If there is no such revision, the method will return None
         # which is fine.
-        revision = metadata.get_revision(self.revision) if metadata else None
+        revision = documents.get_revision(metadata, self.revision)
 
         kwargs.update({'instance': revision})
         RevisionForm = self.category.get_revision_form_class()
         revision_form = RevisionForm(**kwargs)
 
-        doc, meta, rev = save_document_forms(
-            metadata_form, revision_form, self.category)
+        # The custom import action can save the document again
+        with coalesce_indexing():
+            doc, meta, rev = save_document_forms(
+                metadata_form, revision_form, self.category)
+
+            # Performs custom import action
+            rev.post_trs_import(self)
 
-        # Performs custom import action
-        rev.post_trs_import(self)
+        self.document = doc
+        documents.add(meta, rev)
 
 
 class OutgoingTransmittal(Metadata):
@@ -633,63 +654,75 @@ class OutgoingTransmittal(Metadata):
         return TransmittalDownloadForm(data, queryset=queryset)
 
     @classmethod
-    def compress_documents(cls, documents, **kwargs):
-        """See `documents.models.Metadata.compress_documents`"""
+    def get_download_files(cls, documents, **kwargs):
+        """See `documents.models.Metadata.get_download_files`"""
         content = kwargs.get('content', 'transmittal')
         revisions = kwargs.get('revisions', 'latest')
 
-        temp_file = tempfile.TemporaryFile()
-
-        with zipfile.ZipFile(temp_file, mode='w') as zip_file:
-            for document in documents:
-                dirname = document.document_key
-                revision = document.get_latest_revision()
-
-                # Should we embed the transmittal pdf?
-                if content in ('transmittal', 'both'):
-
-                    # All revisions or just the latest?
-                    if revisions == 'latest':
-                        revs = [revision]
-                    elif revisions == 'all':
-                        revs = document.get_all_revisions()
-
-                    # Embed the file in the zip archive
-                    for rev in revs:
-                        pdf_file = rev.pdf_file
-                        pdf_basename = os.path.basename(pdf_file.name)
-
-                        # Avoiding to break export process
-                        if not pdf_file:
-                            continue
-
-                        # If file is gone, don't break export process
-                        try:
-                            zip_file.write(
-                                pdf_file.path,
-                                '{}/{}'.format(dirname, pdf_basename),
-                                compress_type=zipfile.ZIP_DEFLATED)
-                        except OSError:
-                            logger.warning(
-                                'File: {} missing in export process'.format(pdf_file))
-
-                # Should we embed review comments?
-                if content in ('revisions', 'both'):
-                    meta = document.get_metadata()
-                    exported_revs = meta.get_revisions()
-                    for rev in exported_revs:
-                        if rev.file_transmitted:
-                            comments_file = rev.file_transmitted
-                            comments_basename = os.path.basename(comments_file.path)
-                            zip_file.write(
-                                comments_file.path,
-                                '{}/{}/{}'.format(
-                                    dirname,
-                                    rev.document.document_key,
-                                    comments_basename),
-                                compress_type=zipfile.ZIP_DEFLATED)
-
-        return temp_file
+        files = []
+
+        # Should we embed the transmittal pdf?
+        if content in ('transmittal', 'both'):
+            for document, rev in cls.get_download_revisions(documents, revisions):
+                pdf_file = rev.pdf_file
+
+                # Avoiding to break export process
+                if not pdf_file:
+                    continue
+
+                files.append((pdf_file.path, '{}/{}'.format(
+                    document.document_key,
+                    os.path.basename(pdf_file.name))))
+
+        # Should we embed review comments?
+        if content in ('revisions', 'both'):
+            files += cls.get_transmitted_files(documents)
+
+        return files
+
+    @classmethod
+    def get_transmitted_files(cls, documents):
+        """List review comments files of the given transmittals.
+
+        Files are fetched with two queries per category of transmitted
+        documents.
+
+        """
+        transmittals = cls.objects \
+            .filter(document__in=documents) \
+            .select_related('document', 'revisions_category__category_template')
+        by_category = OrderedDict()
+        for transmittal in transmittals:
+            by_category.setdefault(transmittal.revisions_category, []).append(transmittal)
+
+        files = []
+        for category, category_transmittals in by_category.items():
+            Revision = category.revision_class()
+            m2m = Revision._meta.get_field('transmittals')
+            keys = dict((transmittal.pk, transmittal.document.document_key)
+                        for transmittal in category_transmittals)
+            transmittal_field = m2m.m2m_reverse_field_name()
+            links = Revision.transmittals.through.objects \
+                .filter(**{'{}__in'.format(transmittal_field): list(keys.keys())}) \
+                .values_list(transmittal_field, m2m.m2m_field_name())
+            links = list(links)
+            revisions = Revision.objects \
+                .filter(pk__in=[revision_id for _, revision_id in links]) \
+                .exclude(file_transmitted='') \
+                .exclude(file_transmitted=None) \
+                .select_related('metadata__document')
+            revisions = dict((revision.pk, revision) for revision in revisions)
+
+            for transmittal_id, revision_id in links:
+                if revision_id not in revisions:
+                    continue
+                rev = revisions[revision_id]
+                comments_file = rev.file_transmitted
+                files.append((comments_file.path, '{}/{}/{}'.format(
+                    keys[transmittal_id],
+                    rev.document.document_key,
+                    os.path.basename(comments_file.path))))
+        return files
 
     def link_to_revisions(self, revisions):
         """Set the given revisions as related documents.
@@ -701,8 +734,10 @@ class OutgoingTransmittal(Metadata):
         """
         ids = []
         index_data = []
+        category_ids = set()
         for revision in revisions:
             ids.append(revision.id)
+            category_ids.add(revision.metadata.document.category_id)
 
             # Update ES index to make sure the "can_be_transmitted"
             # filter is up to date
@@ -715,6 +750,7 @@ class OutgoingTransmittal(Metadata):
             for rev in Revision.objects.filter(id__in=ids):
                 rev.transmittals.add(self)
             bulk_actions(index_data)
+        bump_index_generation(list(category_ids))
 
     @classmethod
     def get_batch_actions(cls, category, user):
@@ -1,6 +1,7 @@
 import logging
 import os
 
+from django.conf import settings
 from django.db import transaction
 
 from celery import current_task
@@ -11,7 +12,9 @@ from core.celery import app
 from accounts.models import Entity, User
 from categories.models import Category
 from documents.models import Document
-from notifications.models import notify
+from documents.utils import DocumentCache
+from notifications.models import notify, batch_notifications
+from search.queue import coalesce_indexing
 from transmittals.models import (
     Transmittal, TrsRevision, OutgoingTransmittal, OutgoingTransmittalRevision)
 from transmittals.utils import (
@@ -57,35 +60,63 @@ def do_create_transmittal(
     revisions = []
     for doc in documents:
         revisions.append(doc.get_latest_revision())
-    try:
-        for recipient in recipients:
-            doc, _, _ = create_transmittal(
-                from_category,
-                to_category,
-                revisions,
-                contract_number,
-                recipient,
-                purpose_of_issue=purpose_of_issue)
-            msg = '''You successfully created transmittal
-                     <a href="{}">{}</a>'''.format(doc.get_absolute_url(), doc)
+    user = User.objects.get(pk=user_id)
+    with batch_notifications():
+        try:
+            for recipient in recipients:
+                doc, _, _ = create_transmittal(
+                    from_category,
+                    to_category,
+                    revisions,
+                    contract_number,
+                    recipient,
+                    purpose_of_issue=purpose_of_issue)
+                msg = '''You successfully created transmittal
+                         <a href="{}">{}</a>'''.format(doc.get_absolute_url(), doc)
+                notify(user_id, msg)
+
+                activity_log.send(verb=Activity.VERB_CREATED,
+                                  action_object=doc,
+                                  sender=None,
+                                  actor=user)
+
+        except TransmittalError as e:
+            msg = '''We failed to create a transmittal for the
+                     following reason: "{}".'''.format(e)
             notify(user_id, msg)
 
-            user = User.objects.get(pk=user_id)
-            activity_log.send(verb=Activity.VERB_CREATED,
-                              action_object=doc,
-                              sender=None,
-                              actor=user)
+    return 'done'
 
-    except TransmittalError as e:
-        msg = '''We failed to create a transmittal for the
-                 following reason: "{}".'''.format(e)
-        notify(user_id, msg)
 
-    return 'done'
+def update_progress(progress):
+    """Report the task progression, when running in a celery worker."""
+    if current_task and current_task.request.id:
+        current_task.update_state(
+            state='PROGRESS',
+            meta={'progress': progress})
+
+
+def get_document_caches(revisions):
+    """Fetch all the documents referenced by the transmittal.
+
+    Returns a `DocumentCache` for each category.
+
+    """
+    keys = {}
+    categories = {}
+    for trs_revision in revisions:
+        category = trs_revision.category
+        categories[category.pk] = category
+        keys.setdefault(category.pk, set()).add(trs_revision.document_key)
+
+    caches = dict(
+        (pk, DocumentCache(categories[pk].document_class(), keys[pk]))
+        for pk in keys)
+    return caches
 
 
 @app.task
-def process_transmittal(transmittal_id):
+def process_transmittal(transmittal_id, chunk_size=None):
     """Processing the transmittal requires the following steps:
 
         - Update all the already existing revisions.
@@ -95,31 +126,57 @@ def process_transmittal(transmittal_id):
         - Move files into the 'accepted' directory
         - Update the Transmittal object status
 
+    Lines are imported in chunks, each chunk in it's own transaction. The
+    number of imported lines is saved with each chunk, so when an error
+    occurs, processing the transmittal again will resume after the last
+    successful chunk.
+
     """
     logger.info('Starting to process transmittal {}'.format(transmittal_id))
+    chunk_size = chunk_size or settings.TRS_PROCESSING_CHUNK_SIZE
 
-    transmittal = Transmittal.objects.get(pk=transmittal_id)
+    transmittal = Transmittal.objects \
+        .select_related('document') \
+        .get(pk=transmittal_id)
     revisions = TrsRevision.objects \
         .filter(transmittal=transmittal) \
-        .order_by('revision') \
+        .order_by('revision', 'pk') \
         .select_related()
+    revisions = list(revisions)
+    total = len(revisions)
+    revisions = revisions[transmittal.processed_lines:]
+    if transmittal.processed_lines:
+        logger.info('Resuming transmittal processing at line {}'.format(
+            transmittal.processed_lines + 1))
+
+    # Existing documents are fetched once for all lines
+    documents = get_document_caches(revisions)
+    trs_revision = None
 
     try:
         # Update / create documents in db
-        with transaction.atomic():
-            line = 1
-            for trs_revision in revisions:
-                trs_revision.save_to_document()
-                if line % 100 == 0:
-                    logger.info('Importing line {}'.format(line))
+        # All touched documents are indexed at once in the end
+        with coalesce_indexing():
+            for start in range(0, len(revisions), chunk_size):
+                chunk = revisions[start:start + chunk_size]
+                with transaction.atomic():
+                    for trs_revision in chunk:
+                        trs_revision.save_to_document(
+                            documents=documents[trs_revision.category_id])
+
+                    transmittal.processed_lines += len(chunk)
+                    transmittal.save(update_fields=['processed_lines'])
 
-                line += 1
+                logger.info('Imported {} lines out of {}'.format(
+                    transmittal.processed_lines, total))
+                update_progress(float(transmittal.processed_lines) / total * 100)
 
-            transmittal.status = 'accepted'
-            transmittal.save()
+            with transaction.atomic():
+                transmittal.status = 'accepted'
+                transmittal.save()
 
-            transmittal.document.is_indexable = True
-            transmittal.document.save()
+                transmittal.document.is_indexable = True
+                transmittal.document.save()
 
         # Move to accepted directory
         if os.path.exists(transmittal.full_tobechecked_name):
@@ -142,10 +199,10 @@ def process_transmittal(transmittal_id):
         # have been eliminated during the initial validation phase
         #
         # Revert the transmittal status back, and log the error is all
-        # we can do now.
+        # we can do now. Already imported chunks are kept.
         error_msg = 'Error processing revision {} of transmittal {} ({})'.format(
             trs_revision, transmittal, e)
         logger.error(error_msg)
 
         transmittal.status = 'tobechecked'
-        transmittal.save()
+        transmittal.save(update_fields=['status'])
@@ -18,7 +18,7 @@ from default_documents.factories import (
 from default_documents.models import ContractorDeliverable
 from accounts.factories import EntityFactory
 from notifications.models import Notification
-from transmittals.models import OutgoingTransmittal
+from transmittals.models import Transmittal, OutgoingTransmittal
 from transmittals.factories import TransmittalFactory, TrsRevisionFactory
 from transmittals.tasks import process_transmittal, do_create_transmittal
 
@@ -170,6 +170,29 @@ class ProcessTransmittalTests(TestCase):
         self.assertFalse(os.path.exists(tobechecked_file))
         self.assertTrue(os.path.exists(accepted_file))
 
+    def test_process_in_chunks(self):
+        process_transmittal(self.transmittal.pk, chunk_size=1)
+
+        transmittal = Transmittal.objects.get(pk=self.transmittal.pk)
+        self.assertEqual(transmittal.status, 'accepted')
+        self.assertEqual(transmittal.processed_lines, 4)
+
+        rev = self.document.metadata.get_revision(4)
+        self.assertEqual(rev.status, 'FIN')
+
+    def test_process_resumes_after_processed_lines(self):
+        self.transmittal.processed_lines = 2
+        self.transmittal.save()
+
+        process_transmittal(self.transmittal.pk)
+
+        # The first two lines were skipped
+        rev = self.document.metadata.get_revision(2)
+        self.assertEqual(rev.status, 'SPD')
+
+        rev = self.document.metadata.get_revision(3)
+        self.assertEqual(rev.status, 'IFA')
+
 
 class OutgoingTransmittalTests(TestCase):
 
@@ -182,6 +182,16 @@ class CSVContentTests(TransmittalsValidationTests):
         self.assertFalse(4 in trs_import.errors['revisions']['FAC10005-CTR-000-EXP-LAY-4891'])
         self.assertTrue(6 in trs_import.errors['revisions']['FAC10005-CTR-000-EXP-LAY-4891'])
 
+    def test_validation_index(self):
+        trs_import = self.prepare_fixtures('single_correct_trs', 'FAC10005-CTR-CLT-TRS-00001')
+        self.assertEqual(trs_import.errors, {})
+
+        index = trs_import.index
+        self.assertIn('FAC10005-CTR-000-EXP-LAY-4891', index.documents)
+        self.assertIn('FAC10005-CTR-CLT-TRS-00001.csv', index.files)
+        self.assertIsNotNone(index.get_metadata('FAC10005-CTR-000-EXP-LAY-4891'))
+        self.assertIsNone(index.get_metadata('FAC10005-CTR-000-EXP-LAY-0000'))
+
 
 class DirRenameTests(TransmittalsValidationTests):
 
@@ -3,7 +3,6 @@ import datetime
 
 from django.db.models import Max
 from django.utils import timezone
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import get_template
 from django.contrib.sites.models import Site
 from django.utils import translation
@@ -11,6 +10,7 @@ from django.db import transaction
 from django.conf import settings
 
 from documents.utils import save_document_forms
+from notifications.mail import build_email, send_emails
 from transmittals import errors
 from transmittals import signals
 from transmittals.models import (
@@ -169,35 +169,28 @@ def send_transmittal_creation_notifications(trs, revision):
     html_tpl = get_template('transmittals/creation_notification_email.html')
     site = Site.objects.get_current()
     recipients = trs.recipient.users.all()
+    related_revisions = list(trs.get_revisions())
 
+    attachments = []
+    if revision.pdf_file:
+        storage = revision.pdf_file.storage
+        attachments.append(storage.path(revision.pdf_file.name))
+
+    emails = []
     for user in recipients:
         logger.info('Notifying user {}'.format(user.email))
-        content = tpl.render({
+        context = {
             'user': user,
             'site': site,
             'document': trs.document,
             'transmittal': trs,
             'revision': revision,
-            'related_revisions': trs.get_revisions()})
-
-        email = EmailMultiAlternatives(
+            'related_revisions': related_revisions}
+        emails.append(build_email(
             subject,
-            content,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email])
-
-        html_content = html_tpl.render({
-            'user': user,
-            'site': site,
-            'document': trs.document,
-            'transmittal': trs,
-            'revision': revision,
-            'related_revisions': trs.get_revisions()})
-        email.attach_alternative(html_content, 'text/html')
-
-        if revision.pdf_file:
-            storage = revision.pdf_file.storage
-            absolute_path = storage.path(revision.pdf_file.name)
-            email.attach_file(absolute_path)
+            tpl.render(context),
+            [user.email],
+            html_body=html_tpl.render(context),
+            attachments=attachments))
 
-        email.send()
+    send_emails(emails)
@@ -1,8 +1,6 @@
 import os
 import re
 
-from documents.models import Document
-
 
 class Validator(object):
     """An object which purpose is to check a single validation point."""
@@ -75,12 +73,12 @@ class TrsExistenceValidator(Validator):
     error_key = 'already_exists'
 
     def test(self, trs_import):
-        from transmittals.models import Transmittal
         name = trs_import.basename
-        qs = Transmittal.objects \
-            .filter(document_key=name) \
-            .filter(status__in=['new', 'tobechecked', 'accepted'])
-        return qs.count() == 0
+        existing = [
+            trs for trs in trs_import.index.transmittals
+            if trs['document_key'] == name and
+            trs['status'] in ('new', 'tobechecked', 'accepted')]
+        return len(existing) == 0
 
 
 class TrsSequentialNumberValidator(Validator):
@@ -90,7 +88,6 @@ class TrsSequentialNumberValidator(Validator):
 
     def test(self, trs_import):
         """Check that the previous trs exists."""
-        from transmittals.models import Transmittal
         name = trs_import.basename
         split = name.split('-')
 
@@ -111,13 +108,14 @@ class TrsSequentialNumberValidator(Validator):
         if seq_number == 1:
             return True
 
-        qs = Transmittal.objects \
-            .filter(contract_number=contract_number) \
-            .filter(originator=originator) \
-            .filter(recipient=recipient) \
-            .filter(sequential_number=seq_number - 1) \
-            .exclude(status='rejected')
-        return qs.count() == 1
+        previous = [
+            trs for trs in trs_import.index.transmittals
+            if trs['contract_number'] == contract_number and
+            trs['originator'] == originator and
+            trs['recipient'] == recipient and
+            trs['sequential_number'] == seq_number - 1 and
+            trs['status'] != 'rejected']
+        return len(previous) == 1
 
 
 class CSVPresenceValidator(Validator):
@@ -166,7 +164,7 @@ class NativeFileValidator(Validator):
 
         """
         native_files = trs_import.native_names()
-        pdf_files = trs_import.pdf_names()
+        pdf_files = set(trs_import.pdf_names())
         errors = dict()
 
         for filename in native_files:
@@ -187,7 +185,7 @@ class PdfFilenameValidator(Validator):
     error_key = 'missing_pdf'
 
     def test(self, import_line):
-        return os.path.exists(import_line.pdf_fullname)
+        return import_line.pdf_basename in import_line.trs_import.index.files
 
 
 class MissingDataValidator(Validator):
@@ -332,10 +330,9 @@ class RevisionsValidator(Validator):
             revisions[document_key].append(revision)
 
         # Get latest revision for each document
-        latest_revisions = Document.objects \
-            .filter(document_key__in=revisions.keys()) \
-            .values_list('document_key', 'current_revision')
-        latest_revisions = dict(latest_revisions)
+        latest_revisions = dict(
+            (key, doc.current_revision)
+            for key, doc in trs_import.index.documents.items())
 
         # Check revisions for each document
         for document_key in list(revisions.keys()):
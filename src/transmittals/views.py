@@ -19,7 +19,7 @@ from transmittals.utils import FieldWrapper
 from transmittals.tasks import do_create_transmittal
 from search.utils import index_revisions
 from documents.views import DocumentListMixin
-from accounts.models import get_entities
+from accounts.access import get_request_access
 from privatemedia.views import serve_model_file_field
 from django.conf import settings
 
@@ -386,7 +386,7 @@ class FileTransmittedDownload(LoginRequiredMixin, DetailView):
 
         # Next, get the transmittal document
         document_key = self.kwargs['document_key']
-        entities = get_entities(self.request.user)
+        entities = get_request_access(self.request).entity_ids
         DocumentClass = category.document_class()
         document_qs = DocumentClass.objects \
             .select_related() \